@@ -0,0 +1,31 @@
+"""task list indexes for keyset pagination
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tasks_updated_at_id', 'tasks', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_tasks_project_updated_at', 'tasks', ['project_id', 'updated_at', 'id'], unique=False)
+    op.create_index('ix_tasks_project_status_updated_at', 'tasks', ['project_id', 'status', 'updated_at', 'id'], unique=False)
+    op.create_index('ix_tasks_project_priority_updated_at', 'tasks', ['project_id', 'priority', 'updated_at', 'id'], unique=False)
+    op.create_index('ix_tasks_assignee_updated_at', 'tasks', ['assignee_id', 'updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_assignee_updated_at', table_name='tasks')
+    op.drop_index('ix_tasks_project_priority_updated_at', table_name='tasks')
+    op.drop_index('ix_tasks_project_status_updated_at', table_name='tasks')
+    op.drop_index('ix_tasks_project_updated_at', table_name='tasks')
+    op.drop_index('ix_tasks_updated_at_id', table_name='tasks')
@@ -0,0 +1,29 @@
+"""indexes for foreign key query paths
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_projects_owner_id', 'projects', ['owner_id'], unique=False)
+    op.create_index('ix_comments_task_id', 'comments', ['task_id'], unique=False)
+    op.create_index('ix_labels_project_id', 'labels', ['project_id'], unique=False)
+    op.create_index('ix_task_labels_label_id_task_id', 'task_labels', ['label_id', 'task_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_labels_label_id_task_id', table_name='task_labels')
+    op.drop_index('ix_labels_project_id', table_name='labels')
+    op.drop_index('ix_comments_task_id', table_name='comments')
+    op.drop_index('ix_projects_owner_id', table_name='projects')
@@ -0,0 +1,53 @@
+"""change feed: tombstones, labels.updated_at and updated_at indexes
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tombstones_owner_deleted_at', 'tombstones', ['owner_id', 'deleted_at', 'id'], unique=False)
+
+    # Existing labels predate the feed; a fixed past timestamp keeps them out of deltas
+    op.add_column(
+        'labels',
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default='1970-01-01 00:00:00.000000'),
+    )
+    op.create_index('ix_labels_updated_at_id', 'labels', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_comments_updated_at_id', 'comments', ['updated_at', 'id'], unique=False)
+
+    # The owner/updated_at index also serves plain owner lookups
+    op.create_index('ix_projects_owner_updated_at', 'projects', ['owner_id', 'updated_at', 'id'], unique=False)
+    op.drop_index('ix_projects_owner_id', table_name='projects')
+
+
+def downgrade() -> None:
+    op.create_index('ix_projects_owner_id', 'projects', ['owner_id'], unique=False)
+    op.drop_index('ix_projects_owner_updated_at', table_name='projects')
+    op.drop_index('ix_comments_updated_at_id', table_name='comments')
+    op.drop_index('ix_labels_updated_at_id', table_name='labels')
+    with op.batch_alter_table('labels') as batch_op:
+        batch_op.drop_column('updated_at')
+    op.drop_index('ix_tombstones_owner_deleted_at', table_name='tombstones')
+    op.drop_table('tombstones')
@@ -0,0 +1,37 @@
+"""shard map: project_shards and id_blocks in the global database
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'project_shards',
+        sa.Column('project_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.Column('moved_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('project_id')
+    )
+    op.create_table(
+        'id_blocks',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('next_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('id_blocks')
+    op.drop_table('project_shards')
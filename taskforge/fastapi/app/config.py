@@ -9,11 +9,118 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
 
+    # Serve the API from async routers on an AsyncEngine instead of the threadpool
+    ASYNC_DB: bool = False
+
+    # SQLite production profile for file databases: WAL with tuned pragmas, a single writer
+    # connection that writes queue for, and a pool of query_only reader connections
+    SQLITE_PRODUCTION: bool = False
+    SQLITE_READ_POOL_SIZE: int = 8
+    SQLITE_WRITE_TIMEOUT_SECONDS: float = 30.0
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_BYTES: int = 256 * 1024 * 1024
+    SQLITE_CACHE_KB: int = 64 * 1024
+
+    # Group commit: task updates and new comments arriving within the window (up to the
+    # max batch) are written in one transaction; each request is answered after its commit
+    GROUP_COMMIT: bool = False
+    GROUP_COMMIT_WINDOW_MS: float = 5.0
+    GROUP_COMMIT_MAX_BATCH: int = 256
+
+    # Read replicas (comma-separated URLs). GET requests read from one unless the user made a
+    # write in the last READ_YOUR_WRITES_SECONDS; keep that above the replicas' lag. SQLite
+    # file replicas of a SQLite primary are refreshed from it every REPLICA_REFRESH_SECONDS
+    # through the backup API (0 leaves refreshing to something else)
+    READ_REPLICA_URLS: str = ""
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    REPLICA_REFRESH_SECONDS: float = 1.0
+
+    # Horizontal sharding (comma-separated SQLite URLs). Each project lives with its tasks,
+    # comments and labels on shard project_id % shard count unless moved there by
+    # python -m app.rebalance; users and the shard map stay in DATABASE_URL. Empty disables it
+    SHARD_URLS: str = ""
+
+    # Authenticated-user cache; a size or TTL of 0 disables it
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # Serialized responses of the read-heavy list endpoints, invalidated on writes; the TTL
+    # only bounds staleness from writes made outside the API. 0 bytes disables it
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+
+    # Dump the list endpoints' read rows with orjson instead of validating them through
+    # the response schema
+    FAST_JSON: bool = False
+
+    # Per-request statement count and DB time, sent as a Server-Timing header and logged
+    # at DEBUG; a statement shape run this many times in one request is logged as an N+1
+    SQL_STATS: bool = True
+    SQL_REPEAT_WARNING: int = 10
+
+    # Prometheus /metrics. Each worker writes its snapshot this often to a directory shared
+    # by the workers; an empty directory means one next to the worker bus sockets
+    METRICS_ENABLED: bool = True
+    METRICS_DIR: str = ""
+    METRICS_FLUSH_SECONDS: float = 1.0
+
+    # Request profiling: admins trigger it with an "X-Profile: 1" header, and this fraction
+    # of all requests is profiled regardless. Profiles go to PROFILE_DIR (empty means next
+    # to the worker bus sockets), newest PROFILE_KEEP kept
+    PROFILING_ENABLED: bool = True
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL_MS: float = 5.0
+    PROFILE_DIR: str = ""
+    PROFILE_KEEP: int = 100
+
+    # bcrypt process pool; 0 workers hashes inline in the request thread
+    HASH_POOL_WORKERS: int = 2
+    HASH_QUEUE_SIZE: int = 16
+
+    # Calibrate the bcrypt cost at startup to this verify latency; 0 keeps passlib's default
+    BCRYPT_TARGET_MS: int = 100
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_MAX_ROUNDS: int = 15
+
+    # The change feed only reports rows older than this, so a write whose timestamp was
+    # taken before a poll but committed after it is not skipped
+    CHANGE_FEED_LAG_MS: int = 1000
+
+    # Live project events: a subscriber this many events behind is dropped, and idle
+    # streams get a keep-alive this often
+    EVENT_QUEUE_SIZE: int = 256
+    EVENT_HEARTBEAT_SECONDS: int = 15
+
+    # Unix-socket bus that carries invalidations and events between workers on one host.
+    # An empty directory means one under the system temp dir, shared per DATABASE_URL
+    WORKER_BUS_ENABLED: bool = True
+    WORKER_BUS_DIR: str = ""
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
     @property
     def cors_origins_list(self) -> list[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
+    @property
+    def async_database_url(self) -> str:
+        """DATABASE_URL rewritten to use the asyncio driver for its dialect"""
+        return async_url(self.DATABASE_URL)
+
+    @property
+    def read_replica_urls(self) -> list[str]:
+        return [url.strip() for url in self.READ_REPLICA_URLS.split(",") if url.strip()]
+
+    @property
+    def shard_urls(self) -> list[str]:
+        return [url.strip() for url in self.SHARD_URLS.split(",") if url.strip()]
+
+
+def async_url(url: str) -> str:
+    """``url`` rewritten to use the asyncio driver for its dialect"""
+    drivers = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+    scheme, sep, rest = url.partition("://")
+    return f"{drivers.get(scheme, scheme)}{sep}{rest}"
+
 
 settings = Settings()
@@ -1,23 +1,298 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
-from app.config import settings
+import random
+from itertools import chain
+from fastapi import Request
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, SessionTransaction, sessionmaker
+from app.config import async_url, settings
+from app.utils.replicas import read_your_writes, sqlite_path
+from app.utils.sql_stats import instrument
+
+# Requests that only read, and so may be served from a read replica
+SAFE_METHODS = frozenset({"GET", "HEAD"})
+
+# Name the global database is attached under on shard connections
+GLOBAL_SCHEMA = "global_db"
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(
+def sqlite_production_mode(url: str) -> bool:
+    """Whether ``url`` gets the SQLite production profile; it needs a database file"""
+    parsed = make_url(url)
+    return (
+        settings.SQLITE_PRODUCTION
+        and parsed.get_backend_name() == "sqlite"
+        and parsed.database not in (None, "", ":memory:")
+    )
+
+
+def apply_sqlite_pragmas(engine: Engine, read_only: bool = False) -> None:
+    """Put every new connection of ``engine`` in WAL mode with the tuned pragmas"""
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+            cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_BYTES}")
+            cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_KB}")
+            if read_only:
+                cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+
+
+def create_engines(url: str, create=create_engine, **kwargs) -> tuple:
+    """The primary engine for ``url`` and, in SQLite production mode, a reader engine.
+
+    In that mode the primary holds a single connection, so writers wait in its
+    pool's queue (up to SQLITE_WRITE_TIMEOUT_SECONDS) instead of contending for
+    the database lock, and the reader pools SQLITE_READ_POOL_SIZE query_only
+    connections, which WAL lets read alongside the writer. Otherwise the reader
+    is None. ``create`` is create_engine or create_async_engine.
+    """
+    if not sqlite_production_mode(url):
+        return create(url, **kwargs), None
+    pool_timeout = settings.SQLITE_WRITE_TIMEOUT_SECONDS
+    writer = create(url, pool_size=1, max_overflow=0, pool_timeout=pool_timeout, **kwargs)
+    reader = create(
+        url, pool_size=settings.SQLITE_READ_POOL_SIZE, max_overflow=0,
+        pool_timeout=pool_timeout, **kwargs,
+    )
+    apply_sqlite_pragmas(getattr(writer, "sync_engine", writer))
+    apply_sqlite_pragmas(getattr(reader, "sync_engine", reader), read_only=True)
+    return writer, reader
+
+
+def create_replica_engines(urls: list[str], create=create_engine, **kwargs) -> list:
+    """One engine per read replica URL, tuned like the reader in SQLite production mode"""
+    replicas = []
+    for url in urls:
+        if sqlite_production_mode(url):
+            replica = create(
+                url, pool_size=settings.SQLITE_READ_POOL_SIZE, max_overflow=0,
+                pool_timeout=settings.SQLITE_WRITE_TIMEOUT_SECONDS, **kwargs,
+            )
+            apply_sqlite_pragmas(getattr(replica, "sync_engine", replica), read_only=True)
+        else:
+            replica = create(url, **kwargs)
+        replicas.append(replica)
+    return replicas
+
+
+def attach_database(engine: Engine, path: str, name: str = GLOBAL_SCHEMA) -> None:
+    """ATTACH the SQLite file ``path`` as ``name`` on every new connection of ``engine``"""
+
+    @event.listens_for(engine, "connect")
+    def attach(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"ATTACH DATABASE ? AS {name}", (path,))
+        finally:
+            cursor.close()
+
+
+def create_shard_engines(urls: list[str], global_url: str, create=create_engine, **kwargs) -> list:
+    """A (writer, reader) pair per shard URL, as create_engines returns for each.
+
+    Every shard connection attaches the global database, where the users live,
+    so queries that join tasks to their assignees still run on one connection.
+    """
+    if not urls:
+        return []
+    global_path = sqlite_path(global_url)
+    if global_path is None:
+        raise ValueError("SHARD_URLS needs a SQLite file as DATABASE_URL")
+    shards = []
+    for url in urls:
+        pair = create_engines(url, create=create, **kwargs)
+        for shard_engine in pair:
+            if shard_engine is not None:
+                attach_database(getattr(shard_engine, "sync_engine", shard_engine), global_path)
+        shards.append(pair)
+    return shards
+
+
+class RoutingSession(Session):
+    """Reads through ``reader`` when one is set, or a replica when allowed.
+
+    Writes (flushes and DML statements) go to the session's bind, and so does
+    everything after the first write until the transaction ends, so a
+    transaction reads its own changes. A session marked with
+    ``info["replica"]`` (see get_db) reads from one of ``replicas`` instead,
+    unless its ``info["user_id"]`` wrote within READ_YOUR_WRITES_SECONDS.
+
+    A session routed to a shard (``info["shard"]``, see app.utils.shards)
+    uses that shard's (writer, reader) pair from ``shards`` the same way.
+    """
+
+    def __init__(
+        self, *args, reader: Engine | None = None, replicas=(), shards=(), **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.reader = reader
+        self.replicas = tuple(replicas)
+        self.shards = tuple(shards)
+        self._replica: Engine | None = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or (clause is not None and clause.is_dml):
+            self.info["writing"] = True
+        shard = self.info.get("shard")
+        if shard is not None and self.shards:
+            writer, reader = self.shards[shard]
+            return writer if reader is None or self.info.get("writing") else reader
+        if self.info.get("writing"):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        if (
+            self.replicas
+            and self.info.get("replica")
+            and not read_your_writes.sticky(self.info.get("user_id"))
+        ):
+            if self._replica is None:
+                # One replica per session, so its reads share a snapshot
+                self._replica = random.choice(self.replicas)
+            return self._replica
+        if self.reader is None:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return self.reader
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _end_writing(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("writing", None)
+
+
+engine, read_engine = create_engines(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+replica_engines = create_replica_engines(
+    settings.read_replica_urls,
+    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
+)
+
+shard_engines = create_shard_engines(
+    settings.shard_urls, settings.DATABASE_URL, connect_args={"check_same_thread": False}
+)
+
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=RoutingSession,
+    reader=read_engine,
+    replicas=replica_engines,
+    shards=shard_engines,
+)
+for _engine in (engine, read_engine, *replica_engines, *chain(*shard_engines)):
+    if _engine is not None:
+        instrument(_engine)
+
+# Async engine used when settings.ASYNC_DB is enabled. Objects are not expired on
+# commit because lazy attribute refreshes are not possible outside a greenlet.
+async_engine, async_read_engine = create_engines(
+    settings.async_database_url, create=create_async_engine
+)
+async_replica_engines = create_replica_engines(
+    [async_url(url) for url in settings.read_replica_urls], create=create_async_engine
+)
+async_shard_engines = create_shard_engines(
+    [async_url(url) for url in settings.shard_urls], settings.DATABASE_URL,
+    create=create_async_engine,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    reader=async_read_engine.sync_engine if async_read_engine is not None else None,
+    replicas=[replica.sync_engine for replica in async_replica_engines],
+    shards=[
+        (writer.sync_engine, reader.sync_engine if reader is not None else None)
+        for writer, reader in async_shard_engines
+    ],
+    autoflush=False,
+    expire_on_commit=False,
+)
+for _engine in (
+    async_engine, async_read_engine, *async_replica_engines, *chain(*async_shard_engines)
+):
+    if _engine is not None:
+        instrument(_engine.sync_engine)
+
+
+# The RETURNING row already carries the new state, so skip the ORM's
+# synchronize step (which evaluates the WHERE clause per call) and refresh any
+# copy of the object already in the session from that row instead.
+RETURNING_OPTIONS = {"synchronize_session": False, "populate_existing": True}
+
 
+def commit_returning(db: Session, statement):
+    """Execute an INSERT/UPDATE ... RETURNING <entity>, commit, and return the entity.
 
-def get_db():
+    The object is detached before the commit so it keeps the values RETURNING
+    produced instead of being expired and re-SELECTed on first access.
+    Returns None when an UPDATE matched no row.
+    """
+    obj = db.scalar(statement, execution_options=RETURNING_OPTIONS)
+    if obj is not None:
+        db.expunge(obj)
+    db.commit()
+    return obj
+
+
+async def commit_returning_async(db: AsyncSession, statement):
+    """Async counterpart of commit_returning; AsyncSession never expires on commit"""
+    obj = await db.scalar(statement, execution_options=RETURNING_OPTIONS)
+    await db.commit()
+    return obj
+
+
+def route_to_user(db: Session | AsyncSession, user_id: int) -> None:
+    """Tell ``db``'s routing which user it serves.
+
+    In a request that may write, this also keeps the user's reads off the
+    replicas for READ_YOUR_WRITES_SECONDS.
+    """
+    db.info["user_id"] = user_id
+    if _has_replicas(db) and not db.info.get("replica"):
+        read_your_writes.wrote(user_id)
+
+
+def _has_replicas(db: Session | AsyncSession) -> bool:
+    return bool(getattr(getattr(db, "sync_session", db), "replicas", ()))
+
+
+def _finish_request(db: Session | AsyncSession) -> None:
+    # Restart the window once the writes are in, in case the request ran long
+    user_id = db.info.get("user_id")
+    if user_id is not None and _has_replicas(db) and not db.info.get("replica"):
+        read_your_writes.wrote(user_id)
+
+
+def get_db(request: Request = None):
     db = SessionLocal()
+    db.info["replica"] = request is not None and request.method in SAFE_METHODS
     try:
         yield db
     finally:
+        _finish_request(db)
         db.close()
+
+
+async def get_async_db(request: Request = None):
+    async with AsyncSessionLocal() as db:
+        db.info["replica"] = request is not None and request.method in SAFE_METHODS
+        try:
+            yield db
+        finally:
+            _finish_request(db)
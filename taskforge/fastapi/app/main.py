@@ -1,7 +1,64 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from fastapi.exception_handlers import http_exception_handler
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
-from app.routers import auth, projects, tasks, comments
+from app.utils.bus import default_bus_directory, worker_bus
+from app.utils.events import close_streams_on_exit
+from app.utils.exceptions import NotFoundException, ServiceUnavailableException
+from app.utils.group_commit import group_committer
+from app.utils.hashing import password_hasher
+from app.utils.metrics import (
+    MetricsMiddleware,
+    default_metrics_directory,
+    metrics,
+    render,
+)
+from app.utils.profiling import ProfilingMiddleware
+from app.utils.replicas import replica_refresher
+from app.utils.shards import PROJECT_MOVED
+from app.utils.sql_stats import QueryStatsMiddleware
+
+if settings.ASYNC_DB:
+    from app.routers.aio import auth, projects, tasks, comments, changes
+else:
+    from app.routers import auth, projects, tasks, comments, changes
+from app.routers import diagnostics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.BCRYPT_TARGET_MS > 0 and password_hasher.rounds is None:
+        # Calibrated once per host, so every worker settles on the same cost
+        await run_in_threadpool(
+            password_hasher.calibrate,
+            settings.BCRYPT_TARGET_MS,
+            settings.BCRYPT_MIN_ROUNDS,
+            settings.BCRYPT_MAX_ROUNDS,
+            os.path.join(settings.WORKER_BUS_DIR or default_bus_directory(), "bcrypt-rounds"),
+        )
+    if settings.WORKER_BUS_ENABLED:
+        worker_bus.start(settings.WORKER_BUS_DIR or default_bus_directory())
+    if settings.METRICS_ENABLED:
+        metrics.start(settings.METRICS_DIR or default_metrics_directory())
+    if settings.READ_REPLICA_URLS:
+        await run_in_threadpool(
+            replica_refresher.start,
+            settings.DATABASE_URL,
+            settings.read_replica_urls,
+            settings.REPLICA_REFRESH_SECONDS,
+        )
+    close_streams_on_exit()
+    yield
+    replica_refresher.stop()
+    group_committer.stop()
+    metrics.stop()
+    worker_bus.stop()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title="TaskForge API",
@@ -9,6 +66,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -18,13 +76,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "X-Profile-Id"],
 )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(auth.router)
 app.include_router(projects.router)
 app.include_router(tasks.router)
 app.include_router(comments.router)
+app.include_router(changes.router)
+app.include_router(diagnostics.router)
+
+
+@app.exception_handler(IntegrityError)
+async def project_moved_handler(request: Request, exc: IntegrityError):
+    """A write that reached a project's old shard during a move; retrying routes it anew"""
+    if PROJECT_MOVED not in str(exc.orig):
+        raise exc
+    return await http_exception_handler(
+        request, ServiceUnavailableException("Project is moving between shards, retry shortly")
+    )
 
 
 @app.get("/")
@@ -35,3 +109,12 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition of every running worker's metrics"""
+    if not settings.METRICS_ENABLED:
+        raise NotFoundException("Metrics are disabled")
+    metrics.watch_threadpool()
+    return Response(render(metrics.collect()), media_type="text/plain; version=0.0.4")
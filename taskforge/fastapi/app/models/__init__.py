@@ -3,5 +3,10 @@ from app.models.project import Project
 from app.models.task import Task
 from app.models.comment import Comment
 from app.models.label import Label, TaskLabel
+from app.models.tombstone import Tombstone
+from app.models.shard import IdBlock, ProjectShard
 
-__all__ = ["User", "Project", "Task", "Comment", "Label", "TaskLabel"]
+__all__ = [
+    "User", "Project", "Task", "Comment", "Label", "TaskLabel", "Tombstone",
+    "ProjectShard", "IdBlock",
+]
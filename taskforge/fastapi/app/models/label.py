@@ -1,4 +1,5 @@
-from sqlalchemy import String, ForeignKey, Table, Column, Integer
+from datetime import datetime
+from sqlalchemy import String, DateTime, ForeignKey, Table, Column, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
@@ -9,16 +10,26 @@ TaskLabel = Table(
     Base.metadata,
     Column("task_id", Integer, ForeignKey("tasks.id"), primary_key=True),
     Column("label_id", Integer, ForeignKey("labels.id"), primary_key=True),
+    # The primary key covers lookups by task; this covers lookups by label
+    Index("ix_task_labels_label_id_task_id", "label_id", "task_id"),
 )
 
 
 class Label(Base):
     __tablename__ = "labels"
+    __table_args__ = (
+        Index("ix_labels_project_id", "project_id"),
+        # Change feed range scans
+        Index("ix_labels_updated_at_id", "updated_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     color: Mapped[str] = mapped_column(String(7), nullable=False)  # Hex color code
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
 
     # Relationships
     project: Mapped["Project"] = relationship("Project", back_populates="labels")
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, Text, DateTime, Enum, ForeignKey
+from sqlalchemy import String, Text, DateTime, Enum, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 import enum
@@ -12,6 +12,8 @@ class ProjectStatus(str, enum.Enum):
 
 class Project(Base):
     __tablename__ = "projects"
+    # Owner lookups and the change feed's per-owner (updated_at, id) range scans
+    __table_args__ = (Index("ix_projects_owner_updated_at", "owner_id", "updated_at", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -0,0 +1,23 @@
+from datetime import datetime
+from sqlalchemy import String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class ProjectShard(Base):
+    """A project moved off its default shard (project_id % shard count)"""
+
+    __tablename__ = "project_shards"
+
+    project_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    shard: Mapped[int] = mapped_column(nullable=False)
+    moved_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class IdBlock(Base):
+    """The next id not yet handed out for a sharded table, so ids are unique across shards"""
+
+    __tablename__ = "id_blocks"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    next_id: Mapped[int] = mapped_column(nullable=False)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, Text, DateTime, Enum, ForeignKey
+from sqlalchemy import String, Text, DateTime, Enum, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 import enum
@@ -20,6 +20,16 @@ class TaskPriority(str, enum.Enum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Keyset pagination over (updated_at, id), per project and per filter
+        Index("ix_tasks_updated_at_id", "updated_at", "id"),
+        Index("ix_tasks_project_updated_at", "project_id", "updated_at", "id"),
+        Index("ix_tasks_project_status_updated_at", "project_id", "status", "updated_at", "id"),
+        Index(
+            "ix_tasks_project_priority_updated_at", "project_id", "priority", "updated_at", "id"
+        ),
+        Index("ix_tasks_assignee_updated_at", "assignee_id", "updated_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
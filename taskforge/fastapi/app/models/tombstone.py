@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class Tombstone(Base):
+    """A deleted row, kept so the change feed can report deletions"""
+
+    __tablename__ = "tombstones"
+    __table_args__ = (Index("ix_tombstones_owner_deleted_at", "owner_id", "deleted_at", "id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    entity_type: Mapped[str] = mapped_column(String(20), nullable=False)  # "project" or "task"
+    entity_id: Mapped[int] = mapped_column(nullable=False)
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,58 @@
+"""
+Shard administration for SHARD_URLS deployments.
+Run with:
+    python -m app.rebalance init                       create the global and shard tables
+    python -m app.rebalance status                     projects and tasks per shard
+    python -m app.rebalance move <project_id> <shard>  move a project while the API serves it
+"""
+import argparse
+import asyncio
+import sys
+from app.config import settings
+from app.utils.bus import default_bus_directory, worker_bus
+from app.utils.shards import create_schemas, move_project, shard_counts, shard_set
+
+
+async def _move_announced(project_id: int, target: int) -> dict:
+    # Join the worker bus, so running workers switch to the new shard right away
+    # instead of when their copy of the shard map expires
+    if settings.WORKER_BUS_ENABLED:
+        worker_bus.start(settings.WORKER_BUS_DIR or default_bus_directory())
+    try:
+        return await asyncio.to_thread(move_project, project_id, target)
+    finally:
+        worker_bus.stop()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage the project shards")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("init", help="create the global and shard tables")
+    commands.add_parser("status", help="projects and tasks per shard")
+    move = commands.add_parser("move", help="move a project to another shard")
+    move.add_argument("project_id", type=int)
+    move.add_argument("shard", type=int)
+    args = parser.parse_args(argv)
+
+    if not shard_set.enabled:
+        sys.exit("SHARD_URLS is not set")
+    if args.command == "init":
+        create_schemas()
+        print(f"Created the tables on {len(shard_set.binds)} shards")
+    elif args.command == "status":
+        for counts in shard_counts():
+            print(f"shard {counts['shard']}: {counts['projects']} projects, "
+                  f"{counts['tasks']} tasks")
+    else:
+        try:
+            stats = asyncio.run(_move_announced(args.project_id, args.shard))
+        except ValueError as exc:
+            sys.exit(str(exc))
+        print(f"Project {stats['project_id']}: shard {stats['source']} -> {stats['target']}")
+        if stats["source"] != stats["target"]:
+            print(f"{stats['copied']} rows copied, then {stats['recopied']} copied and "
+                  f"{stats['pruned']} pruned with the source locked for {stats['locked_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Async routers package (used when settings.ASYNC_DB is enabled)
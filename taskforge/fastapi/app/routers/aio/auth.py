@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.schemas.user import UserCreate, UserLogin, Token, User as UserSchema
+from app.services.aio.auth_service import register_user, authenticate_user
+from app.services.auth_service import generate_token
+from app.utils.security import get_current_user_async
+from app.models.user import User
+
+router = APIRouter(prefix="/api/auth", tags=["auth"])
+
+
+@router.post("/register", response_model=UserSchema)
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """Register a new user"""
+    return await register_user(db, user_data)
+
+
+@router.post("/login", response_model=Token)
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    """Login and get access token"""
+    user = await authenticate_user(db, credentials.email, credentials.password)
+    access_token = generate_token(user)
+    return Token(
+        access_token=access_token, token_type="bearer", user=UserSchema.model_validate(user)
+    )
+
+
+@router.get("/me", response_model=UserSchema)
+async def get_me(current_user: User = Depends(get_current_user_async)):
+    """Get current user"""
+    return current_user
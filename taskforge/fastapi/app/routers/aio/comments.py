@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.schemas.comment import Comment, CommentCreate
+from app.models.comment import Comment as CommentModel
+from app.services.aio.task_service import get_task
+from app.utils.security import get_current_user_async
+from app.models.user import User
+from app.services.fingerprint_service import get_comments_fingerprint
+from app.services.read_service import get_comment_rows
+from app.utils.bus import invalidate
+from app.utils.conditional import etag_matches, make_etag, not_modified
+from app.utils.events import publish_comment_created
+from app.utils.group_commit import commit_returning_grouped_async
+from app.utils.response_cache import response_cache
+from app.utils.exceptions import NotFoundException, ForbiddenException
+from app.utils.shards import new_id_async
+
+router = APIRouter(prefix="/api/tasks", tags=["comments"])
+
+
+@router.get("/{task_id}/comments", response_model=list[Comment])
+async def get_task_comments(
+    task_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get all comments for a task"""
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    fingerprint = await db.run_sync(get_comments_fingerprint, task_id, current_user)
+    etag = make_etag(current_user.id, fingerprint)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    task = await get_task(db, task_id, current_user)
+    tags, headers = [f"task:{task_id}", f"project:{task.project_id}"], {"ETag": etag}
+    comments = await db.run_sync(get_comment_rows, task_id)
+    return cached.respond_rows(comments, list[Comment], tags, headers)
+
+
+@router.post("/{task_id}/comments", response_model=Comment, status_code=status.HTTP_201_CREATED)
+async def create_task_comment(
+    task_id: int,
+    comment_data: CommentCreate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Add a comment to a task"""
+    try:
+        task = await get_task(db, task_id, current_user)
+    except NotFoundException:
+        raise ForbiddenException("Access denied")
+    project_id = task.project_id
+
+    comment_id = await new_id_async(db, "comments")
+    comment = await commit_returning_grouped_async(
+        db,
+        insert(CommentModel)
+        .values(
+            content=comment_data.content, task_id=task_id, author_id=current_user.id,
+            **comment_id,
+        )
+        .returning(CommentModel),
+    )
+    invalidate(("task", task_id))
+    publish_comment_created(project_id, comment)
+    return comment
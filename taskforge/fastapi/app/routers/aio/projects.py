@@ -0,0 +1,215 @@
+from fastapi import (
+    APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, WebSocket, status
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import commit_returning_async, get_async_db
+from app.schemas.project import Project, ProjectCreate, ProjectUpdate
+from app.schemas.label import Label, LabelCreate
+from app.schemas.task import TaskImportSummary
+from app.services.aio.project_service import (
+    get_project,
+    create_project,
+    update_project,
+    delete_project,
+)
+from app.services.aio.export_service import export_project
+from app.services.fingerprint_service import (
+    get_labels_fingerprint,
+    get_project_fingerprint,
+    get_projects_fingerprint,
+)
+from app.services.read_service import get_project_rows
+from app.services.export_service import EXPORT_MEDIA_TYPES, ExportFormat
+from app.services.import_service import detect_import_format, import_tasks
+from app.utils.bus import invalidate
+from app.utils.conditional import etag_matches, make_etag, not_modified
+from app.utils.events import EventStreamResponse, event_broker, pump_websocket
+from app.utils.response_cache import response_cache
+from app.utils.security import get_current_user_async
+from app.models.user import User
+from app.models.label import Label as LabelModel
+from app.utils.shards import new_id_async, use_project_async
+
+router = APIRouter(prefix="/api/projects", tags=["projects"])
+
+
+@router.get("", response_model=list[Project])
+async def list_projects(
+    request: Request,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """List all projects for current user"""
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    etag = make_etag(current_user.id, await db.run_sync(get_projects_fingerprint, current_user))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    tags, headers = [f"owner:{current_user.id}"], {"ETag": etag}
+    projects = await db.run_sync(get_project_rows, current_user)
+    return cached.respond_rows(projects, list[Project], tags, headers)
+
+
+@router.post("", response_model=Project, status_code=status.HTTP_201_CREATED)
+async def create_new_project(
+    project_data: ProjectCreate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Create a new project"""
+    return await create_project(db, project_data, current_user)
+
+
+@router.get("/{project_id}", response_model=Project)
+async def get_project_by_id(
+    project_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a specific project"""
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    fingerprint = await db.run_sync(get_project_fingerprint, project_id, current_user)
+    etag = make_etag(current_user.id, fingerprint)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    project = await get_project(db, project_id, current_user)
+    return cached.respond(project, Project, tags=[f"project:{project_id}"], headers={"ETag": etag})
+
+
+@router.put("/{project_id}", response_model=Project)
+async def update_project_by_id(
+    project_id: int,
+    project_data: ProjectUpdate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Update a project"""
+    return await update_project(db, project_id, project_data, current_user)
+
+
+@router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_project_by_id(
+    project_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Delete a project"""
+    await delete_project(db, project_id, current_user)
+    return None
+
+
+@router.get("/{project_id}/export")
+async def export_project_by_id(
+    project_id: int,
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Stream a project's tasks with their labels and comments as NDJSON or CSV"""
+    chunks = await export_project(db, project_id, current_user, export_format)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="project-{project_id}.{export_format}"'
+        },
+    )
+
+
+@router.post("/{project_id}/import", response_model=TaskImportSummary)
+async def import_project_tasks(
+    project_id: int,
+    file: UploadFile = File(...),
+    import_format: ExportFormat | None = Query(None, alias="format"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Import tasks from an NDJSON or CSV upload"""
+    import_format = detect_import_format(file.filename, import_format)
+    return await db.run_sync(import_tasks, project_id, file.file, import_format, current_user)
+
+
+@router.get("/{project_id}/events")
+async def stream_project_events(
+    project_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Stream task and comment changes in a project as Server-Sent Events"""
+    await get_project(db, project_id, current_user)
+    # The stream may stay open for hours; don't hold a pooled connection for it
+    await db.close()
+    subscription = event_broker.subscribe(project_id)
+    return EventStreamResponse(subscription)
+
+
+@router.websocket("/{project_id}/events/ws")
+async def project_events_socket(
+    websocket: WebSocket,
+    project_id: int,
+    token: str = Query(...),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Stream task and comment changes in a project over a WebSocket.
+
+    Browsers cannot set headers on a WebSocket, so the bearer token is passed as ``?token=``.
+    """
+    try:
+        current_user = await get_current_user_async(token, db)
+        await get_project(db, project_id, current_user)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    finally:
+        await db.close()
+    subscription = event_broker.subscribe(project_id)
+    await websocket.accept()
+    await pump_websocket(websocket, subscription)
+
+
+@router.get("/{project_id}/labels", response_model=list[Label])
+async def get_project_labels(
+    project_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get labels for a project"""
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    fingerprint = await db.run_sync(get_labels_fingerprint, project_id, current_user)
+    etag = make_etag(current_user.id, fingerprint)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    await get_project(db, project_id, current_user)
+    labels = await db.scalars(select(LabelModel).where(LabelModel.project_id == project_id))
+    return cached.respond(
+        labels.all(), list[Label], tags=[f"project:{project_id}"], headers={"ETag": etag}
+    )
+
+
+@router.post("/{project_id}/labels", response_model=Label, status_code=status.HTTP_201_CREATED)
+async def create_project_label(
+    project_id: int,
+    label_data: LabelCreate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Create a label for a project"""
+    await use_project_async(db, project_id)
+    label_id = await new_id_async(db, "labels")
+    label = await commit_returning_async(
+        db,
+        insert(LabelModel)
+        .values(**label_data.model_dump(), project_id=project_id, **label_id)
+        .returning(LabelModel),
+    )
+    invalidate(("project", project_id))
+    return label
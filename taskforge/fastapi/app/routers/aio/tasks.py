@@ -0,0 +1,182 @@
+from typing import Any
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.models.task import TaskStatus, TaskPriority
+from app.schemas.task import (
+    Task,
+    TaskBatchCreate,
+    TaskBatchDelete,
+    TaskBatchResult,
+    TaskBatchUpdate,
+    TaskCreate,
+    TaskUpdate,
+)
+from app.services.aio.task_service import (
+    get_task,
+    create_task,
+    update_task,
+    delete_task,
+)
+from app.services.read_service import (
+    TASK_EXPANSIONS,
+    TASK_FIELDS,
+    get_task_fieldset,
+    get_task_rows,
+    get_task_rows_page,
+)
+from app.services.task_service import create_tasks_batch, update_tasks_batch, delete_tasks_batch
+from app.services.fingerprint_service import get_task_fingerprint, get_tasks_fingerprint
+from app.utils.conditional import etag_matches, make_etag, not_modified
+from app.utils.security import get_current_user_async
+from app.models.user import User
+from app.utils.fieldsets import parse_fieldset
+from app.utils.response_cache import bypass_response, response_cache
+
+router = APIRouter(prefix="/api/tasks", tags=["tasks"])
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+@router.get("", response_model=list[Task])
+async def list_tasks(
+    request: Request,
+    project_id: int | None = Query(None),
+    status_filter: TaskStatus | None = Query(None, alias="status"),
+    priority: TaskPriority | None = Query(None),
+    assignee_id: int | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    fields: str | None = Query(None, description="Comma-separated task fields to return"),
+    expand: str | None = Query(
+        None, description="Comma-separated relations to add: labels, assignee, comment_count"
+    ),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """List tasks, optionally filtered.
+
+    Passing ``limit`` or ``cursor`` switches to keyset pagination, newest first;
+    the cursor for the next page is returned in the ``X-Next-Cursor`` header.
+    ``fields`` narrows each task to the listed fields and ``expand`` adds
+    ``labels``, ``assignee`` and/or ``comment_count`` to it.
+    """
+    fieldset = parse_fieldset(fields, TASK_FIELDS, "fields")
+    expansions = parse_fieldset(expand, TASK_EXPANSIONS, "expand")
+    page_size = None if limit is None and cursor is None else limit or DEFAULT_PAGE_SIZE
+    filters = dict(
+        project_id=project_id, status=status_filter, priority=priority, assignee_id=assignee_id
+    )
+    if expansions:
+        # Labels, users and comments are outside the list's fingerprint and cache
+        # tags, so expanded lists are neither cached nor answered with a 304
+        tasks, next_cursor = await db.run_sync(
+            get_task_fieldset, current_user, fieldset, expansions, page_size, cursor, **filters
+        )
+        return bypass_response(tasks, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    # Without a project filter the list spans all of the user's projects
+    tags = [f"project:{project_id}" if project_id is not None else f"owner:{current_user.id}"]
+    fingerprint = await db.run_sync(get_tasks_fingerprint, current_user, **filters)
+    etag = make_etag(current_user.id, (*fingerprint, *fieldset))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response_type = list[dict[str, Any]] if fieldset else list[Task]
+    if fieldset:
+        tasks, next_cursor = await db.run_sync(
+            get_task_fieldset, current_user, fieldset, (), page_size, cursor, **filters
+        )
+    elif page_size is None:
+        tasks, next_cursor = await db.run_sync(get_task_rows, current_user, **filters), None
+    else:
+        tasks, next_cursor = await db.run_sync(
+            get_task_rows_page, current_user, page_size, cursor, **filters
+        )
+    headers = {"ETag": etag}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return cached.respond_rows(tasks, response_type, tags, headers)
+
+
+@router.post("", response_model=Task, status_code=status.HTTP_201_CREATED)
+async def create_new_task(
+    task_data: TaskCreate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Create a new task"""
+    return await create_task(db, task_data, current_user)
+
+
+@router.get("/{task_id}", response_model=Task)
+async def get_task_by_id(
+    task_id: int,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a specific task"""
+    fingerprint = await db.run_sync(get_task_fingerprint, task_id, current_user)
+    etag = make_etag(current_user.id, fingerprint)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return await get_task(db, task_id, current_user)
+
+
+@router.put("/{task_id}", response_model=Task)
+async def update_task_by_id(
+    task_id: int,
+    task_data: TaskUpdate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Update a task"""
+    return await update_task(db, task_id, task_data, current_user)
+
+
+@router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_task_by_id(
+    task_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Delete a task"""
+    await delete_task(db, task_id, current_user)
+    return None
+
+
+@router.post(":batch", response_model=TaskBatchResult)
+async def create_tasks_in_batch(
+    batch: TaskBatchCreate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Create many tasks in a single transaction, with a result per item"""
+    # Bulk writes are shared with the sync service through run_sync
+    return await db.run_sync(create_tasks_batch, batch.items, current_user)
+
+
+@router.put(":batch", response_model=TaskBatchResult)
+async def update_tasks_in_batch(
+    batch: TaskBatchUpdate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Update many tasks in a single transaction, with a result per item"""
+    return await db.run_sync(update_tasks_batch, batch.items, current_user)
+
+
+@router.delete(":batch", response_model=TaskBatchResult)
+async def delete_tasks_in_batch(
+    batch: TaskBatchDelete,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Delete many tasks in a single transaction, with a result per item"""
+    return await db.run_sync(delete_tasks_batch, batch.ids, current_user)
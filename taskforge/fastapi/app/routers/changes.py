@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models.user import User
+from app.schemas.change import ChangeFeed
+from app.services.change_service import get_changes
+from app.utils.security import get_current_user
+
+router = APIRouter(prefix="/api/changes", tags=["changes"])
+
+DEFAULT_FEED_LIMIT = 500
+MAX_FEED_LIMIT = 1000
+
+
+@router.get("", response_model=ChangeFeed)
+def list_changes(
+    since: str | None = Query(None, description="Cursor from the previous response"),
+    limit: int = Query(DEFAULT_FEED_LIMIT, ge=1, le=MAX_FEED_LIMIT),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Projects, tasks, comments and labels changed or deleted since a cursor"""
+    return get_changes(db, current_user, since, limit)
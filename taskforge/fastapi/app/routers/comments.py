@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import insert
 from app.database import get_db
 from app.schemas.comment import Comment, CommentCreate
 from app.models.comment import Comment as CommentModel
@@ -8,7 +8,15 @@ from app.models.task import Task
 from app.models.project import Project
 from app.utils.security import get_current_user
 from app.models.user import User
+from app.services.fingerprint_service import get_comments_fingerprint
+from app.services.read_service import get_comment_rows
+from app.utils.bus import invalidate
+from app.utils.conditional import etag_matches, make_etag, not_modified
+from app.utils.events import publish_comment_created
+from app.utils.group_commit import commit_returning_grouped
+from app.utils.response_cache import response_cache
 from app.utils.exceptions import NotFoundException, ForbiddenException
+from app.utils.shards import new_id, use_task
 
 router = APIRouter(prefix="/api/tasks", tags=["comments"])
 
@@ -16,9 +24,18 @@ router = APIRouter(prefix="/api/tasks", tags=["comments"])
 # Intentional inconsistency: Using raw SQL mixed with ORM
 @router.get("/{task_id}/comments", response_model=list[Comment])
 def get_task_comments(
-    task_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    task_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
     """Get all comments for a task"""
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    etag = make_etag(current_user.id, get_comments_fingerprint(db, task_id, current_user))
+    if etag_matches(request, etag):
+        return not_modified(etag)
     # Verify access using ORM
     task = (
         db.query(Task)
@@ -29,9 +46,8 @@ def get_task_comments(
     if not task:
         raise NotFoundException("Task not found")
 
-    # Get comments - intentionally using different query style
-    comments = db.scalars(select(CommentModel).where(CommentModel.task_id == task_id)).all()
-    return comments
+    tags, headers = [f"task:{task_id}", f"project:{task.project_id}"], {"ETag": etag}
+    return cached.respond_rows(get_comment_rows(db, task_id), list[Comment], tags, headers)
 
 
 # Intentional inconsistency: Sparse docstring and minimal error handling
@@ -43,6 +59,7 @@ def create_task_comment(
     db: Session = Depends(get_db),
 ):
     # Verify task exists and user has access
+    use_task(db, task_id)
     task = (
         db.query(Task)
         .join(Project)
@@ -52,10 +69,15 @@ def create_task_comment(
     if not task:
         raise ForbiddenException("Access denied")
 
-    comment = CommentModel(
-        content=comment_data.content, task_id=task_id, author_id=current_user.id
+    comment = commit_returning_grouped(
+        db,
+        insert(CommentModel)
+        .values(
+            content=comment_data.content, task_id=task_id, author_id=current_user.id,
+            **new_id("comments"),
+        )
+        .returning(CommentModel),
     )
-    db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    invalidate(("task", task_id))
+    publish_comment_created(task.project_id, comment)
     return comment
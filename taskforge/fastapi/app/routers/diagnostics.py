@@ -0,0 +1,85 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import FileResponse
+from passlib.hash import bcrypt
+from app.config import settings
+from app.models.user import User
+from app.utils.bus import worker_bus
+from app.utils.events import event_broker
+from app.utils.exceptions import NotFoundException
+from app.utils.group_commit import group_committer
+from app.utils.hashing import password_hasher
+from app.utils.profiling import profile_store
+from app.utils.replicas import replica_refresher
+from app.utils.response_cache import response_cache
+from app.utils.shards import shard_set
+from app.utils.security import get_current_admin
+
+router = APIRouter(prefix="/api/diagnostics", tags=["diagnostics"])
+
+
+@router.get("/hashing")
+def get_hashing_diagnostics(current_user: User = Depends(get_current_admin)):
+    """Report the calibrated bcrypt cost and hashing pool state"""
+    return {
+        "scheme": "bcrypt",
+        "rounds": password_hasher.rounds or bcrypt.default_rounds,
+        "calibrated": password_hasher.rounds is not None,
+        "target_ms": settings.BCRYPT_TARGET_MS,
+        "measured_ms": password_hasher.measured_ms,
+        "pool": password_hasher.stats(),
+    }
+
+
+@router.get("/events")
+def get_event_diagnostics(current_user: User = Depends(get_current_admin)):
+    """Report live event subscribers and delivery counters for this worker"""
+    return event_broker.stats()
+
+
+@router.get("/bus")
+def get_bus_diagnostics(current_user: User = Depends(get_current_admin)):
+    """Report this worker's view of the cross-worker bus"""
+    return worker_bus.stats()
+
+
+@router.get("/cache")
+def get_cache_diagnostics(current_user: User = Depends(get_current_admin)):
+    """Report this worker's response cache size and hit rate"""
+    return response_cache.stats()
+
+
+@router.get("/group-commit")
+def get_group_commit_diagnostics(current_user: User = Depends(get_current_admin)):
+    """Report whether group commit is on and how many statements each commit carried"""
+    return {
+        "enabled": settings.GROUP_COMMIT,
+        "window_ms": settings.GROUP_COMMIT_WINDOW_MS,
+        **group_committer.stats(),
+    }
+
+
+@router.get("/replicas")
+def get_replica_diagnostics(current_user: User = Depends(get_current_admin)):
+    """Report the read replicas and this worker's refreshes of local SQLite copies"""
+    return replica_refresher.stats()
+
+
+@router.get("/shards")
+def get_shard_diagnostics(current_user: User = Depends(get_current_admin)):
+    """Report the shards and this worker's fan-outs and task routing lookups"""
+    return shard_set.stats()
+
+
+@router.get("/profiles")
+def list_profiles(current_user: User = Depends(get_current_admin)):
+    """List stored request profiles, newest first"""
+    return profile_store.entries()
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, current_user: User = Depends(get_current_admin)):
+    """Download a profile as collapsed stacks, for flamegraph.pl or speedscope"""
+    path = profile_store.path(profile_id)
+    if path is None:
+        raise NotFoundException("Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.collapsed")
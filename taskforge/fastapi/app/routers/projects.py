@@ -1,28 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, WebSocket, status
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from app.database import get_db
+from starlette.concurrency import run_in_threadpool
+from app.database import commit_returning, get_db
 from app.schemas.project import Project, ProjectCreate, ProjectUpdate
 from app.schemas.label import Label, LabelCreate
+from app.schemas.task import TaskImportSummary
 from app.services.project_service import (
-    get_projects,
     get_project,
     create_project,
     update_project,
     delete_project,
 )
+from app.services.fingerprint_service import (
+    get_labels_fingerprint,
+    get_project_fingerprint,
+    get_projects_fingerprint,
+)
+from app.services.read_service import get_project_rows
+from app.services.export_service import EXPORT_MEDIA_TYPES, ExportFormat, export_project
+from app.services.import_service import detect_import_format, import_tasks
+from app.utils.bus import invalidate
+from app.utils.conditional import etag_matches, make_etag, not_modified
+from app.utils.events import EventStreamResponse, event_broker, pump_websocket
+from app.utils.response_cache import response_cache
 from app.utils.security import get_current_user
 from app.models.user import User
 from app.models.label import Label as LabelModel
+from app.utils.shards import new_id, use_project
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
 
 @router.get("", response_model=list[Project])
 def list_projects(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    request: Request, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
 ):
     """List all projects for current user"""
-    return get_projects(db, current_user)
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    etag = make_etag(current_user.id, get_projects_fingerprint(db, current_user))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    tags, headers = [f"owner:{current_user.id}"], {"ETag": etag}
+    projects = get_project_rows(db, current_user)
+    return cached.respond_rows(projects, list[Project], tags, headers)
 
 
 @router.post("", response_model=Project, status_code=status.HTTP_201_CREATED)
@@ -37,10 +63,20 @@ def create_new_project(
 
 @router.get("/{project_id}", response_model=Project)
 def get_project_by_id(
-    project_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    project_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
     """Get a specific project"""
-    return get_project(db, project_id, current_user)
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    etag = make_etag(current_user.id, get_project_fingerprint(db, project_id, current_user))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    project = get_project(db, project_id, current_user)
+    return cached.respond(project, Project, tags=[f"project:{project_id}"], headers={"ETag": etag})
 
 
 @router.put("/{project_id}", response_model=Project)
@@ -63,16 +99,103 @@ def delete_project_by_id(
     return None
 
 
+@router.get("/{project_id}/export")
+def export_project_by_id(
+    project_id: int,
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Stream a project's tasks with their labels and comments as NDJSON or CSV"""
+    chunks = export_project(db, project_id, current_user, export_format)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="project-{project_id}.{export_format}"'
+        },
+    )
+
+
+@router.post("/{project_id}/import", response_model=TaskImportSummary)
+def import_project_tasks(
+    project_id: int,
+    file: UploadFile = File(...),
+    import_format: ExportFormat | None = Query(None, alias="format"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Import tasks from an NDJSON or CSV upload"""
+    import_format = detect_import_format(file.filename, import_format)
+    return import_tasks(db, project_id, file.file, import_format, current_user)
+
+
+def _authorize_events(
+    db: Session, project_id: int, user: User | None = None, token: str | None = None
+) -> None:
+    """Check access to a project's events, then release the session.
+
+    Both happen in one threadpool call: the stream may stay open for hours, so
+    it must not keep a pooled connection, and releasing it must not have to
+    wait for a free thread.
+    """
+    try:
+        if user is None:
+            user = get_current_user(token, db)
+        get_project(db, project_id, user)
+    finally:
+        db.close()
+
+
+@router.get("/{project_id}/events")
+async def stream_project_events(
+    project_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+):
+    """Stream task and comment changes in a project as Server-Sent Events"""
+    await run_in_threadpool(_authorize_events, db, project_id, user=current_user)
+    subscription = event_broker.subscribe(project_id)
+    return EventStreamResponse(subscription)
+
+
+@router.websocket("/{project_id}/events/ws")
+async def project_events_socket(
+    websocket: WebSocket, project_id: int, token: str = Query(...), db: Session = Depends(get_db)
+):
+    """Stream task and comment changes in a project over a WebSocket.
+
+    Browsers cannot set headers on a WebSocket, so the bearer token is passed as ``?token=``.
+    """
+    try:
+        await run_in_threadpool(_authorize_events, db, project_id, token=token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    subscription = event_broker.subscribe(project_id)
+    await websocket.accept()
+    await pump_websocket(websocket, subscription)
+
+
 # Intentional inconsistency: inline logic instead of service layer
 @router.get("/{project_id}/labels", response_model=list[Label])
 def get_project_labels(
-    project_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    project_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
     """Get labels for a project"""
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    etag = make_etag(current_user.id, get_labels_fingerprint(db, project_id, current_user))
+    if etag_matches(request, etag):
+        return not_modified(etag)
     # Inline check without service layer
     project = get_project(db, project_id, current_user)
     labels = db.query(LabelModel).filter(LabelModel.project_id == project_id).all()
-    return labels
+    return cached.respond(
+        labels, list[Label], tags=[f"project:{project_id}"], headers={"ETag": etag}
+    )
 
 
 # Intentional inconsistency: minimal validation
@@ -85,8 +208,12 @@ def create_project_label(
 ):
     """Create a label for a project"""
     # Missing proper ownership check
-    label = LabelModel(**label_data.model_dump(), project_id=project_id)
-    db.add(label)
-    db.commit()
-    db.refresh(label)
+    use_project(db, project_id)
+    label = commit_returning(
+        db,
+        insert(LabelModel)
+        .values(**label_data.model_dump(), project_id=project_id, **new_id("labels"))
+        .returning(LabelModel),
+    )
+    invalidate(("project", project_id))
     return label
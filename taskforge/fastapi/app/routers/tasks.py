@@ -1,22 +1,105 @@
-from fastapi import APIRouter, Depends, Query, status
+from typing import Any
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.schemas.task import Task, TaskCreate, TaskUpdate
-from app.services.task_service import get_tasks, get_task, create_task, update_task, delete_task
+from app.models.task import TaskStatus, TaskPriority
+from app.schemas.task import (
+    Task,
+    TaskBatchCreate,
+    TaskBatchDelete,
+    TaskBatchResult,
+    TaskBatchUpdate,
+    TaskCreate,
+    TaskUpdate,
+)
+from app.services.read_service import (
+    TASK_EXPANSIONS,
+    TASK_FIELDS,
+    get_task_fieldset,
+    get_task_rows,
+    get_task_rows_page,
+)
+from app.services.task_service import (
+    get_task,
+    create_task,
+    update_task,
+    delete_task,
+    create_tasks_batch,
+    update_tasks_batch,
+    delete_tasks_batch,
+)
+from app.services.fingerprint_service import get_task_fingerprint, get_tasks_fingerprint
+from app.utils.conditional import etag_matches, make_etag, not_modified
 from app.utils.security import get_current_user
 from app.models.user import User
+from app.utils.fieldsets import parse_fieldset
+from app.utils.response_cache import bypass_response, response_cache
 
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
 
 @router.get("", response_model=list[Task])
 def list_tasks(
+    request: Request,
     project_id: int | None = Query(None),
+    status_filter: TaskStatus | None = Query(None, alias="status"),
+    priority: TaskPriority | None = Query(None),
+    assignee_id: int | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    fields: str | None = Query(None, description="Comma-separated task fields to return"),
+    expand: str | None = Query(
+        None, description="Comma-separated relations to add: labels, assignee, comment_count"
+    ),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """List all tasks, optionally filtered by project_id"""
-    return get_tasks(db, current_user, project_id)
+    """List tasks, optionally filtered.
+
+    Passing ``limit`` or ``cursor`` switches to keyset pagination, newest first;
+    the cursor for the next page is returned in the ``X-Next-Cursor`` header.
+    ``fields`` narrows each task to the listed fields and ``expand`` adds
+    ``labels``, ``assignee`` and/or ``comment_count`` to it.
+    """
+    fieldset = parse_fieldset(fields, TASK_FIELDS, "fields")
+    expansions = parse_fieldset(expand, TASK_EXPANSIONS, "expand")
+    page_size = None if limit is None and cursor is None else limit or DEFAULT_PAGE_SIZE
+    filters = dict(
+        project_id=project_id, status=status_filter, priority=priority, assignee_id=assignee_id
+    )
+    if expansions:
+        # Labels, users and comments are outside the list's fingerprint and cache
+        # tags, so expanded lists are neither cached nor answered with a 304
+        tasks, next_cursor = get_task_fieldset(
+            db, current_user, fieldset, expansions, page_size, cursor, **filters
+        )
+        return bypass_response(tasks, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    # Without a project filter the list spans all of the user's projects
+    tags = [f"project:{project_id}" if project_id is not None else f"owner:{current_user.id}"]
+    fingerprint = get_tasks_fingerprint(db, current_user, **filters)
+    etag = make_etag(current_user.id, (*fingerprint, *fieldset))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response_type = list[dict[str, Any]] if fieldset else list[Task]
+    if fieldset:
+        tasks, next_cursor = get_task_fieldset(
+            db, current_user, fieldset, (), page_size, cursor, **filters
+        )
+    elif page_size is None:
+        tasks, next_cursor = get_task_rows(db, current_user, **filters), None
+    else:
+        tasks, next_cursor = get_task_rows_page(db, current_user, page_size, cursor, **filters)
+    headers = {"ETag": etag}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return cached.respond_rows(tasks, response_type, tags, headers)
 
 
 @router.post("", response_model=Task, status_code=status.HTTP_201_CREATED)
@@ -31,9 +114,17 @@ def create_new_task(
 
 @router.get("/{task_id}", response_model=Task)
 def get_task_by_id(
-    task_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    task_id: int,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
     """Get a specific task"""
+    etag = make_etag(current_user.id, get_task_fingerprint(db, task_id, current_user))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return get_task(db, task_id, current_user)
 
 
@@ -55,3 +146,33 @@ def delete_task_by_id(
     """Delete a task"""
     delete_task(db, task_id, current_user)
     return None
+
+
+@router.post(":batch", response_model=TaskBatchResult)
+def create_tasks_in_batch(
+    batch: TaskBatchCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Create many tasks in a single transaction, with a result per item"""
+    return create_tasks_batch(db, batch.items, current_user)
+
+
+@router.put(":batch", response_model=TaskBatchResult)
+def update_tasks_in_batch(
+    batch: TaskBatchUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Update many tasks in a single transaction, with a result per item"""
+    return update_tasks_batch(db, batch.items, current_user)
+
+
+@router.delete(":batch", response_model=TaskBatchResult)
+def delete_tasks_in_batch(
+    batch: TaskBatchDelete,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Delete many tasks in a single transaction, with a result per item"""
+    return delete_tasks_batch(db, batch.ids, current_user)
@@ -2,6 +2,7 @@ from app.schemas.user import User, UserCreate, UserLogin, Token
 from app.schemas.project import Project, ProjectCreate, ProjectUpdate
 from app.schemas.task import Task, TaskCreate, TaskUpdate
 from app.schemas.comment import Comment, CommentCreate
+from app.schemas.change import ChangeFeed, Tombstone
 
 __all__ = [
     "User",
@@ -16,4 +17,6 @@ __all__ = [
     "TaskUpdate",
     "Comment",
     "CommentCreate",
+    "ChangeFeed",
+    "Tombstone",
 ]
@@ -0,0 +1,26 @@
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+from app.schemas.comment import Comment
+from app.schemas.label import Label
+from app.schemas.project import Project
+from app.schemas.task import Task
+
+
+class Tombstone(BaseModel):
+    entity_type: str
+    entity_id: int
+    deleted_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ChangeFeed(BaseModel):
+    projects: list[Project]
+    tasks: list[Task]
+    comments: list[Comment]
+    labels: list[Label]
+    deleted: list[Tombstone]
+    # Pass back as ?since= to get the next changes
+    cursor: str
+    # True when a source hit the limit; poll again right away with the new cursor
+    has_more: bool
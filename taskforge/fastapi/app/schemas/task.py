@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from app.models.task import TaskStatus, TaskPriority
 
 
@@ -30,3 +30,49 @@ class Task(TaskBase):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+MAX_BATCH_SIZE = 10_000
+
+
+class TaskBatchCreate(BaseModel):
+    items: list[TaskCreate] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchUpdateItem(TaskUpdate):
+    id: int
+
+
+class TaskBatchUpdate(BaseModel):
+    items: list[TaskBatchUpdateItem] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchDelete(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchItemResult(BaseModel):
+    index: int
+    status: int
+    id: int | None = None
+    task: Task | None = None
+    error: str | None = None
+
+
+class TaskBatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[TaskBatchItemResult]
+
+
+class TaskImportError(BaseModel):
+    line: int
+    error: str
+
+
+class TaskImportSummary(BaseModel):
+    imported: int
+    failed: int
+    errors: list[TaskImportError]
+    # True when more lines failed than are listed in errors
+    errors_truncated: bool = False
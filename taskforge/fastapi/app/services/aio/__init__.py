@@ -0,0 +1 @@
+# Async services package (used when settings.ASYNC_DB is enabled)
@@ -0,0 +1,51 @@
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+from app.database import commit_returning_async
+from app.models.user import User
+from app.schemas.user import UserCreate
+from app.utils.hashing import password_hasher
+
+
+async def register_user(db: AsyncSession, user_data: UserCreate) -> User:
+    # Check if user exists
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
+    if existing_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    # Return the pooled connection while bcrypt runs in the hashing process pool
+    await db.rollback()
+
+    hashed_password = await password_hasher.hash_async(user_data.password)
+    return await commit_returning_async(
+        db,
+        insert(User)
+        .values(
+            email=user_data.email,
+            name=user_data.name,
+            role=user_data.role,
+            password_hash=hashed_password,
+        )
+        .returning(User),
+    )
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> User:
+    user = await db.scalar(select(User).where(User.email == email))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password"
+        )
+    # Detach the user so it stays loaded, and return the pooled connection
+    # while bcrypt runs in the hashing process pool
+    db.expunge(user)
+    await db.rollback()
+    if not await password_hasher.verify_async(password, user.password_hash):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password"
+        )
+    if password_hasher.needs_rehash(user.password_hash):
+        # Upgrade the stored hash to the calibrated bcrypt cost
+        user.password_hash = await password_hasher.hash_async(password)
+        db.add(user)
+        await db.commit()
+    return user
@@ -0,0 +1,42 @@
+from collections.abc import AsyncIterator
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user import User
+from app.services.aio.project_service import get_project
+from app.services.export_service import (
+    ExportFormat,
+    build_export_records,
+    export_comments_query,
+    export_labels_query,
+    export_tasks_query,
+    render_csv,
+    render_export_chunk,
+)
+
+
+async def export_project(
+    db: AsyncSession, project_id: int, user: User, export_format: ExportFormat = "ndjson"
+) -> AsyncIterator[str]:
+    """Check access to a project and return an async generator of export chunks.
+
+    Access is checked eagerly so errors surface before the response starts.
+    """
+    await get_project(db, project_id, user)
+    return _export_chunks(db, project_id, export_format)
+
+
+async def _export_chunks(
+    db: AsyncSession, project_id: int, export_format: ExportFormat
+) -> AsyncIterator[str]:
+    result = await db.stream(export_tasks_query(project_id))
+    first = True
+    async for task_rows in result.partitions():
+        task_ids = [row.id for row in task_rows]
+        records = build_export_records(
+            task_rows,
+            (await db.execute(export_labels_query(task_ids))).all(),
+            (await db.execute(export_comments_query(task_ids))).all(),
+        )
+        yield render_export_chunk(records, export_format, first)
+        first = False
+    if first and export_format == "csv":
+        yield render_csv([], header=True)
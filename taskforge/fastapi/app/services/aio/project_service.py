@@ -0,0 +1,80 @@
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import commit_returning_async
+from app.models.project import Project
+from app.models.tombstone import Tombstone
+from app.models.user import User
+from app.schemas.project import ProjectCreate, ProjectUpdate
+from app.services import project_service
+from app.utils.bus import invalidate
+from app.utils.exceptions import NotFoundException, ForbiddenException
+from app.utils.shards import new_id_async, new_project_async, shard_set, use_project_async
+
+
+async def get_projects(db: AsyncSession, user: User) -> list[Project]:
+    """Get all projects for the current user"""
+    if shard_set.enabled:
+        # Fans out to the shards on threads without blocking the event loop
+        return await db.run_sync(project_service.get_projects, user)
+    result = await db.scalars(select(Project).where(Project.owner_id == user.id))
+    return list(result.all())
+
+
+async def get_project(db: AsyncSession, project_id: int, user: User) -> Project:
+    """Get a specific project"""
+    await use_project_async(db, project_id)
+    project = await db.get(Project, project_id)
+    if not project:
+        raise NotFoundException("Project not found")
+    if project.owner_id != user.id:
+        raise ForbiddenException("Access denied")
+    return project
+
+
+async def create_project(db: AsyncSession, project_data: ProjectCreate, user: User) -> Project:
+    """Create a new project"""
+    placement = await new_project_async(db)
+    project = await commit_returning_async(
+        db,
+        insert(Project)
+        .values(**project_data.model_dump(), owner_id=user.id, **placement)
+        .returning(Project),
+    )
+    invalidate(("project", project.id), ("owner", user.id))
+    return project
+
+
+async def update_project(
+    db: AsyncSession, project_id: int, project_data: ProjectUpdate, user: User
+) -> Project:
+    """Update a project"""
+    update_data = project_data.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_project(db, project_id, user)
+    await use_project_async(db, project_id)
+    project = await commit_returning_async(
+        db,
+        update(Project)
+        .where(Project.id == project_id, Project.owner_id == user.id)
+        .values(**update_data)
+        .returning(Project),
+    )
+    if project is None:
+        # Nothing matched: let get_project report 404 or 403, and 404 if the
+        # project was deleted after the update
+        await get_project(db, project_id, user)
+        raise NotFoundException("Project not found")
+    invalidate(("project", project.id), ("owner", user.id))
+    return project
+
+
+async def delete_project(db: AsyncSession, project_id: int, user: User) -> None:
+    """Delete a project"""
+    project = await get_project(db, project_id, user)
+    await db.delete(project)
+    tombstone_id = await new_id_async(db, "tombstones")
+    db.add(
+        Tombstone(entity_type="project", entity_id=project.id, owner_id=user.id, **tombstone_id)
+    )
+    await db.commit()
+    invalidate(("project", project_id), ("owner", user.id))
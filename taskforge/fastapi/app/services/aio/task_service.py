@@ -0,0 +1,126 @@
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import commit_returning_async
+from app.models.task import Task, TaskStatus, TaskPriority
+from app.models.project import Project
+from app.models.tombstone import Tombstone
+from app.models.user import User
+from app.schemas.task import TaskCreate, TaskUpdate
+from app.services import task_service
+from app.services.task_service import paginate_task_query, split_task_page, task_list_query
+from app.utils.bus import invalidate
+from app.utils.events import publish_task_deleted, publish_task_event
+from app.utils.group_commit import commit_returning_grouped_async
+from app.utils.exceptions import NotFoundException, ForbiddenException
+from app.utils.shards import new_id_async, shard_set, use_project_async, use_task_async
+
+
+async def get_tasks(
+    db: AsyncSession,
+    user: User,
+    project_id: int | None = None,
+    status: TaskStatus | None = None,
+    priority: TaskPriority | None = None,
+    assignee_id: int | None = None,
+) -> list[Task]:
+    """Get tasks, optionally filtered by project, status, priority or assignee"""
+    if project_id:
+        await use_project_async(db, project_id)
+    elif shard_set.enabled:
+        return await db.run_sync(
+            task_service.get_tasks, user, None, status, priority, assignee_id
+        )
+    query = task_list_query(user, project_id, status, priority, assignee_id)
+    result = await db.scalars(query)
+    return list(result.all())
+
+
+async def get_tasks_page(
+    db: AsyncSession,
+    user: User,
+    limit: int,
+    cursor: str | None = None,
+    project_id: int | None = None,
+    status: TaskStatus | None = None,
+    priority: TaskPriority | None = None,
+    assignee_id: int | None = None,
+) -> tuple[list[Task], str | None]:
+    """Get one page of tasks and the cursor of the next page, if any"""
+    if project_id:
+        await use_project_async(db, project_id)
+    elif shard_set.enabled:
+        return await db.run_sync(
+            task_service.get_tasks_page, user, limit, cursor, None, status, priority, assignee_id
+        )
+    query = task_list_query(user, project_id, status, priority, assignee_id)
+    result = await db.scalars(paginate_task_query(query, limit, cursor))
+    return split_task_page(list(result.all()), limit)
+
+
+async def get_task(db: AsyncSession, task_id: int, user: User) -> Task:
+    """Get a specific task"""
+    await use_task_async(db, task_id)
+    task = await db.scalar(
+        select(Task).join(Project).where(Task.id == task_id, Project.owner_id == user.id)
+    )
+    if not task:
+        raise NotFoundException("Task not found")
+    return task
+
+
+async def create_task(db: AsyncSession, task_data: TaskCreate, user: User) -> Task:
+    """Create a new task"""
+    # Verify project ownership
+    await use_project_async(db, task_data.project_id)
+    project = await db.get(Project, task_data.project_id)
+    if not project or project.owner_id != user.id:
+        raise ForbiddenException("Access denied to this project")
+
+    new_task_id = await new_id_async(db, "tasks")
+    task = await commit_returning_async(
+        db, insert(Task).values(**task_data.model_dump(), **new_task_id).returning(Task)
+    )
+    if shard_set.enabled:
+        shard_set.remember_tasks({task.id: task.project_id})
+    invalidate(("task", task.id), ("project", task.project_id), ("owner", user.id))
+    publish_task_event("task.created", task)
+    return task
+
+
+async def update_task(db: AsyncSession, task_id: int, task_data: TaskUpdate, user: User) -> Task:
+    """Update a task"""
+    update_data = task_data.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_task(db, task_id, user)
+    await use_task_async(db, task_id)
+    # Correlated on the task's project, so only one project row is looked up
+    # however many projects the user owns
+    owned_project = (
+        select(Project.id)
+        .where(Project.id == Task.project_id, Project.owner_id == user.id)
+        .exists()
+    )
+    task = await commit_returning_grouped_async(
+        db,
+        update(Task)
+        .where(Task.id == task_id, owned_project)
+        .values(**update_data)
+        .returning(Task),
+    )
+    if task is None:
+        raise NotFoundException("Task not found")
+    invalidate(("task", task.id), ("project", task.project_id), ("owner", user.id))
+    publish_task_event("task.updated", task)
+    return task
+
+
+async def delete_task(db: AsyncSession, task_id: int, user: User) -> None:
+    """Delete a task"""
+    task = await get_task(db, task_id, user)
+    project_id, task_id = task.project_id, task.id
+    await db.delete(task)
+    tombstone_id = await new_id_async(db, "tombstones")
+    db.add(Tombstone(entity_type="task", entity_id=task_id, owner_id=user.id, **tombstone_id))
+    await db.commit()
+    invalidate(("task", task_id), ("project", project_id), ("owner", user.id))
+    publish_task_deleted(project_id, task_id)
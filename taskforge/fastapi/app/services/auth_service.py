@@ -1,8 +1,11 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from app.database import commit_returning
 from fastapi import HTTPException, status
 from app.models.user import User
 from app.schemas.user import UserCreate
-from app.utils.security import get_password_hash, verify_password, create_access_token
+from app.utils.hashing import password_hasher
+from app.utils.security import create_access_token
 
 
 def register_user(db: Session, user_data: UserCreate) -> User:
@@ -10,19 +13,22 @@ def register_user(db: Session, user_data: UserCreate) -> User:
     existing_user = db.query(User).filter(User.email == user_data.email).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
+    # Return the pooled connection while bcrypt runs in the hashing process pool
+    db.rollback()
 
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
-    db_user = User(
-        email=user_data.email,
-        name=user_data.name,
-        role=user_data.role,
-        password_hash=hashed_password,
+    hashed_password = password_hasher.hash(user_data.password)
+    return commit_returning(
+        db,
+        insert(User)
+        .values(
+            email=user_data.email,
+            name=user_data.name,
+            role=user_data.role,
+            password_hash=hashed_password,
+        )
+        .returning(User),
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
 
 
 def authenticate_user(db: Session, email: str, password: str) -> User:
@@ -31,10 +37,17 @@ def authenticate_user(db: Session, email: str, password: str) -> User:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password"
         )
-    if not verify_password(password, user.password_hash):
+    password_hash = user.password_hash
+    # Return the pooled connection while bcrypt runs in the hashing process pool
+    db.rollback()
+    if not password_hasher.verify(password, password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password"
         )
+    if password_hasher.needs_rehash(password_hash):
+        # Upgrade the stored hash to the calibrated bcrypt cost
+        user.password_hash = password_hasher.hash(password)
+        db.commit()
     return user
 
 
@@ -0,0 +1,159 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from typing import Literal
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+from app.models.comment import Comment
+from app.models.label import Label, TaskLabel
+from app.models.task import Task
+from app.models.user import User
+from app.services.project_service import get_project
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Tasks fetched per server-side cursor batch; labels and comments are loaded
+# for one batch at a time, so memory is bounded by this rather than project size
+EXPORT_BATCH_SIZE = 1000
+
+TASK_COLUMNS = (
+    Task.id,
+    Task.title,
+    Task.description,
+    Task.status,
+    Task.priority,
+    Task.project_id,
+    Task.assignee_id,
+    Task.created_at,
+    Task.updated_at,
+)
+TASK_FIELDS = tuple(column.key for column in TASK_COLUMNS)
+CSV_FIELDS = [*TASK_FIELDS, "labels", "comments"]
+
+_encode_json = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def export_tasks_query(project_id: int) -> Select:
+    """Tasks of a project in (updated_at, id) order, served by ix_tasks_project_updated_at"""
+    return (
+        select(*TASK_COLUMNS)
+        .where(Task.project_id == project_id)
+        .order_by(Task.updated_at, Task.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+
+def export_labels_query(task_ids: list[int]) -> Select:
+    """(task_id, label name) pairs for a batch of tasks"""
+    return (
+        select(TaskLabel.c.task_id, Label.name)
+        .join(Label, Label.id == TaskLabel.c.label_id)
+        .where(TaskLabel.c.task_id.in_(task_ids))
+    )
+
+
+def export_comments_query(task_ids: list[int]) -> Select:
+    """Comments for a batch of tasks, oldest first"""
+    return (
+        select(
+            Comment.task_id,
+            Comment.id,
+            Comment.author_id,
+            Comment.content,
+            Comment.created_at,
+            Comment.updated_at,
+        )
+        .where(Comment.task_id.in_(task_ids))
+        .order_by(Comment.task_id, Comment.id)
+    )
+
+
+def build_export_records(
+    task_rows: Iterable, label_rows: Iterable, comment_rows: Iterable
+) -> list[dict]:
+    """Join one batch of task rows with their label names and comments"""
+    labels = defaultdict(list)
+    for task_id, name in label_rows:
+        labels[task_id].append(name)
+    comments = defaultdict(list)
+    for task_id, comment_id, author_id, content, created_at, updated_at in comment_rows:
+        comments[task_id].append(
+            {
+                "id": comment_id,
+                "author_id": author_id,
+                "content": content,
+                "created_at": created_at.isoformat(),
+                "updated_at": updated_at.isoformat(),
+            }
+        )
+
+    records = []
+    for row in task_rows:
+        record = dict(zip(TASK_FIELDS, row))
+        record["status"] = record["status"].value
+        record["priority"] = record["priority"].value
+        record["created_at"] = record["created_at"].isoformat()
+        record["updated_at"] = record["updated_at"].isoformat()
+        record["labels"] = labels.get(record["id"], [])
+        record["comments"] = comments.get(record["id"], [])
+        records.append(record)
+    return records
+
+
+def render_ndjson(records: list[dict]) -> str:
+    """One JSON object per task per line"""
+    return "".join([_encode_json(record) + "\n" for record in records])
+
+
+def render_csv(records: list[dict], header: bool = False) -> str:
+    """One row per task; labels are ';'-joined and comments a JSON array"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_FIELDS)
+    for record in records:
+        writer.writerow(
+            [record[field] for field in CSV_FIELDS[:-2]]
+            + [";".join(record["labels"]), _encode_json(record["comments"])]
+        )
+    return buffer.getvalue()
+
+
+def render_export_chunk(records: list[dict], export_format: ExportFormat, first: bool) -> str:
+    """Render one batch of records; the CSV header goes in the first chunk"""
+    if export_format == "csv":
+        return render_csv(records, header=first)
+    return render_ndjson(records)
+
+
+def export_project(
+    db: Session, project_id: int, user: User, export_format: ExportFormat = "ndjson"
+) -> Iterator[str]:
+    """Check access to a project and return a generator of export chunks.
+
+    Access is checked eagerly so errors surface before the response starts.
+    """
+    get_project(db, project_id, user)
+    return _export_chunks(db, project_id, export_format)
+
+
+def _export_chunks(db: Session, project_id: int, export_format: ExportFormat) -> Iterator[str]:
+    # Plain Core selects: run them on the session's connection to skip ORM result handling
+    connection = db.connection()
+    result = connection.execute(export_tasks_query(project_id))
+    first = True
+    for task_rows in result.partitions():
+        task_ids = [row[0] for row in task_rows]
+        records = build_export_records(
+            task_rows,
+            connection.execute(export_labels_query(task_ids)).all(),
+            connection.execute(export_comments_query(task_ids)).all(),
+        )
+        yield render_export_chunk(records, export_format, first)
+        first = False
+    if first and export_format == "csv":
+        yield render_csv([], header=True)
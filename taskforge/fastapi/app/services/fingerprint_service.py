@@ -0,0 +1,162 @@
+from functools import lru_cache
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.orm import Session
+from app.models.comment import Comment
+from app.models.label import Label
+from app.models.project import Project
+from app.models.task import Task, TaskStatus, TaskPriority
+from app.models.tombstone import Tombstone
+from app.models.user import User
+from app.utils.exceptions import NotFoundException, ForbiddenException
+from app.utils.shards import execute_everywhere, use_project, use_task
+
+
+# The list fingerprints run on every conditional GET, so their statements are
+# built once with bound parameters: constructing the nested selects costs
+# several times more than SQLite takes to answer them.
+_newest_deletion = (
+    select(func.max(Tombstone.deleted_at))
+    .where(Tombstone.owner_id == bindparam("user_id"))
+    .scalar_subquery()
+)
+
+_projects_statement = select(
+    *(
+        select(aggregate).where(Project.owner_id == bindparam("user_id")).scalar_subquery()
+        for aggregate in (func.max(Project.updated_at), func.count(Project.id))
+    ),
+    _newest_deletion,
+)
+
+
+@lru_cache(maxsize=None)
+def _tasks_statement(project: bool, status: bool, priority: bool, assignee: bool):
+    conditions = []
+    if status:
+        conditions.append(Task.status == bindparam("status"))
+    if priority:
+        conditions.append(Task.priority == bindparam("priority"))
+    if assignee:
+        conditions.append(Task.assignee_id == bindparam("assignee_id"))
+    newest_in_project = (
+        select(func.max(Task.updated_at)).where(Task.project_id == Project.id, *conditions)
+    )
+    newest = select(func.max(newest_in_project.scalar_subquery())).where(
+        Project.owner_id == bindparam("user_id")
+    )
+    matching = (
+        select(func.count(Task.id))
+        .join(Project, Task.project_id == Project.id)
+        .where(Project.owner_id == bindparam("user_id"), *conditions)
+    )
+    if project:
+        newest = newest.where(Project.id == bindparam("project_id"))
+        matching = matching.where(Task.project_id == bindparam("project_id"))
+    return select(newest.scalar_subquery(), matching.scalar_subquery(), _newest_deletion)
+
+
+def _newest(rows: list, counts: tuple[int, ...] = ()) -> tuple:
+    """Column-wise newest of per-shard fingerprint rows, summing the ``counts`` columns"""
+    if len(rows) == 1:
+        return tuple(rows[0])
+    return tuple(
+        sum(column) if index in counts
+        else max((value for value in column if value is not None), default=None)
+        for index, column in enumerate(zip(*rows))
+    )
+
+
+def get_projects_fingerprint(db: Session, user: User) -> tuple:
+    """Newest update and count of the user's projects, and the newest deletion.
+
+    Timestamps come from the app clock, so a project committed by another
+    worker can be older than the newest one; the count still changes.
+    """
+    rows = execute_everywhere(db, _projects_statement, {"user_id": user.id})
+    return _newest(rows, counts=(1,))
+
+
+def get_project_fingerprint(db: Session, project_id: int, user: User) -> tuple:
+    """Fingerprint one project"""
+    use_project(db, project_id)
+    row = db.execute(
+        select(Project.owner_id, Project.updated_at).where(Project.id == project_id)
+    ).first()
+    if row is None:
+        raise NotFoundException("Project not found")
+    if row.owner_id != user.id:
+        raise ForbiddenException("Access denied")
+    return (row.updated_at,)
+
+
+def get_labels_fingerprint(db: Session, project_id: int, user: User) -> tuple:
+    """Fingerprint a project's labels"""
+    use_project(db, project_id)
+    row = db.execute(
+        select(Project.owner_id, func.count(Label.id), func.max(Label.updated_at))
+        .outerjoin(Label, Label.project_id == Project.id)
+        .where(Project.id == project_id)
+        .group_by(Project.id)
+    ).first()
+    if row is None:
+        raise NotFoundException("Project not found")
+    if row.owner_id != user.id:
+        raise ForbiddenException("Access denied")
+    return tuple(row[1:])
+
+
+def get_tasks_fingerprint(
+    db: Session,
+    user: User,
+    project_id: int | None = None,
+    status: TaskStatus | None = None,
+    priority: TaskPriority | None = None,
+    assignee_id: int | None = None,
+) -> tuple:
+    """Newest update and count of the matching tasks, and the user's newest deletion.
+
+    Inserts and updates move the newest update and deletes leave a tombstone.
+    The count catches an update that takes an older task out of a filtered
+    list, which leaves the newest update of the rest unchanged.
+    Pages of a paginated listing share the fingerprint of the whole list.
+    """
+    statement = _tasks_statement(
+        bool(project_id), status is not None, priority is not None, assignee_id is not None
+    )
+    params = {
+        "user_id": user.id, "project_id": project_id, "status": status,
+        "priority": priority, "assignee_id": assignee_id,
+    }
+    if project_id:
+        use_project(db, project_id)
+        return tuple(db.execute(statement, params).one())
+    return _newest(execute_everywhere(db, statement, params), counts=(1,))
+
+
+def get_task_fingerprint(db: Session, task_id: int, user: User) -> tuple:
+    """Fingerprint one task"""
+    use_task(db, task_id)
+    updated_at = db.scalar(
+        select(Task.updated_at)
+        .join(Project)
+        .where(Task.id == task_id, Project.owner_id == user.id)
+    )
+    if updated_at is None:
+        raise NotFoundException("Task not found")
+    return (updated_at,)
+
+
+def get_comments_fingerprint(db: Session, task_id: int, user: User) -> tuple:
+    """Fingerprint a task's comments"""
+    use_task(db, task_id)
+    row = db.execute(
+        select(func.count(Comment.id), func.max(Comment.updated_at))
+        .select_from(Task)
+        .join(Project)
+        .outerjoin(Comment, Comment.task_id == Task.id)
+        .where(Task.id == task_id, Project.owner_id == user.id)
+        .group_by(Task.id)
+    ).first()
+    if row is None:
+        raise NotFoundException("Task not found")
+    return tuple(row)
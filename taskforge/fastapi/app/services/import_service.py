@@ -0,0 +1,185 @@
+import csv
+import io
+import json
+from collections.abc import Iterator
+from datetime import datetime
+from typing import BinaryIO
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.task import TaskCreate
+from app.services.export_service import ExportFormat
+from app.services.project_service import get_project
+from app.utils.bus import invalidate
+from app.utils.events import event_broker, publish_task_rows
+from app.utils.shards import assign_ids
+
+# Valid rows inserted per savepoint
+IMPORT_CHUNK_SIZE = 500
+# Longest NDJSON line accepted; longer lines are skipped without being buffered
+MAX_LINE_BYTES = 1024 * 1024
+# Line errors listed in the summary; further failures are only counted
+MAX_IMPORT_ERRORS = 1000
+
+
+def detect_import_format(filename: str | None, requested: ExportFormat | None) -> ExportFormat:
+    """Use the requested format, else guess from the file extension"""
+    if requested:
+        return requested
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+def _ndjson_rows(file: BinaryIO) -> Iterator[tuple[int, dict | None, str | None]]:
+    """Yield (line number, row, error) for each non-blank line"""
+    line_no = 0
+    while True:
+        line = file.readline(MAX_LINE_BYTES + 1)
+        if not line:
+            return
+        line_no += 1
+        if len(line) > MAX_LINE_BYTES and not line.endswith(b"\n"):
+            # Discard the rest of the oversized line
+            while line and not line.endswith(b"\n"):
+                line = file.readline(MAX_LINE_BYTES)
+            yield line_no, None, f"Line longer than {MAX_LINE_BYTES} bytes"
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line.decode("utf-8"))
+        except ValueError:
+            yield line_no, None, "Invalid JSON"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, row, None
+
+
+def _csv_rows(file: BinaryIO) -> Iterator[tuple[int, dict | None, str | None]]:
+    """Yield (line number, row, error) for each CSV record after the header.
+
+    Empty cells are dropped so the schema defaults apply, which lets an
+    export be imported back unchanged.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8", errors="replace", newline="")
+    reader = csv.DictReader(text)
+    try:
+        while True:
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                yield reader.line_num, None, f"Invalid CSV: {exc}"
+                continue
+            if None in record:
+                yield reader.line_num, None, "More cells than header columns"
+                continue
+            yield reader.line_num, {key: value for key, value in record.items() if value}, None
+    finally:
+        # Leave closing the upload to its owner
+        text.detach()
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+class _ImportSummary:
+    """Counts and the first MAX_IMPORT_ERRORS line errors"""
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def fail(self, line: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_IMPORT_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+    def as_dict(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _insert_chunk(
+    db: Session, chunk: list[tuple[int, dict]], summary: _ImportSummary, publish: bool = False
+) -> None:
+    """Insert one chunk inside a savepoint, retrying row by row if the chunk fails.
+
+    With ``publish``, a task.created event goes out for each row once committed.
+    """
+    table = Task.__table__
+    statement = insert(table).returning(*table.c) if publish else insert(table)
+    assign_ids("tasks", [row for _, row in chunk])
+    inserted: list[dict] = []
+    try:
+        with db.begin_nested():
+            result = db.execute(statement, [row for _, row in chunk])
+            if publish:
+                inserted = [dict(task) for task in result.mappings()]
+        summary.imported += len(chunk)
+    except DBAPIError:
+        inserted = []
+        for line_no, row in chunk:
+            try:
+                with db.begin_nested():
+                    result = db.execute(statement, [row])
+                    if publish:
+                        inserted.extend(dict(task) for task in result.mappings())
+                summary.imported += 1
+            except DBAPIError as exc:
+                summary.fail(line_no, str(exc.orig))
+    # Commit per chunk so a long import does not hold the write lock throughout
+    db.commit()
+    publish_task_rows("task.created", sorted(inserted, key=lambda task: task["id"]))
+
+
+def import_tasks(
+    db: Session, project_id: int, file: BinaryIO, import_format: ExportFormat, user: User
+) -> dict:
+    """Validate and insert tasks from an NDJSON or CSV file into a project.
+
+    The file is read incrementally and inserted in chunks, so memory use does
+    not depend on its size. Returns the TaskImportSummary fields.
+    """
+    get_project(db, project_id, user)
+    # Rows are only read back when a live subscriber may want the events
+    publish = event_broker.wants(project_id)
+
+    rows = _csv_rows(file) if import_format == "csv" else _ndjson_rows(file)
+    summary = _ImportSummary()
+    chunk: list[tuple[int, dict]] = []
+    for line_no, row, error in rows:
+        if error is None:
+            try:
+                task = TaskCreate.model_validate({**row, "project_id": project_id})
+            except ValidationError as exc:
+                error = _format_validation_error(exc)
+        if error is not None:
+            summary.fail(line_no, error)
+            continue
+        now = datetime.utcnow()
+        chunk.append((line_no, {**task.model_dump(), "created_at": now, "updated_at": now}))
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            _insert_chunk(db, chunk, summary, publish)
+            chunk = []
+    if chunk:
+        _insert_chunk(db, chunk, summary, publish)
+    if summary.imported:
+        invalidate(("project", project_id), ("owner", user.id))
+    return summary.as_dict()
@@ -1,17 +1,26 @@
+from operator import attrgetter
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
+from app.database import commit_returning
 from app.models.project import Project
+from app.models.tombstone import Tombstone
 from app.models.user import User
 from app.schemas.project import ProjectCreate, ProjectUpdate
+from app.utils.bus import invalidate
 from app.utils.exceptions import NotFoundException, ForbiddenException
+from app.utils.shards import new_id, new_project, scalars_everywhere, use_project
 
 
 def get_projects(db: Session, user: User) -> list[Project]:
     """Get all projects for the current user"""
-    return db.query(Project).filter(Project.owner_id == user.id).all()
+    return scalars_everywhere(
+        db, select(Project).where(Project.owner_id == user.id), key=attrgetter("id")
+    )
 
 
 def get_project(db: Session, project_id: int, user: User) -> Project:
     """Get a specific project"""
+    use_project(db, project_id)
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise NotFoundException("Project not found")
@@ -22,10 +31,13 @@ def get_project(db: Session, project_id: int, user: User) -> Project:
 
 def create_project(db: Session, project_data: ProjectCreate, user: User) -> Project:
     """Create a new project"""
-    project = Project(**project_data.model_dump(), owner_id=user.id)
-    db.add(project)
-    db.commit()
-    db.refresh(project)
+    project = commit_returning(
+        db,
+        insert(Project)
+        .values(**project_data.model_dump(), owner_id=user.id, **new_project(db))
+        .returning(Project),
+    )
+    invalidate(("project", project.id), ("owner", user.id))
     return project
 
 
@@ -33,12 +45,23 @@ def update_project(
     db: Session, project_id: int, project_data: ProjectUpdate, user: User
 ) -> Project:
     """Update a project"""
-    project = get_project(db, project_id, user)
     update_data = project_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(project, key, value)
-    db.commit()
-    db.refresh(project)
+    if not update_data:
+        return get_project(db, project_id, user)
+    use_project(db, project_id)
+    project = commit_returning(
+        db,
+        update(Project)
+        .where(Project.id == project_id, Project.owner_id == user.id)
+        .values(**update_data)
+        .returning(Project),
+    )
+    if project is None:
+        # Nothing matched: let get_project report 404 or 403, and 404 if the
+        # project was deleted after the update
+        get_project(db, project_id, user)
+        raise NotFoundException("Project not found")
+    invalidate(("project", project.id), ("owner", user.id))
     return project
 
 
@@ -46,4 +69,11 @@ def delete_project(db: Session, project_id: int, user: User) -> None:
     """Delete a project"""
     project = get_project(db, project_id, user)
     db.delete(project)
+    db.add(
+        Tombstone(
+            entity_type="project", entity_id=project.id, owner_id=user.id,
+            **new_id("tombstones"),
+        )
+    )
     db.commit()
+    invalidate(("project", project_id), ("owner", user.id))
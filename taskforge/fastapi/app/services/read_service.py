@@ -0,0 +1,244 @@
+"""
+Read side of the list endpoints.
+
+Selects only the columns of each response schema and maps them into slotted
+dataclasses, skipping ORM instance state and the identity map. Field order
+matches the response schema, so rows serialize to the same JSON either
+through the schema or straight through orjson (see CacheLookup.respond_rows).
+Task lists can also be narrowed to a fieldset and expanded with related rows.
+"""
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass, fields
+from datetime import datetime
+from operator import attrgetter, itemgetter
+from typing import Any
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+from app.models.comment import Comment
+from app.models.label import Label, TaskLabel
+from app.models.project import Project, ProjectStatus
+from app.models.task import Task, TaskStatus, TaskPriority
+from app.models.user import User
+from app.services.task_service import (
+    PAGE_ORDER,
+    paginate_task_query,
+    split_task_page,
+    task_list_query,
+)
+from app.utils.pagination import encode_cursor
+from app.utils.shards import execute_everywhere, fan_out, merge, use_project, use_task
+
+
+@dataclass(slots=True)
+class ProjectRow:
+    name: str
+    description: str | None
+    status: ProjectStatus
+    id: int
+    owner_id: int
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass(slots=True)
+class TaskRow:
+    title: str
+    description: str | None
+    status: TaskStatus
+    priority: TaskPriority
+    assignee_id: int | None
+    id: int
+    project_id: int
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass(slots=True)
+class CommentRow:
+    content: str
+    id: int
+    task_id: int
+    author_id: int
+    created_at: datetime
+    updated_at: datetime
+
+
+def row_columns(model: type, row_type: type) -> tuple:
+    """The mapped columns of ``model`` named by ``row_type``'s fields, in field order"""
+    return tuple(getattr(model, field.name) for field in fields(row_type))
+
+
+PROJECT_COLUMNS = row_columns(Project, ProjectRow)
+TASK_COLUMNS = row_columns(Task, TaskRow)
+COMMENT_COLUMNS = row_columns(Comment, CommentRow)
+
+TASK_FIELDS = tuple(field.name for field in fields(TaskRow))
+TASK_EXPANSIONS = ("labels", "assignee", "comment_count")
+
+
+def _load(db: Session, query: Select, row_type: type) -> list:
+    return [row_type(*row) for row in db.execute(query)]
+
+
+def _load_everywhere(db: Session, query: Select, row_type: type, **merge_options) -> list:
+    """_load across all of the user's projects, on every shard when sharded"""
+    return [row_type(*row) for row in execute_everywhere(db, query, **merge_options)]
+
+
+def get_project_rows(db: Session, user: User) -> list[ProjectRow]:
+    """The user's projects"""
+    query = select(*PROJECT_COLUMNS).where(Project.owner_id == user.id)
+    return _load_everywhere(db, query, ProjectRow, key=attrgetter("id"))
+
+
+def get_task_rows(
+    db: Session,
+    user: User,
+    project_id: int | None = None,
+    status: TaskStatus | None = None,
+    priority: TaskPriority | None = None,
+    assignee_id: int | None = None,
+) -> list[TaskRow]:
+    """The user's tasks matching the filters, as task_service.get_tasks"""
+    query = task_list_query(user, project_id, status, priority, assignee_id, TASK_COLUMNS)
+    if project_id:
+        use_project(db, project_id)
+        return _load(db, query, TaskRow)
+    return _load_everywhere(db, query, TaskRow, key=attrgetter("id"))
+
+
+def get_task_rows_page(
+    db: Session,
+    user: User,
+    limit: int,
+    cursor: str | None = None,
+    project_id: int | None = None,
+    status: TaskStatus | None = None,
+    priority: TaskPriority | None = None,
+    assignee_id: int | None = None,
+) -> tuple[list[TaskRow], str | None]:
+    """One page of tasks and the next cursor, as task_service.get_tasks_page"""
+    query = task_list_query(user, project_id, status, priority, assignee_id, TASK_COLUMNS)
+    query = paginate_task_query(query, limit, cursor)
+    if project_id:
+        use_project(db, project_id)
+        rows = _load(db, query, TaskRow)
+    else:
+        rows = _load_everywhere(
+            db, query, TaskRow, key=PAGE_ORDER, reverse=True, limit=limit + 1
+        )
+    return split_task_page(rows, limit)
+
+
+def get_comment_rows(db: Session, task_id: int) -> list[CommentRow]:
+    """A task's comments; the caller checks access to the task"""
+    use_task(db, task_id)
+    return _load(db, select(*COMMENT_COLUMNS).where(Comment.task_id == task_id), CommentRow)
+
+
+def _expand_labels(db: Session, tasks: Select) -> Callable[[dict], Any]:
+    labels = defaultdict(list)
+    query = (
+        select(TaskLabel.c.task_id, Label.name, Label.color, Label.id, Label.project_id)
+        .join(Label, Label.id == TaskLabel.c.label_id)
+        .where(TaskLabel.c.task_id.in_(tasks.with_only_columns(Task.id)))
+        .order_by(TaskLabel.c.task_id, TaskLabel.c.label_id)
+    )
+    for task_id, name, color, label_id, project_id in db.execute(query):
+        labels[task_id].append(
+            {"name": name, "color": color, "id": label_id, "project_id": project_id}
+        )
+    return lambda task: labels.get(task["id"], [])
+
+
+def _expand_assignee(db: Session, tasks: Select) -> Callable[[dict], Any]:
+    # Any user id can be assigned, so only the display name is exposed, never the email
+    query = select(User.id, User.name).where(
+        User.id.in_(tasks.with_only_columns(Task.assignee_id))
+    )
+    users = {user_id: {"id": user_id, "name": name} for user_id, name in db.execute(query)}
+    return lambda task: users.get(task["assignee_id"])
+
+
+def _expand_comment_count(db: Session, tasks: Select) -> Callable[[dict], Any]:
+    query = (
+        select(Comment.task_id, func.count())
+        .where(Comment.task_id.in_(tasks.with_only_columns(Task.id)))
+        .group_by(Comment.task_id)
+    )
+    counts = dict(db.execute(query).all())
+    return lambda task: counts.get(task["id"], 0)
+
+
+_EXPANDERS = {
+    "labels": _expand_labels,
+    "assignee": _expand_assignee,
+    "comment_count": _expand_comment_count,
+}
+
+
+def get_task_fieldset(
+    db: Session,
+    user: User,
+    fieldset: tuple[str, ...] = (),
+    expand: tuple[str, ...] = (),
+    limit: int | None = None,
+    cursor: str | None = None,
+    project_id: int | None = None,
+    status: TaskStatus | None = None,
+    priority: TaskPriority | None = None,
+    assignee_id: int | None = None,
+) -> tuple[list[dict], str | None]:
+    """Tasks narrowed to ``fieldset`` (every field when empty) with ``expand`` attached.
+
+    Only the requested columns are selected, plus those the cursor and the
+    expansions key on. Each expansion is one query over the same task
+    selection, so the query count does not grow with the number of tasks.
+    Paged like get_task_rows_page when ``limit`` is given.
+    """
+    output = fieldset or TASK_FIELDS
+    needed = {"id", "updated_at"}
+    if "assignee" in expand:
+        needed.add("assignee_id")
+    names = [name for name in TASK_FIELDS if name in output or name in needed]
+    columns = tuple(getattr(Task, name) for name in names)
+    query = task_list_query(user, project_id, status, priority, assignee_id, columns)
+    if limit is not None:
+        query = paginate_task_query(query, limit, cursor)
+    if project_id:
+        use_project(db, project_id)
+        tasks = _fieldset_tasks(db, query, names, output, expand)
+    else:
+        order = itemgetter("id") if limit is None else itemgetter("updated_at", "id")
+        tasks = merge(
+            fan_out(db, _fieldset_tasks, query, names, output, expand),
+            key=lambda task: order(task[0]),
+            reverse=limit is not None,
+            limit=None if limit is None else limit + 1,
+            identity=lambda task: task[0]["id"],
+        )
+    next_cursor = None
+    if limit is not None and len(tasks) > limit:
+        tasks = tasks[:limit]
+        values = tasks[-1][0]
+        next_cursor = encode_cursor(values["updated_at"], values["id"])
+    return [task for _, task in tasks], next_cursor
+
+
+def _fieldset_tasks(
+    db: Session, query: Select, names: list[str], output: tuple, expand: tuple
+) -> list[tuple[dict, dict]]:
+    """(selected values, output task) pairs for get_task_fieldset's query on one database"""
+    rows = db.execute(query).all()
+    if not rows:
+        return []
+    expansions = [(name, _EXPANDERS[name](db, query)) for name in expand]
+    tasks = []
+    for row in rows:
+        values = dict(zip(names, row))
+        task = {name: values[name] for name in output}
+        for name, lookup in expansions:
+            task[name] = lookup(values)
+        tasks.append((values, task))
+    return tasks
@@ -1,21 +1,129 @@
+from collections import defaultdict
+from collections.abc import Callable
+from datetime import datetime
+from operator import attrgetter
+from sqlalchemy import Select, delete, insert, select, tuple_, update
 from sqlalchemy.orm import Session
-from app.models.task import Task
+from app.database import commit_returning
+from app.models.comment import Comment
+from app.models.label import TaskLabel
+from app.models.task import Task, TaskStatus, TaskPriority
 from app.models.project import Project
+from app.models.tombstone import Tombstone
 from app.models.user import User
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.schemas.task import (
+    TaskBatchResult,
+    TaskBatchUpdateItem,
+    TaskCreate,
+    TaskUpdate,
+)
+from app.utils.bus import invalidate, invalidate_many
+from app.utils.events import publish_task_deleted, publish_task_event, publish_task_rows
+from app.utils.group_commit import commit_returning_grouped
 from app.utils.exceptions import NotFoundException, ForbiddenException
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.shards import (
+    assign_ids,
+    new_id,
+    scalars_everywhere,
+    shard_set,
+    shards_of_projects,
+    shards_of_tasks,
+    use_project,
+    use_task,
+)
 
+# Merge order of task pages from several shards, as paginate_task_query sorts them
+PAGE_ORDER = attrgetter("updated_at", "id")
 
-def get_tasks(db: Session, user: User, project_id: int | None = None) -> list[Task]:
-    """Get tasks, optionally filtered by project"""
-    query = db.query(Task).join(Project).filter(Project.owner_id == user.id)
+
+def task_list_query(
+    user: User,
+    project_id: int | None = None,
+    status: TaskStatus | None = None,
+    priority: TaskPriority | None = None,
+    assignee_id: int | None = None,
+    columns: tuple = (Task,),
+) -> Select:
+    """Build the query for the user's tasks matching the given filters.
+
+    Selects Task entities unless other ``columns`` are given.
+    """
+    query = select(*columns).select_from(Task).join(Project).where(Project.owner_id == user.id)
+    if project_id:
+        query = query.where(Task.project_id == project_id)
+    if status is not None:
+        query = query.where(Task.status == status)
+    if priority is not None:
+        query = query.where(Task.priority == priority)
+    if assignee_id is not None:
+        query = query.where(Task.assignee_id == assignee_id)
+    return query
+
+
+def paginate_task_query(query: Select, limit: int, cursor: str | None = None) -> Select:
+    """Apply keyset pagination over (updated_at, id), newest first.
+
+    One extra row is fetched so the caller can tell whether a next page exists.
+    """
+    if cursor:
+        updated_at, task_id = decode_cursor(cursor)
+        query = query.where(tuple_(Task.updated_at, Task.id) < (updated_at, task_id))
+    return query.order_by(Task.updated_at.desc(), Task.id.desc()).limit(limit + 1)
+
+
+def split_task_page(tasks: list, limit: int) -> tuple[list, str | None]:
+    """Trim the look-ahead row and build the cursor for the next page.
+
+    Works on Task entities and on rows with ``updated_at`` and ``id`` alike.
+    """
+    if len(tasks) <= limit:
+        return tasks, None
+    tasks = tasks[:limit]
+    return tasks, encode_cursor(tasks[-1].updated_at, tasks[-1].id)
+
+
+def get_tasks(
+    db: Session,
+    user: User,
+    project_id: int | None = None,
+    status: TaskStatus | None = None,
+    priority: TaskPriority | None = None,
+    assignee_id: int | None = None,
+) -> list[Task]:
+    """Get tasks, optionally filtered by project, status, priority or assignee"""
+    query = task_list_query(user, project_id, status, priority, assignee_id)
+    if project_id:
+        use_project(db, project_id)
+        return list(db.scalars(query).all())
+    return scalars_everywhere(db, query, key=attrgetter("id"))
+
+
+def get_tasks_page(
+    db: Session,
+    user: User,
+    limit: int,
+    cursor: str | None = None,
+    project_id: int | None = None,
+    status: TaskStatus | None = None,
+    priority: TaskPriority | None = None,
+    assignee_id: int | None = None,
+) -> tuple[list[Task], str | None]:
+    """Get one page of tasks and the cursor of the next page, if any"""
+    query = paginate_task_query(
+        task_list_query(user, project_id, status, priority, assignee_id), limit, cursor
+    )
     if project_id:
-        query = query.filter(Task.project_id == project_id)
-    return query.all()
+        use_project(db, project_id)
+        tasks = list(db.scalars(query).all())
+    else:
+        tasks = scalars_everywhere(db, query, key=PAGE_ORDER, reverse=True, limit=limit + 1)
+    return split_task_page(tasks, limit)
 
 
 def get_task(db: Session, task_id: int, user: User) -> Task:
     """Get a specific task"""
+    use_task(db, task_id)
     task = (
         db.query(Task)
         .join(Project)
@@ -30,30 +138,264 @@ def get_task(db: Session, task_id: int, user: User) -> Task:
 def create_task(db: Session, task_data: TaskCreate, user: User) -> Task:
     """Create a new task"""
     # Verify project ownership
+    use_project(db, task_data.project_id)
     project = db.query(Project).filter(Project.id == task_data.project_id).first()
     if not project or project.owner_id != user.id:
         raise ForbiddenException("Access denied to this project")
 
-    task = Task(**task_data.model_dump())
-    db.add(task)
-    db.commit()
-    db.refresh(task)
+    task = commit_returning(
+        db, insert(Task).values(**task_data.model_dump(), **new_id("tasks")).returning(Task)
+    )
+    if shard_set.enabled:
+        shard_set.remember_tasks({task.id: task.project_id})
+    invalidate(("task", task.id), ("project", task.project_id), ("owner", user.id))
+    publish_task_event("task.created", task)
     return task
 
 
 def update_task(db: Session, task_id: int, task_data: TaskUpdate, user: User) -> Task:
     """Update a task"""
-    task = get_task(db, task_id, user)
     update_data = task_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(task, key, value)
-    db.commit()
-    db.refresh(task)
+    if not update_data:
+        return get_task(db, task_id, user)
+    use_task(db, task_id)
+    # Correlated on the task's project, so only one project row is looked up
+    # however many projects the user owns
+    owned_project = (
+        select(Project.id)
+        .where(Project.id == Task.project_id, Project.owner_id == user.id)
+        .exists()
+    )
+    task = commit_returning_grouped(
+        db,
+        update(Task)
+        .where(Task.id == task_id, owned_project)
+        .values(**update_data)
+        .returning(Task),
+    )
+    if task is None:
+        raise NotFoundException("Task not found")
+    invalidate(("task", task.id), ("project", task.project_id), ("owner", user.id))
+    publish_task_event("task.updated", task)
     return task
 
 
 def delete_task(db: Session, task_id: int, user: User) -> None:
     """Delete a task"""
     task = get_task(db, task_id, user)
+    project_id, task_id = task.project_id, task.id
     db.delete(task)
+    db.add(
+        Tombstone(
+            entity_type="task", entity_id=task_id, owner_id=user.id, **new_id("tombstones")
+        )
+    )
     db.commit()
+    invalidate(("task", task_id), ("project", project_id), ("owner", user.id))
+    publish_task_deleted(project_id, task_id)
+
+
+# Bound on the number of ids in one IN (...) list
+BATCH_CHUNK_SIZE = 500
+
+
+def _chunks(values: list, size: int = BATCH_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _owned_project_ids(db: Session, project_ids: set[int], user: User) -> set[int]:
+    """Return the subset of project_ids owned by the user"""
+    owned: set[int] = set()
+    for chunk in _chunks(sorted(project_ids)):
+        owned.update(
+            db.scalars(
+                select(Project.id).where(Project.id.in_(chunk), Project.owner_id == user.id)
+            )
+        )
+    return owned
+
+
+def _owned_tasks(db: Session, task_ids: set[int], user: User) -> dict[int, int]:
+    """Map the task_ids in projects owned by the user to their project ids"""
+    owned: dict[int, int] = {}
+    for chunk in _chunks(sorted(task_ids)):
+        owned.update(
+            db.execute(
+                select(Task.id, Task.project_id)
+                .join(Project)
+                .where(Task.id.in_(chunk), Project.owner_id == user.id)
+            ).all()
+        )
+    return owned
+
+
+def _invalidate_task_rows(tasks, user: User) -> None:
+    tasks = list(tasks)
+    if not tasks:
+        return
+    invalidate_many(
+        [("task", task["id"]) for task in tasks]
+        + [("project", project_id) for project_id in {task["project_id"] for task in tasks}]
+        + [("owner", user.id)]
+    )
+
+
+def _batch_result(results: list[dict]) -> TaskBatchResult:
+    # Items are plain dicts so the whole response is validated in one pass
+    succeeded = sum(1 for result in results if result["status"] < 400)
+    return TaskBatchResult.model_validate(
+        {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+    )
+
+
+def _per_shard(
+    db: Session, items: list, shards: list[int], apply: Callable, user: User
+) -> TaskBatchResult:
+    """Run the batch operation ``apply`` on each shard's share of ``items``.
+
+    Each shard commits on its own, so a batch spanning shards is atomic per
+    shard only. Results keep the input order.
+    """
+    indexes_by_shard = defaultdict(list)
+    for index, shard in enumerate(shards):
+        indexes_by_shard[shard].append(index)
+    results: list[dict | None] = [None] * len(items)
+    for shard, indexes in indexes_by_shard.items():
+        db.info["shard"] = shard
+        shard_result = apply(db, [items[index] for index in indexes], user)
+        for result in shard_result.results:
+            index = indexes[result.index]
+            results[index] = {**result.model_dump(), "index": index}
+    return _batch_result(results)
+
+
+def create_tasks_batch(db: Session, items: list[TaskCreate], user: User) -> TaskBatchResult:
+    """Create many tasks in one transaction (one per shard when sharded).
+
+    Ownership is checked once per distinct project and the rows are written
+    with one executemany INSERT ... RETURNING, so no per-task round trips.
+    """
+    if shard_set.enabled:
+        shards = shards_of_projects(item.project_id for item in items)
+        return _per_shard(db, items, shards, _create_tasks_batch, user)
+    return _create_tasks_batch(db, items, user)
+
+
+def _create_tasks_batch(db: Session, items: list[TaskCreate], user: User) -> TaskBatchResult:
+    owned = _owned_project_ids(db, {item.project_id for item in items}, user)
+    now = datetime.utcnow()
+    results: list[dict | None] = [None] * len(items)
+    rows, row_indexes = [], []
+    for index, item in enumerate(items):
+        if item.project_id not in owned:
+            results[index] = {
+                "index": index, "status": 403, "error": "Access denied to this project"
+            }
+            continue
+        rows.append({**item.model_dump(), "created_at": now, "updated_at": now})
+        row_indexes.append(index)
+
+    if rows:
+        assign_ids("tasks", rows)
+        table = Task.__table__
+        # RETURNING is unordered across insertmanyvalues batches, but ids are
+        # assigned in VALUES order, so sorting by id restores the input order
+        result = db.execute(insert(table).returning(*table.c), rows)
+        columns = list(result.keys())
+        inserted = sorted((dict(zip(columns, row)) for row in result), key=lambda r: r["id"])
+        for index, task in zip(row_indexes, inserted):
+            results[index] = {"index": index, "status": 201, "id": task["id"], "task": task}
+    db.commit()
+    created = [result["task"] for result in results if result["status"] == 201]
+    _invalidate_task_rows(created, user)
+    publish_task_rows("task.created", created)
+    return _batch_result(results)
+
+
+def update_tasks_batch(
+    db: Session, items: list[TaskBatchUpdateItem], user: User
+) -> TaskBatchResult:
+    """Apply many partial task updates in one transaction (one per shard when sharded)"""
+    if shard_set.enabled:
+        shards = shards_of_tasks(item.id for item in items)
+        return _per_shard(db, items, shards, _update_tasks_batch, user)
+    return _update_tasks_batch(db, items, user)
+
+
+def _update_tasks_batch(
+    db: Session, items: list[TaskBatchUpdateItem], user: User
+) -> TaskBatchResult:
+    owned = _owned_tasks(db, {item.id for item in items}, user)
+    now = datetime.utcnow()
+    results: list[dict | None] = [None] * len(items)
+    mappings, updated_indexes = [], []
+    for index, item in enumerate(items):
+        if item.id not in owned:
+            results[index] = {
+                "index": index, "status": 404, "id": item.id, "error": "Task not found"
+            }
+            continue
+        changes = item.model_dump(exclude_unset=True, exclude={"id"})
+        mappings.append({"id": item.id, **changes, "updated_at": now})
+        updated_indexes.append(index)
+
+    if mappings:
+        # ORM bulk UPDATE by primary key: grouped into executemany batches per column set
+        db.execute(update(Task), mappings)
+        table = Task.__table__
+        tasks = {}
+        for chunk in _chunks(sorted({mapping["id"] for mapping in mappings})):
+            result = db.execute(select(table).where(table.c.id.in_(chunk)))
+            columns = list(result.keys())
+            tasks.update((row.id, dict(zip(columns, row))) for row in result)
+        for index in updated_indexes:
+            task = tasks[items[index].id]
+            results[index] = {"index": index, "status": 200, "id": task["id"], "task": task}
+    db.commit()
+    updated = [result["task"] for result in results if result["status"] == 200]
+    _invalidate_task_rows(updated, user)
+    publish_task_rows("task.updated", updated)
+    return _batch_result(results)
+
+
+def delete_tasks_batch(db: Session, task_ids: list[int], user: User) -> TaskBatchResult:
+    """Delete many tasks, with their comments and label links, in one transaction
+    (one per shard when sharded).
+
+    Only the tasks get tombstones; a deleted task implies its comments are gone.
+    """
+    if shard_set.enabled:
+        return _per_shard(db, task_ids, shards_of_tasks(task_ids), _delete_tasks_batch, user)
+    return _delete_tasks_batch(db, task_ids, user)
+
+
+def _delete_tasks_batch(db: Session, task_ids: list[int], user: User) -> TaskBatchResult:
+    owned = _owned_tasks(db, set(task_ids), user)
+    now = datetime.utcnow()
+    for chunk in _chunks(sorted(owned)):
+        db.execute(delete(Comment.__table__).where(Comment.task_id.in_(chunk)))
+        db.execute(delete(TaskLabel).where(TaskLabel.c.task_id.in_(chunk)))
+        db.execute(delete(Task.__table__).where(Task.id.in_(chunk)))
+        tombstones = [
+            {"entity_type": "task", "entity_id": task_id, "owner_id": user.id, "deleted_at": now}
+            for task_id in chunk
+        ]
+        assign_ids("tombstones", tombstones)
+        db.execute(insert(Tombstone.__table__), tombstones)
+    db.commit()
+    invalidate_many(
+        [("task", task_id) for task_id in owned]
+        + [("project", project_id) for project_id in set(owned.values())]
+        + ([("owner", user.id)] if owned else [])
+    )
+    for task_id, project_id in owned.items():
+        publish_task_deleted(project_id, task_id)
+
+    results = [
+        {"index": index, "status": 204, "id": task_id}
+        if task_id in owned
+        else {"index": index, "status": 404, "id": task_id, "error": "Task not found"}
+        for index, task_id in enumerate(task_ids)
+    ]
+    return _batch_result(results)
@@ -0,0 +1,293 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Largest datagram sent or accepted, below the default Unix socket send buffer;
+# publish refuses larger messages and senders split invalidations well below this
+MAX_MESSAGE_BYTES = 200_000
+# Room for the [sender pid, sequence number, ...] envelope around a message
+ENVELOPE_BYTES = 64
+# (entity, id) pairs per invalidation message
+INVALIDATION_CHUNK_SIZE = 1000
+# How long a new worker may go unnoticed by the others
+PEER_REFRESH_SECONDS = 1.0
+# A peer that cannot take a message for this long is skipped for that message
+SEND_TIMEOUT_SECONDS = 1.0
+
+Handler = Callable[[Any], None]
+
+# Sent to a peer that missed messages, so it notices before the next real message
+_PING = json.dumps(["bus.ping", None]).encode()
+
+
+def default_bus_directory() -> str:
+    """A directory shared by every worker serving the same database"""
+    digest = hashlib.sha1(settings.DATABASE_URL.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"taskforge-bus-{digest}")
+
+
+class WorkerBus:
+    """Broadcasts small messages to the other worker processes on this host.
+
+    Each worker binds a Unix datagram socket named after its pid in a shared
+    directory and sends every message to all the others, so there is no
+    broker process and no leader: starting or losing a worker only adds or
+    removes a socket file. Messages are JSON ``[sender pid, sequence number,
+    [channel, payload]]``, numbered per receiving peer.
+
+    Handlers for a channel run in the publishing thread for local messages
+    and on the event loop for messages from other workers, so they must be
+    thread-safe. Sends go through a background thread; a blocking send there
+    waits out a busy peer instead of dropping the message, without ever
+    blocking a request.
+
+    A message can still be lost: too large to send, or dropped after a peer
+    stayed busy for SEND_TIMEOUT_SECONDS. A receiver that sees a gap in a
+    sender's numbers runs the ``on_lost`` handlers, which drop whatever state
+    the missed messages could have corrected.
+    """
+
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+        self.oversized = 0
+        self.lost = 0
+        self._handlers: dict[str, list[Handler]] = {}
+        self._lost_handlers: list[Callable[[], None]] = []
+        self._pid = os.getpid()
+        # Sender side, only touched by the sender thread: last number sent to each
+        # peer, and the peers that missed a message since their last delivery
+        self._sequences: dict[str, int] = {}
+        self._owed: set[str] = set()
+        # Receiver side: last number received from each sender pid
+        self._received: dict[int, int] = {}
+        self._socket: socket.socket | None = None
+        self._path: str | None = None
+        self._directory: str | None = None
+        self._peers: tuple[str, ...] = ()
+        self._peers_checked = 0.0
+        self._outbox: queue.SimpleQueue[bytes | None] = queue.SimpleQueue()
+        self._sender: threading.Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._socket is not None
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def on_lost(self, handler: Callable[[], None]) -> None:
+        """Call ``handler()`` on the event loop when messages from a peer were lost"""
+        self._lost_handlers.append(handler)
+
+    def start(self, directory: str) -> None:
+        """Join the bus; must be called on the event loop that will receive"""
+        if self.running:
+            return
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        path = os.path.join(directory, f"{os.getpid()}.sock")
+        if os.path.exists(path):
+            os.unlink(path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(path)
+        sock.setblocking(False)
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(sock.fileno(), self._receive)
+        self._socket, self._path, self._directory = sock, path, directory
+        self._pid = os.getpid()
+        self._peers_checked = 0.0
+        self._sender = threading.Thread(target=self._send_loop, name="worker-bus", daemon=True)
+        self._sender.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self._outbox.put(None)
+        self._sender.join(timeout=SEND_TIMEOUT_SECONDS * 2)
+        self._loop.remove_reader(self._socket.fileno())
+        self._socket.close()
+        try:
+            os.unlink(self._path)
+        except FileNotFoundError:
+            pass
+        self._socket = self._path = self._sender = self._loop = None
+        self._peers = ()
+
+    def has_peers(self) -> bool:
+        return bool(self._current_peers())
+
+    def publish(self, channel: str, payload: Any, local: bool = True) -> bool:
+        """Queue a message for every other worker, applying it here first.
+
+        ``local=False`` is for callers that have already applied it themselves.
+        Returns False, without sending, when the message is too large for the
+        bus; the caller should send something smaller in its place.
+        """
+        if local:
+            self._dispatch(channel, payload)
+        if not self.has_peers():
+            return True
+        data = json.dumps([channel, payload]).encode()
+        if len(data) > MAX_MESSAGE_BYTES - ENVELOPE_BYTES:
+            self.oversized += 1
+            logger.warning("Worker bus message on %r too large: %d bytes", channel, len(data))
+            return False
+        self._outbox.put(data)
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "directory": self._directory,
+            "peers": len(self._peers),
+            "sent": self.sent,
+            "received": self.received,
+            "dropped": self.dropped,
+            "oversized": self.oversized,
+            "lost": self.lost,
+        }
+
+    def _current_peers(self) -> tuple[str, ...]:
+        if self._directory is None:
+            return ()
+        now = time.monotonic()
+        if now - self._peers_checked > PEER_REFRESH_SECONDS:
+            self._peers_checked = now
+            try:
+                self._peers = tuple(
+                    entry.path
+                    for entry in os.scandir(self._directory)
+                    if entry.name.endswith(".sock") and entry.path != self._path
+                )
+            except FileNotFoundError:
+                self._peers = ()
+        return self._peers
+
+    def _send_loop(self) -> None:
+        # A separate blocking socket, so the receiving socket can stay non-blocking
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sender.settimeout(SEND_TIMEOUT_SECONDS)
+        try:
+            while True:
+                try:
+                    data = self._outbox.get(timeout=SEND_TIMEOUT_SECONDS if self._owed else None)
+                except queue.Empty:
+                    # Idle: let peers that missed a message find out now
+                    data, peers = _PING, tuple(self._owed)
+                else:
+                    if data is None:
+                        return
+                    peers = self._current_peers()
+                for peer in peers:
+                    self._send(sender, peer, data)
+        finally:
+            sender.close()
+
+    def _send(self, sender: socket.socket, peer: str, data: bytes) -> None:
+        # Numbered even if the send fails, so the peer sees the gap
+        sequence = self._sequences.get(peer, 0) + 1
+        self._sequences[peer] = sequence
+        try:
+            sender.sendto(b"[%d,%d,%b]" % (self._pid, sequence, data), peer)
+            self.sent += 1
+            self._owed.discard(peer)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # The worker behind this socket has exited
+            self._forget(peer)
+        except OSError as exc:
+            self.dropped += 1
+            self._owed.add(peer)
+            logger.warning("Worker bus message to %s dropped: %s", peer, exc)
+
+    def _forget(self, peer: str) -> None:
+        try:
+            os.unlink(peer)
+        except FileNotFoundError:
+            pass
+        self._peers = tuple(path for path in self._peers if path != peer)
+        self._sequences.pop(peer, None)
+        self._owed.discard(peer)
+
+    def _receive(self) -> None:
+        while True:
+            try:
+                data = self._socket.recv(MAX_MESSAGE_BYTES)
+            except (BlockingIOError, OSError):
+                return
+            self.received += 1
+            try:
+                sender, sequence, (channel, payload) = json.loads(data)
+            except (ValueError, TypeError):
+                logger.warning("Ignoring malformed worker bus message")
+                self._lose()
+                continue
+            expected = self._received.get(sender, 0) + 1
+            self._received[sender] = sequence
+            if sequence != expected:
+                self._lose()
+            self._dispatch(channel, payload)
+
+    def _lose(self) -> None:
+        self.lost += 1
+        logger.warning("Worker bus messages were lost, dropping state they may have updated")
+        for handler in self._lost_handlers:
+            try:
+                handler()
+            except Exception:
+                logger.exception("Worker bus lost-message handler failed")
+
+    def _dispatch(self, channel: str, payload: Any) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Worker bus handler for %r failed", channel)
+
+
+worker_bus = WorkerBus()
+
+_invalidation_handlers: dict[str, list[Callable[[int], None]]] = {}
+
+
+def on_invalidate(entity: str, handler: Callable[[int], None]) -> None:
+    """Call ``handler(id)`` in every worker whenever an ``entity`` row changes"""
+    _invalidation_handlers.setdefault(entity, []).append(handler)
+
+
+def invalidate(*keys: tuple[str, int]) -> None:
+    """Announce changed (entity, id) rows to this and every other worker"""
+    invalidate_many(keys)
+
+
+def invalidate_many(keys: Iterable[tuple[str, int]]) -> None:
+    chunk: list[tuple[str, int]] = []
+    for key in keys:
+        chunk.append(key)
+        if len(chunk) >= INVALIDATION_CHUNK_SIZE:
+            worker_bus.publish("invalidate", chunk)
+            chunk = []
+    if chunk:
+        worker_bus.publish("invalidate", chunk)
+
+
+def _apply_invalidations(keys: list) -> None:
+    for entity, entity_id in keys:
+        for handler in _invalidation_handlers.get(entity, ()):
+            handler(entity_id)
+
+
+worker_bus.subscribe("invalidate", _apply_invalidations)
@@ -0,0 +1,29 @@
+import hashlib
+from fastapi import Request, Response, status
+
+
+def make_etag(user_id: int, fingerprint: tuple) -> str:
+    """Weak ETag for a fingerprint from app.services.fingerprint_service.
+
+    The user is part of the tag, so a browser cache shared by two accounts
+    never revalidates one user's copy against the other's rows.
+    """
+    digest = hashlib.sha1(repr((user_id, *fingerprint)).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of ``etag`` against the request's If-None-Match"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def not_modified(etag: str, headers: dict[str, str] | None = None) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED, headers={**(headers or {}), "ETag": etag}
+    )
@@ -0,0 +1,332 @@
+import asyncio
+import json
+import signal
+import threading
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from typing import Any
+from fastapi import WebSocket, status
+from fastapi.responses import StreamingResponse
+from starlette.types import Message, Receive, Scope, Send
+from app.config import settings
+from app.utils.bus import worker_bus
+from app.schemas.comment import Comment as CommentSchema
+from app.schemas.task import Task as TaskSchema
+
+# (event type, JSON payload); the payload is encoded once per publish, not per subscriber
+Event = tuple[str, str]
+
+# Keep caches and buffering proxies from holding back the stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+class Subscription:
+    """One subscriber's bounded buffer of pending events.
+
+    A deque and a single waiter future rather than an asyncio.Queue, so an
+    idle subscriber costs only a few hundred bytes.
+    """
+
+    __slots__ = ("project_id", "closed", "overflowed", "_buffer", "_max_size", "_waiter")
+
+    def __init__(self, project_id: int, max_size: int):
+        self.project_id = project_id
+        self.closed = False
+        self.overflowed = False
+        self._buffer: deque[Event] = deque()
+        self._max_size = max_size
+        self._waiter: asyncio.Future | None = None
+
+    def push(self, event: Event) -> bool:
+        """Buffer an event; returns False if the subscriber has fallen too far behind"""
+        if len(self._buffer) >= self._max_size:
+            self.overflow()
+            return False
+        self._buffer.append(event)
+        self._wake()
+        return True
+
+    def overflow(self) -> None:
+        """End the subscription, telling the client to resync"""
+        # Whatever is buffered is already stale for a client that must resync
+        self._buffer.clear()
+        self.overflowed = True
+        self.close()
+
+    def close(self) -> None:
+        self.closed = True
+        self._wake()
+
+    async def get(self, timeout: float) -> Event | None:
+        """Next event, or None once closed or after ``timeout`` idle seconds"""
+        if self._buffer:
+            return self._buffer.popleft()
+        if self.closed:
+            return None
+        loop = asyncio.get_running_loop()
+        self._waiter = loop.create_future()
+        timer = loop.call_later(timeout, self._wake)
+        try:
+            await self._waiter
+        finally:
+            timer.cancel()
+            self._waiter = None
+        return self._buffer.popleft() if self._buffer else None
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+
+class EventBroker:
+    """In-process fan-out of project events to live subscribers.
+
+    Subscriptions belong to the event loop. ``publish`` may be called from
+    any thread, since the sync services run in the threadpool, and hands
+    delivery over to the loop. A subscriber whose buffer fills up is dropped
+    instead of holding back the others.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.published = 0
+        self.dropped = 0
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def subscribe(self, project_id: int) -> Subscription:
+        """Register a subscriber; must be called on the event loop"""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(project_id, self.queue_size)
+        self._subscribers.setdefault(project_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        subscribers = self._subscribers.get(subscription.project_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.project_id]
+
+    def has_subscribers(self, project_id: int) -> bool:
+        return project_id in self._subscribers
+
+    def wants(self, project_id: int) -> bool:
+        """Whether an event for the project may have a subscriber in any worker"""
+        return project_id in self._subscribers or worker_bus.has_peers()
+
+    def publish(self, project_id: int, event_type: str, data: dict[str, Any]) -> None:
+        """Send an event to the project's subscribers in every worker.
+
+        ``data`` must be JSON-ready.
+        """
+        if not self.wants(project_id):
+            return
+        payload = json.dumps({"type": event_type, "project_id": project_id, **data})
+        self.deliver(project_id, (event_type, payload))
+        if not worker_bus.publish("event", [project_id, event_type, payload], local=False):
+            # Too large for the bus: the other workers' subscribers resync instead
+            worker_bus.publish("event.lost", project_id, local=False)
+
+    def deliver(self, project_id: int, event: Event) -> None:
+        """Hand an event to this worker's subscribers, from any thread"""
+        if project_id not in self._subscribers or self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._deliver(project_id, event)
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, project_id, event)
+        except RuntimeError:
+            # The loop has shut down, taking its subscribers with it
+            pass
+
+    def resync(self, project_id: int | None = None) -> None:
+        """Drop the project's subscribers, or everyone's, as if they fell behind.
+
+        For events that cannot be delivered; must be called on the event loop.
+        """
+        if project_id is None:
+            project_ids = list(self._subscribers)
+        else:
+            project_ids = [project_id] if project_id in self._subscribers else []
+        for subscribed_project in project_ids:
+            for subscription in list(self._subscribers[subscribed_project]):
+                subscription.overflow()
+                self.dropped += 1
+                self.unsubscribe(subscription)
+
+    def close_all(self) -> None:
+        """End every subscription, letting their streams finish"""
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                self.unsubscribe(subscription)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "projects": len(self._subscribers),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+    def _deliver(self, project_id: int, event: Event) -> None:
+        subscribers = self._subscribers.get(project_id)
+        if not subscribers:
+            return
+        self.published += 1
+        for subscription in list(subscribers):
+            if not subscription.push(event):
+                self.dropped += 1
+                self.unsubscribe(subscription)
+
+
+event_broker = EventBroker(queue_size=settings.EVENT_QUEUE_SIZE)
+worker_bus.subscribe(
+    "event", lambda message: event_broker.deliver(message[0], (message[1], message[2]))
+)
+worker_bus.subscribe("event.lost", event_broker.resync)
+worker_bus.on_lost(event_broker.resync)
+
+
+def close_streams_on_exit() -> None:
+    """Chain onto the server's SIGINT/SIGTERM handlers to end event streams.
+
+    Uvicorn waits for open responses to finish before running lifespan
+    shutdown, and an event stream never finishes by itself, so without this a
+    worker with subscribers would not stop until it is killed.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(event_broker.close_all)
+            previous(signum, frame)
+
+        signal.signal(sig, handler)
+
+
+def publish_task_event(event_type: str, task) -> None:
+    """Publish a task.created or task.updated event for a task row"""
+    if event_broker.wants(task.project_id):
+        task_data = TaskSchema.model_validate(task).model_dump(mode="json")
+        event_broker.publish(task.project_id, event_type, {"task": task_data})
+
+
+def publish_task_rows(event_type: str, tasks: Iterable[dict]) -> None:
+    """Publish a task.created or task.updated event for each task row dict of a batch"""
+    for task in tasks:
+        if event_broker.wants(task["project_id"]):
+            task_data = TaskSchema.model_validate(task).model_dump(mode="json")
+            event_broker.publish(task["project_id"], event_type, {"task": task_data})
+
+
+def publish_task_deleted(project_id: int, task_id: int) -> None:
+    event_broker.publish(project_id, "task.deleted", {"task_id": task_id})
+
+
+def publish_comment_created(project_id: int, comment) -> None:
+    if event_broker.wants(project_id):
+        comment_data = CommentSchema.model_validate(comment).model_dump(mode="json")
+        event_broker.publish(project_id, "comment.created", {"comment": comment_data})
+
+
+async def _close_on_disconnect(
+    receive: Callable[[], Awaitable[Message]], disconnect_type: str, subscription: Subscription
+) -> None:
+    try:
+        while (await receive())["type"] != disconnect_type:
+            pass
+    except Exception:
+        # Any receive failure means the connection is gone
+        pass
+    finally:
+        subscription.close()
+
+
+async def _sse_chunks(subscription: Subscription) -> AsyncIterator[bytes]:
+    try:
+        yield b": subscribed\n\n"
+        while True:
+            event = await subscription.get(settings.EVENT_HEARTBEAT_SECONDS)
+            if event is not None:
+                yield f"event: {event[0]}\ndata: {event[1]}\n\n".encode()
+            elif subscription.overflowed:
+                yield b"event: overflow\ndata: {}\n\n"
+                return
+            elif subscription.closed:
+                return
+            else:
+                yield b": keep-alive\n\n"
+    finally:
+        event_broker.unsubscribe(subscription)
+
+
+class EventStreamResponse(StreamingResponse):
+    """A subscription rendered as Server-Sent Events.
+
+    Idle streams get a comment line every EVENT_HEARTBEAT_SECONDS, which keeps
+    proxies from timing them out. A dropped subscriber gets a final
+    ``overflow`` event telling it to resync through the change feed.
+
+    StreamingResponse runs every body in a task group beside a disconnect
+    listener; here a single watcher task closes the subscription instead,
+    which matters when a worker holds thousands of idle streams.
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(self, subscription: Subscription):
+        super().__init__(_sse_chunks(subscription), headers=SSE_HEADERS)
+        self.subscription = subscription
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        watcher = asyncio.create_task(
+            _close_on_disconnect(receive, "http.disconnect", self.subscription)
+        )
+        try:
+            await send(
+                {"type": "http.response.start", "status": self.status_code,
+                 "headers": self.raw_headers}
+            )
+            async for chunk in self.body_iterator:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except OSError:
+            # The client went away mid-send
+            pass
+        finally:
+            watcher.cancel()
+            await self.body_iterator.aclose()
+
+
+async def pump_websocket(websocket: WebSocket, subscription: Subscription) -> None:
+    """Send a subscription's events over an accepted WebSocket until either side stops"""
+    watcher = asyncio.create_task(
+        _close_on_disconnect(websocket.receive, "websocket.disconnect", subscription)
+    )
+    try:
+        while True:
+            event = await subscription.get(settings.EVENT_HEARTBEAT_SECONDS)
+            if event is not None:
+                await websocket.send_text(event[1])
+            elif subscription.overflowed:
+                await websocket.close(
+                    code=status.WS_1013_TRY_AGAIN_LATER, reason="Subscriber fell behind"
+                )
+                return
+            elif subscription.closed:
+                return
+    finally:
+        watcher.cancel()
+        event_broker.unsubscribe(subscription)
@@ -0,0 +1,19 @@
+from collections.abc import Sequence
+from app.utils.exceptions import BadRequestException
+
+
+def parse_fieldset(value: str | None, allowed: Sequence[str], parameter: str) -> tuple[str, ...]:
+    """Parse a comma-separated ``?fields=`` / ``?expand=`` value.
+
+    Returns the names in the order of ``allowed``, so equivalent requests
+    produce the same response; an absent or empty value gives ().
+    """
+    if not value:
+        return ()
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise BadRequestException(
+            f"Unknown {parameter}: {', '.join(sorted(unknown))}; allowed: {', '.join(allowed)}"
+        )
+    return tuple(name for name in allowed if name in requested)
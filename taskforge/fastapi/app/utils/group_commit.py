@@ -0,0 +1,163 @@
+"""
+Group commit for small mutations.
+
+Under SQLite every commit is a write to the journal (and, with
+synchronous=FULL, an fsync), so a burst of one-row updates and comment
+inserts is bounded by commits per second rather than by the statements. With
+GROUP_COMMIT on, those writes are handed to a committer thread that collects
+the statements arriving within GROUP_COMMIT_WINDOW_MS (at most
+GROUP_COMMIT_MAX_BATCH) and runs them in one transaction.
+
+Each statement still gets its own result or error: a statement that fails is
+undone on its own (SQLite rolls back a failed statement, other databases get a
+SAVEPOINT per statement) and the rest of the batch commits. A caller is only
+answered after the commit, so a response never reports a write that could
+still be lost; the window is the extra latency a write may wait for company.
+Statements for different shards share the window but commit separately.
+"""
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import (
+    RETURNING_OPTIONS,
+    SessionLocal,
+    commit_returning,
+    commit_returning_async,
+)
+
+_STOP = object()
+
+
+class GroupCommitter:
+    """Runs submitted INSERT/UPDATE ... RETURNING statements in shared transactions"""
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self.commits = 0
+        self.statements = 0
+        self.largest_batch = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, statement, shard: int | None = None) -> Future:
+        """Queue ``statement`` for ``shard`` (see app.utils.shards); the future
+        resolves to its entity once committed"""
+        future: Future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="group-commit", daemon=True
+                )
+                self._thread.start()
+            self._queue.put((statement, shard, future))
+        return future
+
+    def stop(self) -> None:
+        """Commit what is queued and stop the committer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+        thread.join()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "commits": self.commits,
+            "statements": self.statements,
+            "largest_batch": self.largest_batch,
+        }
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stopping = False
+            deadline = time.monotonic() + settings.GROUP_COMMIT_WINDOW_MS / 1000
+            while len(batch) < settings.GROUP_COMMIT_MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            by_shard: dict[int | None, list] = {}
+            for statement, shard, future in batch:
+                by_shard.setdefault(shard, []).append((statement, future))
+            for shard, jobs in by_shard.items():
+                self._commit(jobs, shard)
+            if stopping:
+                return
+
+    def _commit(self, batch: list, shard: int | None = None) -> None:
+        outcomes = []
+        try:
+            with self.session_factory() as db:
+                if shard is not None:
+                    db.info["shard"] = shard
+                savepoints = db.get_bind().dialect.name != "sqlite"
+                for statement, future in batch:
+                    try:
+                        outcomes.append((future, self._execute(db, statement, savepoints), None))
+                    except Exception as exc:
+                        outcomes.append((future, None, exc))
+                db.commit()
+        except Exception as exc:
+            # The commit itself failed, so nothing in the batch was written
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        self.commits += 1
+        self.statements += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for future, obj, exc in outcomes:
+            if exc is None:
+                future.set_result(obj)
+            else:
+                future.set_exception(exc)
+
+    @staticmethod
+    def _execute(db: Session, statement, savepoint: bool):
+        if savepoint:
+            with db.begin_nested():
+                obj = db.scalar(statement, execution_options=RETURNING_OPTIONS)
+        else:
+            obj = db.scalar(statement, execution_options=RETURNING_OPTIONS)
+        if obj is not None:
+            # Detached so it keeps the RETURNING values through the commit
+            db.expunge(obj)
+        return obj
+
+
+group_committer = GroupCommitter()
+
+
+def commit_returning_grouped(db: Session, statement):
+    """commit_returning, through the group committer when GROUP_COMMIT is on"""
+    if not settings.GROUP_COMMIT:
+        return commit_returning(db, statement)
+    # Anything the request wrote itself commits first, so the statement lands after it
+    db.commit()
+    return group_committer.submit(statement, db.info.get("shard")).result()
+
+
+async def commit_returning_grouped_async(db: AsyncSession, statement):
+    """Async counterpart of commit_returning_grouped"""
+    if not settings.GROUP_COMMIT:
+        return await commit_returning_async(db, statement)
+    await db.commit()
+    return await asyncio.wrap_future(group_committer.submit(statement, db.info.get("shard")))
@@ -0,0 +1,255 @@
+import asyncio
+import fcntl
+import json
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from passlib.context import CryptContext
+from passlib.hash import bcrypt
+from app.config import settings
+from app.utils.exceptions import ServiceUnavailableException
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float, min_rounds: int = 4, max_rounds: int = 31
+) -> tuple[int, float]:
+    """Pick the bcrypt cost whose hash time on this machine is closest to ``target_ms``.
+
+    Each extra round doubles the work, so a cheap probe at a low cost is enough
+    to extrapolate. Returns the chosen cost and its measured duration in ms.
+    """
+    probe_rounds = min(max(8, min_rounds), max_rounds)
+    probe = bcrypt.using(rounds=probe_rounds)
+    samples = []
+    for _ in range(3):
+        start = time.perf_counter()
+        probe.hash("calibration")
+        samples.append(time.perf_counter() - start)
+    ms_per_unit = min(samples) * 1000 / 2**probe_rounds
+
+    rounds = round(math.log2(target_ms / ms_per_unit))
+    rounds = min(max(rounds, min_rounds), max_rounds)
+
+    start = time.perf_counter()
+    bcrypt.using(rounds=rounds).hash("calibration")
+    return rounds, (time.perf_counter() - start) * 1000
+
+
+def shared_calibration(
+    path: str, target_ms: float, min_rounds: int, max_rounds: int
+) -> tuple[int, float]:
+    """calibrate_bcrypt_rounds, once per host for all the workers sharing ``path``.
+
+    Workers calibrating on their own pick different costs near a rounding
+    boundary, and each would then rehash the others' hashes on every login.
+    The first worker to lock ``path`` measures and records the cost; the
+    others wait for the lock and use it. Changing the settings recalibrates.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    key = [target_ms, min_rounds, max_rounds]
+    with open(path, "a+") as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        file.seek(0)
+        try:
+            stored = json.loads(file.read())
+        except ValueError:
+            stored = None
+        if isinstance(stored, dict) and stored.get("key") == key:
+            return stored["rounds"], stored["measured_ms"]
+        rounds, measured_ms = calibrate_bcrypt_rounds(target_ms, min_rounds, max_rounds)
+        file.seek(0)
+        file.truncate()
+        json.dump({"key": key, "rounds": rounds, "measured_ms": measured_ms}, file)
+        return rounds, measured_ms
+
+
+def _configure_rounds(rounds: int | None) -> None:
+    # Pinning min/max to the cost makes needs_update() flag any other cost
+    if rounds is not None:
+        pwd_context.update(
+            bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds, bcrypt__max_rounds=rounds
+        )
+
+
+# Executed inside the worker processes, so they must stay importable top-level functions
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool behind a bounded queue.
+
+    At most ``queue_size`` hash/verify calls may be pending or running at once;
+    further calls are rejected immediately with a 503 instead of piling up
+    request threads. With ``workers=0`` the work runs inline in the caller.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.rounds: int | None = None
+        self.target_ms: float | None = None
+        self.measured_ms: float | None = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._lock = threading.Lock()
+
+    def hash(self, password: str) -> str:
+        return self._call(_hash, password)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._call(_verify, plain_password, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        return await self._call_async(_hash, password)
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._call_async(_verify, plain_password, hashed_password)
+
+    def calibrate(
+        self, target_ms: float, min_rounds: int, max_rounds: int, path: str | None = None
+    ) -> int:
+        """Calibrate the bcrypt cost for this machine and apply it to new hashes.
+
+        With ``path``, the cost is shared with the other workers through that file.
+        """
+        if path is None:
+            rounds, measured_ms = calibrate_bcrypt_rounds(target_ms, min_rounds, max_rounds)
+        else:
+            rounds, measured_ms = shared_calibration(path, target_ms, min_rounds, max_rounds)
+        self.target_ms = target_ms
+        self.measured_ms = measured_ms
+        self.set_rounds(rounds)
+        return rounds
+
+    def set_rounds(self, rounds: int) -> None:
+        _configure_rounds(rounds)
+        self.rounds = rounds
+        # Worker processes are configured at start-up, so restart them lazily
+        self.shutdown()
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return pwd_context.needs_update(hashed_password)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - self.workers),
+                "peak_in_flight": self.peak_in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _call(self, fn, *args):
+        try:
+            return self._submit(fn, *args).result()
+        except BrokenProcessPool:
+            pass
+        # A worker process died (the OOM killer, a crash) and took the pool and
+        # its pending calls with it; retry once, which starts a fresh pool
+        try:
+            return self._submit(fn, *args).result()
+        except BrokenProcessPool:
+            raise ServiceUnavailableException("Password hashing is unavailable, retry shortly")
+
+    async def _call_async(self, fn, *args):
+        try:
+            return await asyncio.wrap_future(self._submit(fn, *args))
+        except BrokenProcessPool:
+            pass
+        try:
+            return await asyncio.wrap_future(self._submit(fn, *args))
+        except BrokenProcessPool:
+            raise ServiceUnavailableException("Password hashing is unavailable, retry shortly")
+
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ServiceUnavailableException("Password hashing is busy, retry shortly")
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+        try:
+            if self.workers > 0:
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(fn, *args)
+                except BrokenProcessPool:
+                    # Broke since its last call: start a fresh pool
+                    self._discard(executor)
+                    executor = self._get_executor()
+                    future = executor.submit(fn, *args)
+                future.add_done_callback(partial(self._check_broken, executor))
+            else:
+                future = Future()
+                try:
+                    future.set_result(fn(*args))
+                except Exception as exc:
+                    future.set_exception(exc)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Future | None) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if future is not None:
+                self.completed += 1
+        self._slots.release()
+
+    def _check_broken(self, executor: ProcessPoolExecutor, future: Future) -> None:
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard(executor)
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken pool, so the next call starts a fresh one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        # Not waiting: this may run on the pool's own management thread
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn avoids forking a process that already runs server threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_configure_rounds,
+                    initargs=(self.rounds,),
+                )
+            return self._executor
+
+
+password_hasher = PasswordHasher(
+    workers=settings.HASH_POOL_WORKERS, queue_size=settings.HASH_QUEUE_SIZE
+)
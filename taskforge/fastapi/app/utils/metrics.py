@@ -0,0 +1,314 @@
+"""
+Request and resource metrics in the Prometheus text exposition format.
+
+MetricsMiddleware counts requests per route template and status and records
+their latency in fixed buckets. Gauges (in-flight requests, threadpool,
+connection pool and bcrypt pool) are read when a snapshot is taken.
+
+With several workers each one writes its snapshot to ``<pid>.json`` in a
+shared directory every METRICS_FLUSH_SECONDS, and ``/metrics`` sums its own
+live snapshot with those of the other running workers, so any worker can
+answer a scrape. The files of exited workers are dropped, which Prometheus
+sees as a counter reset.
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any
+import anyio.to_thread
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.database import async_engine, async_read_engine, engine, read_engine
+from app.utils.bus import default_bus_directory
+from app.utils.hashing import password_hasher
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "taskforge"
+# Upper bounds in seconds of the request latency histogram
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Route label of requests that matched no route, so stray paths cannot add series
+UNMATCHED_ROUTE = "unmatched"
+
+Sample = tuple[str, tuple[tuple[str, str], ...], float]
+
+
+def default_metrics_directory() -> str:
+    """Next to the worker bus sockets, shared by every worker on the same database"""
+    return os.path.join(default_bus_directory(), "metrics")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Metrics:
+    """Request counters and latency histograms for this worker.
+
+    The middleware updates them on the event loop; the flush thread reads
+    them, hence the lock.
+    """
+
+    def __init__(self):
+        self._requests: dict[tuple[str, str, str], int] = {}
+        # Per (method, route): a count per bucket plus +Inf, then the sum of seconds
+        self._durations: dict[tuple[str, str], list[float]] = {}
+        self._in_flight: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._limiter = None
+        self._directory: str | None = None
+        self._flusher: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._flusher is not None
+
+    def started(self, method: str) -> None:
+        with self._lock:
+            self._in_flight[method] = self._in_flight.get(method, 0) + 1
+
+    def finished(self, method: str, route: str, status: int, seconds: float) -> None:
+        with self._lock:
+            self._in_flight[method] -= 1
+            key = (method, route, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            durations = self._durations.get((method, route))
+            if durations is None:
+                durations = self._durations[(method, route)] = [0.0] * (len(BUCKETS) + 2)
+            durations[bisect.bisect_left(BUCKETS, seconds)] += 1
+            durations[-1] += seconds
+
+    def watch_threadpool(self) -> None:
+        """Remember the running loop's threadpool limiter; call on the event loop"""
+        if self._limiter is None:
+            self._limiter = anyio.to_thread.current_default_thread_limiter()
+
+    def snapshot(self) -> dict[str, Any]:
+        """This worker's counters and current gauges, JSON-serializable"""
+        with self._lock:
+            requests = [[*key, count] for key, count in self._requests.items()]
+            durations = [[*key, list(values)] for key, values in self._durations.items()]
+            in_flight = list(self._in_flight.items())
+        gauges = [
+            ["http_requests_in_flight", [["method", method]], count]
+            for method, count in in_flight
+        ]
+        gauges.extend([name, [list(label) for label in labels], value]
+                      for name, labels, value in _resource_gauges(self._limiter))
+        return {"requests": requests, "durations": durations, "gauges": gauges}
+
+    def collect(self) -> list[dict[str, Any]]:
+        """Snapshots of this worker and of every other running worker"""
+        snapshots = [self.snapshot()]
+        if self._directory is None:
+            return snapshots
+        try:
+            entries = list(os.scandir(self._directory))
+        except FileNotFoundError:
+            return snapshots
+        for entry in entries:
+            name, _, suffix = entry.name.partition(".")
+            if suffix != "json" or not name.isdigit() or int(name) == os.getpid():
+                continue
+            if not _pid_alive(int(name)):
+                _unlink(entry.path)
+                continue
+            try:
+                with open(entry.path, encoding="utf-8") as file:
+                    snapshots.append(json.load(file))
+            except (OSError, ValueError):
+                # Mid-replace or from an older release; the next scrape will see it
+                continue
+        return snapshots
+
+    def start(self, directory: str) -> None:
+        """Publish this worker's snapshot for the others; call on the event loop"""
+        if self.running:
+            return
+        self.watch_threadpool()
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self._directory = directory
+        self._stopped.clear()
+        self._flusher = threading.Thread(target=self._flush_loop, name="metrics", daemon=True)
+        self._flusher.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self._stopped.set()
+        self._flusher.join(timeout=settings.METRICS_FLUSH_SECONDS * 2)
+        _unlink(self._path())
+        self._flusher = self._directory = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests.clear()
+            self._durations.clear()
+            self._in_flight.clear()
+
+    def _path(self) -> str:
+        return os.path.join(self._directory, f"{os.getpid()}.json")
+
+    def _flush_loop(self) -> None:
+        path = self._path()
+        temporary = f"{path}.tmp"
+        while not self._stopped.wait(settings.METRICS_FLUSH_SECONDS):
+            try:
+                with open(temporary, "w", encoding="utf-8") as file:
+                    json.dump(self.snapshot(), file)
+                os.replace(temporary, path)
+            except OSError as exc:
+                logger.warning("Could not write metrics snapshot %s: %s", path, exc)
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _resource_gauges(limiter) -> list[Sample]:
+    samples: list[Sample] = []
+    if limiter is not None:
+        samples.append(("threadpool_threads_busy", (), limiter.borrowed_tokens))
+        samples.append(("threadpool_threads_limit", (), limiter.total_tokens))
+    engines = (async_engine, async_read_engine) if settings.ASYNC_DB else (engine, read_engine)
+    for role, pool_engine in zip(("primary", "reader"), engines):
+        if pool_engine is None:
+            continue
+        for gauge, method in (
+            ("db_pool_size", "size"),
+            ("db_pool_checked_out", "checkedout"),
+            ("db_pool_overflow", "overflow"),
+        ):
+            # Only QueuePool-style pools report these
+            if hasattr(pool_engine.pool, method):
+                samples.append((gauge, (("pool", role),), getattr(pool_engine.pool, method)()))
+    hashing = password_hasher.stats()
+    samples.append(("hash_pool_workers", (), hashing["workers"]))
+    samples.append(("hash_pool_in_flight", (), hashing["in_flight"]))
+    samples.append(("hash_pool_queued", (), hashing["queued"]))
+    return samples
+
+
+_HELP = {
+    "http_requests_total": ("counter", "Requests by method, route template and status"),
+    "http_request_duration_seconds": ("histogram", "Request latency until the response ends"),
+    "http_requests_in_flight": ("gauge", "Requests being handled"),
+    "threadpool_threads_busy": ("gauge", "Threadpool threads running sync endpoints"),
+    "threadpool_threads_limit": ("gauge", "Threadpool size"),
+    "db_pool_size": ("gauge", "Connection pool size"),
+    "db_pool_checked_out": ("gauge", "Connections checked out of the pool"),
+    "db_pool_overflow": ("gauge", "Connections open beyond the pool size"),
+    "hash_pool_workers": ("gauge", "bcrypt worker processes"),
+    "hash_pool_in_flight": ("gauge", "bcrypt hashes running or queued"),
+    "hash_pool_queued": ("gauge", "bcrypt hashes waiting for a worker"),
+    "workers": ("gauge", "Worker processes whose metrics are included"),
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render(snapshots: list[dict[str, Any]]) -> str:
+    """Sum worker snapshots into the text exposition format"""
+    requests: dict[tuple, float] = {}
+    durations: dict[tuple, list[float]] = {}
+    gauges: dict[str, dict[tuple, float]] = {}
+    for snapshot in snapshots:
+        for method, route, status, count in snapshot["requests"]:
+            key = (method, route, status)
+            requests[key] = requests.get(key, 0) + count
+        for method, route, values in snapshot["durations"]:
+            total = durations.setdefault((method, route), [0.0] * len(values))
+            for index, value in enumerate(values):
+                total[index] += value
+        for name, labels, value in snapshot["gauges"]:
+            series = gauges.setdefault(name, {})
+            key = tuple(tuple(label) for label in labels)
+            series[key] = series.get(key, 0) + value
+    gauges["workers"] = {(): len(snapshots)}
+
+    lines: list[str] = []
+
+    def header(name: str) -> str:
+        kind, text = _HELP[name]
+        lines.append(f"# HELP {PREFIX}_{name} {text}")
+        lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+        return f"{PREFIX}_{name}"
+
+    metric = header("http_requests_total")
+    for (method, route, status), count in sorted(requests.items()):
+        labels = _labels((("method", method), ("route", route), ("status", status)))
+        lines.append(f"{metric}{labels} {_number(count)}")
+    metric = header("http_request_duration_seconds")
+    for (method, route), values in sorted(durations.items()):
+        cumulative = 0.0
+        for bound, count in zip((*map(str, BUCKETS), "+Inf"), values):
+            cumulative += count
+            labels = _labels((("method", method), ("route", route), ("le", bound)))
+            lines.append(f"{metric}_bucket{labels} {_number(cumulative)}")
+        labels = _labels((("method", method), ("route", route)))
+        lines.append(f"{metric}_sum{labels} {_number(values[-1])}")
+        lines.append(f"{metric}_count{labels} {_number(cumulative)}")
+    for name in _HELP:
+        if name in gauges:
+            metric = header(name)
+            for labels, value in sorted(gauges[name].items()):
+                lines.append(f"{metric}{_labels(labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """Counts and times every HTTP request by its route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        metrics.started(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            metrics.finished(method, route, status, time.perf_counter() - start)
@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import datetime
+from app.utils.exceptions import BadRequestException
+
+
+def _encode(value) -> str:
+    raw = json.dumps(value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+
+def encode_cursor(updated_at: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for a row ordered by (updated_at, id)"""
+    return _encode([updated_at.isoformat(), row_id])
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        updated_at, row_id = _decode(cursor)
+        return datetime.fromisoformat(updated_at), int(row_id)
+    except (ValueError, TypeError):
+        raise BadRequestException("Invalid cursor")
+
+
+Position = tuple[datetime, int | None]
+
+
+def encode_positions(positions: dict[str, Position | None]) -> str:
+    """Opaque cursor holding one (updated_at, id) keyset position per source.
+
+    An id of None means "everything up to and including updated_at was seen".
+    """
+    return _encode(
+        {
+            name: None if position is None else [position[0].isoformat(), position[1]]
+            for name, position in positions.items()
+        }
+    )
+
+
+def decode_positions(cursor: str, names) -> dict[str, Position | None]:
+    try:
+        raw = _decode(cursor)
+        positions = {}
+        for name in names:
+            value = raw.get(name)
+            if value is None:
+                positions[name] = None
+            else:
+                updated_at, row_id = value
+                positions[name] = (
+                    datetime.fromisoformat(updated_at),
+                    None if row_id is None else int(row_id),
+                )
+        return positions
+    except (ValueError, TypeError, AttributeError):
+        raise BadRequestException("Invalid cursor")
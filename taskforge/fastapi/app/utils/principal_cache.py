@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from app.config import settings
+from app.utils.bus import invalidate_many, on_invalidate, worker_bus
+from app.models.user import User
+
+_USER_COLUMNS = [attr.key for attr in inspect(User).column_attrs]
+
+
+class PrincipalCache:
+    """Bounded LRU cache of authenticated users keyed by (user id, token exp).
+
+    Entries hold a snapshot of the user's column values rather than the ORM
+    instance, so a hit never touches a session. Every hit returns a fresh
+    transient ``User`` built from that snapshot.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple[int, int], tuple[float, dict[str, Any]]] = OrderedDict()
+        self._keys_by_user: dict[int, set[tuple[int, int]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, user_id: int, exp: int) -> User | None:
+        if not self.enabled:
+            return None
+        key = (user_id, exp)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            values = entry[1]
+        return User(**values)
+
+    def set(self, user_id: int, exp: int, user: User) -> None:
+        if not self.enabled:
+            return
+        key = (user_id, exp)
+        values = {column: getattr(user, column) for column in _USER_COLUMNS}
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, values)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop every cached token for a user"""
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key: tuple[int, int]) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_SIZE, ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+on_invalidate("user", principal_cache.invalidate)
+worker_bus.on_lost(principal_cache.clear)
+
+
+# Ids of users flushed in a session's transaction, invalidated once it commits:
+# dropping them at flush time would let a concurrent request cache the old row
+# again before the change is visible
+_CHANGED_USERS = "principal_cache.changed_users"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _record_changed_user(mapper, connection, target: User) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_USERS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    user_ids = session.info.pop(_CHANGED_USERS, None)
+    if user_ids:
+        invalidate_many(("user", user_id) for user_id in user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session) -> None:
+    session.info.pop(_CHANGED_USERS, None)
@@ -0,0 +1,246 @@
+"""
+On-demand request profiling.
+
+ProfilingMiddleware profiles a request when an admin sends ``X-Profile: 1``
+or when it falls in PROFILE_SAMPLE_RATE. A sampler thread records the stacks
+of the worker's busy threads every PROFILE_INTERVAL_MS while the request
+runs. This covers sync endpoints in the threadpool as well as the event loop,
+which cProfile (one thread only) would not. Concurrent requests show up in
+the same profile.
+
+Each profile is stored as collapsed stacks (``frame;frame;frame count``
+lines, the input of flamegraph.pl and speedscope) with a JSON sidecar. The
+files live in a directory that keeps the newest PROFILE_KEEP. The response
+carries the profile's id in ``X-Profile-Id``. Requests without the header pay
+one scan of their header list.
+"""
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.database import get_db
+from app.models.user import User, UserRole
+from app.utils.bus import default_bus_directory
+from app.utils.principal_cache import principal_cache
+from app.utils.security import decode_access_token
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_PATTERN = re.compile(r"^\d+-\d+-\d+$")
+
+# Innermost frames of a thread that is waiting rather than working
+_IDLE = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+
+def default_profile_directory() -> str:
+    return os.path.join(default_bus_directory(), "profiles")
+
+
+def _short_path(filename: str) -> str:
+    for marker in ("site-packages/", "lib/python"):
+        if marker in filename:
+            return filename.rsplit(marker, 1)[1]
+    cwd = os.getcwd() + os.sep
+    return filename[len(cwd):] if filename.startswith(cwd) else os.path.basename(filename)
+
+
+class StackSampler:
+    """Counts the collapsed stacks of every busy thread but its own"""
+
+    def __init__(self, interval_ms: float):
+        self.interval = interval_ms / 1000
+        self.samples = 0
+        self.stacks: Counter[str] = Counter()
+        self._labels: dict[Any, str] = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (
+                f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            )
+        return label
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                code = frame.f_code
+                if ident == own or (os.path.basename(code.co_filename), code.co_name) in _IDLE:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+
+
+class ProfileStore:
+    """Profiles on disk, newest ``keep`` retained"""
+
+    def __init__(self, directory: str, keep: int):
+        self.directory = directory
+        self.keep = keep
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def new_id(self) -> str:
+        with self._lock:
+            self._counter += 1
+            counter = self._counter
+        return f"{time.time_ns() // 1_000_000}-{os.getpid()}-{counter}"
+
+    def path(self, profile_id: str) -> str | None:
+        """The collapsed-stack file of ``profile_id``, or None if there is none"""
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.collapsed")
+        return path if os.path.exists(path) else None
+
+    def save(self, profile_id: str, collapsed: str, meta: dict[str, Any]) -> None:
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        base = os.path.join(self.directory, profile_id)
+        with open(f"{base}.collapsed", "w", encoding="utf-8") as file:
+            file.write(collapsed)
+        with open(f"{base}.json", "w", encoding="utf-8") as file:
+            json.dump({"id": profile_id, **meta}, file)
+        self._prune()
+
+    def entries(self) -> list[dict[str, Any]]:
+        """Metadata of the stored profiles, newest first"""
+        profiles = []
+        for profile_id in self._ids():
+            try:
+                path = os.path.join(self.directory, f"{profile_id}.json")
+                with open(path, encoding="utf-8") as file:
+                    profiles.append(json.load(file))
+            except (OSError, ValueError):
+                # Pruned by another worker since the listing
+                continue
+        return profiles
+
+    def _ids(self) -> list[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        ids = [name[: -len(".json")] for name in names if name.endswith(".json")]
+        ids = [profile_id for profile_id in ids if PROFILE_ID_PATTERN.match(profile_id)]
+        return sorted(ids, key=lambda i: tuple(map(int, i.split("-"))), reverse=True)
+
+    def _prune(self) -> None:
+        for profile_id in self._ids()[self.keep:]:
+            for suffix in (".json", ".collapsed"):
+                try:
+                    os.unlink(os.path.join(self.directory, profile_id + suffix))
+                except FileNotFoundError:
+                    pass
+
+
+profile_store = ProfileStore(
+    settings.PROFILE_DIR or default_profile_directory(), settings.PROFILE_KEEP
+)
+
+
+def _is_admin(app, token: str) -> bool:
+    try:
+        user_id, exp = decode_access_token(token)
+    except HTTPException:
+        return False
+    user = principal_cache.get(user_id, exp)
+    if user is None:
+        # The app's own database dependency, so overrides (tests) are honoured
+        sessions = app.dependency_overrides.get(get_db, get_db)()
+        try:
+            user = next(sessions).get(User, user_id)
+        finally:
+            sessions.close()
+    return user is not None and user.role == UserRole.ADMIN
+
+
+async def _trigger(scope: Scope) -> str | None:
+    """Why this request should be profiled, or None"""
+    if settings.PROFILE_SAMPLE_RATE and random.random() < settings.PROFILE_SAMPLE_RATE:
+        return "sampled"
+    if not any(name == PROFILE_HEADER for name, _ in scope["headers"]):
+        return None
+    headers = Headers(scope=scope)
+    if headers["x-profile"] in ("", "0"):
+        return None
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return "header" if await run_in_threadpool(_is_admin, scope["app"], token) else None
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        trigger = await _trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = profile_store.new_id()
+        status = 500
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        sampler = StackSampler(settings.PROFILE_INTERVAL_MS)
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            meta = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope["query_string"].decode("latin-1"),
+                "status": status,
+                "trigger": trigger,
+                "started_at": started_at.isoformat(),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                "interval_ms": settings.PROFILE_INTERVAL_MS,
+                "samples": sampler.samples,
+            }
+            await run_in_threadpool(profile_store.save, profile_id, sampler.collapsed(), meta)
@@ -0,0 +1,162 @@
+"""
+Read replicas: read-your-writes stickiness and local SQLite replica refreshes.
+
+GET requests read from a replica (see RoutingSession in app.database), which
+may lag the primary. So that users see their own changes, a mutating request
+marks its user as a recent writer in every worker through the worker bus, and
+that user's reads stay on the primary for READ_YOUR_WRITES_SECONDS.
+
+For local setups, ReplicaRefresher keeps SQLite file replicas of a SQLite
+primary current by copying the primary into each one through the sqlite3
+backup API. In WAL mode the copy runs alongside reads on the replica, which
+keep their snapshot until their transaction ends. Workers take turns through a
+lock file, so each replica is refreshed once per interval, not once per worker.
+"""
+import fcntl
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any
+from sqlalchemy.engine import make_url
+from app.config import settings
+from app.utils.bus import worker_bus
+
+logger = logging.getLogger(__name__)
+
+
+class ReadYourWrites:
+    """Users who wrote recently, with when their reads may use replicas again"""
+
+    def __init__(self):
+        self._until: dict[int, float] = {}
+        self._everyone_until = float("-inf")
+        self._lock = threading.Lock()
+
+    def wrote(self, user_id: int) -> None:
+        """Keep ``user_id`` on the primary in this and every other worker"""
+        worker_bus.publish("replica.wrote", user_id)
+
+    def sticky(self, user_id: int | None) -> bool:
+        if user_id is None:
+            return False
+        if self._everyone_until > time.monotonic():
+            return True
+        until = self._until.get(user_id)
+        if until is None:
+            return False
+        if until > time.monotonic():
+            return True
+        with self._lock:
+            if self._until.get(user_id) == until:
+                del self._until[user_id]
+        return False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._until.clear()
+            self._everyone_until = float("-inf")
+
+    def _mark(self, user_id: int) -> None:
+        with self._lock:
+            self._until[user_id] = time.monotonic() + settings.READ_YOUR_WRITES_SECONDS
+
+    def _mark_everyone(self) -> None:
+        # A lost message may have named any user
+        self._everyone_until = time.monotonic() + settings.READ_YOUR_WRITES_SECONDS
+
+
+read_your_writes = ReadYourWrites()
+worker_bus.subscribe("replica.wrote", read_your_writes._mark)
+worker_bus.on_lost(read_your_writes._mark_everyone)
+
+
+def sqlite_path(url: str) -> str | None:
+    """The database file of a SQLite ``url``, or None for other databases and memory"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:"):
+        return None
+    return parsed.database
+
+
+def copy_database(source: str, target: str) -> None:
+    """Replace the database file ``target`` with a consistent copy of ``source``"""
+    source_connection = sqlite3.connect(source)
+    target_connection = sqlite3.connect(target, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000)
+    try:
+        source_connection.backup(target_connection)
+    finally:
+        target_connection.close()
+        source_connection.close()
+
+
+class ReplicaRefresher:
+    """Copies a SQLite primary into SQLite file replicas every ``interval`` seconds"""
+
+    def __init__(self):
+        self.refreshes = 0
+        self.last_copy_ms = 0.0
+        self._source: str | None = None
+        self._targets: list[str] = []
+        self._interval = 0.0
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, primary_url: str, replica_urls: list[str], interval: float) -> None:
+        """Refresh the replicas now, then in a background thread"""
+        source = sqlite_path(primary_url)
+        targets = [path for path in map(sqlite_path, replica_urls) if path is not None]
+        if self._thread is not None or source is None or not targets or interval <= 0:
+            return
+        self._source, self._targets, self._interval = source, targets, interval
+        self.refresh()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def refresh(self) -> None:
+        """Copy the primary into every replica not refreshed within the interval"""
+        for target in self._targets:
+            with open(f"{target}.refresh", "a+") as lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # Another worker is copying into this replica
+                    continue
+                lock.seek(0)
+                last = lock.read()
+                if last and time.time() - float(last) < self._interval * 0.9:
+                    continue
+                start = time.perf_counter()
+                copy_database(self._source, target)
+                self.last_copy_ms = (time.perf_counter() - start) * 1000
+                self.refreshes += 1
+                lock.seek(0)
+                lock.truncate()
+                lock.write(str(time.time()))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "replicas": len(settings.read_replica_urls),
+            "refreshing": self._thread is not None,
+            "refreshes": self.refreshes,
+            "last_copy_ms": round(self.last_copy_ms, 3),
+            "sticky_seconds": settings.READ_YOUR_WRITES_SECONDS,
+        }
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Refreshing read replicas failed")
+
+
+replica_refresher = ReplicaRefresher()
@@ -0,0 +1,252 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Any
+import orjson
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from app.config import settings
+from app.utils.bus import on_invalidate, worker_bus
+from app.utils.conditional import etag_matches, not_modified
+
+# Bookkeeping per entry on top of its body, so many tiny entries still count
+ENTRY_OVERHEAD_BYTES = 256
+# A single body larger than this share of the budget is served but not cached
+MAX_ENTRY_SHARE = 16
+# Tags whose latest invalidation is remembered for in-flight fills
+RECENT_INVALIDATIONS = 10_000
+
+CacheKey = tuple[int, str, tuple[tuple[str, str], ...]]
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def _render(value: Any, response_type: Any) -> bytes:
+    adapter = _adapter(response_type)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def _json_response(body: bytes, headers: dict[str, str] | None, cache_status: str) -> Response:
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={**(headers or {}), "X-Cache": cache_status},
+    )
+
+
+def bypass_response(value: Any, headers: dict[str, str] | None = None) -> Response:
+    """Serialize ``value`` with orjson for a response the cache must not hold"""
+    return _json_response(orjson.dumps(value), headers, "BYPASS")
+
+
+class _Entry:
+    __slots__ = ("expires", "body", "headers", "tags", "size")
+
+    def __init__(self, expires, body, headers, tags, size):
+        self.expires = expires
+        self.body = body
+        self.headers = headers
+        self.tags = tags
+        self.size = size
+
+
+class CacheLookup:
+    """A cache probe for one request; answers it from the cache or fills the cache.
+
+    It remembers the invalidation generation at probe time, so a response built
+    from rows read before a concurrent write is returned but never stored.
+    """
+
+    __slots__ = ("cache", "key", "generation", "response")
+
+    def __init__(self, cache: "ResponseCache", key: CacheKey, generation: int, response):
+        self.cache = cache
+        self.key = key
+        self.generation = generation
+        self.response: Response | None = response
+
+    def respond(
+        self,
+        value: Any,
+        response_type: Any,
+        tags: Iterable[str],
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        """Serialize ``value`` as ``response_type``, cache the bytes and return them"""
+        return self._fill(_render(value, response_type), tags, headers)
+
+    def respond_rows(
+        self,
+        rows: list,
+        response_type: Any,
+        tags: Iterable[str],
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        """Like respond, for rows from app.services.read_service.
+
+        Their fields already match the response schema, so with FAST_JSON they
+        are dumped by orjson without being validated through it.
+        """
+        body = orjson.dumps(rows) if settings.FAST_JSON else _render(rows, response_type)
+        return self._fill(body, tags, headers)
+
+    def _fill(self, body: bytes, tags: Iterable[str], headers: dict[str, str] | None) -> Response:
+        self.cache.set(self.key, self.generation, body, headers, tags)
+        return _json_response(body, headers, "MISS")
+
+
+class ResponseCache:
+    """Bounded LRU cache of serialized JSON responses, invalidated by tag.
+
+    Entries are keyed by (user id, path, query string) and hold the response
+    bytes, so a hit skips both the queries and Pydantic serialization and can
+    never be served to another user. Each entry carries tags such as
+    ``project:42``; a write announces the rows it touched through
+    ``app.utils.bus.invalidate`` and every worker drops the entries tagged
+    with them. Memory is bounded by the total body size, oldest first.
+    An entry stored with an ETag answers a matching If-None-Match with 304.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.size_bytes = 0
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._keys_by_tag: dict[str, set[CacheKey]] = {}
+        self._generation = 0
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        self._forgotten_generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl_seconds > 0
+
+    def lookup(self, request: Request, user_id: int) -> CacheLookup:
+        """Probe the cache for this user's view of ``request``"""
+        key = (user_id, request.url.path, tuple(sorted(request.query_params.multi_items())))
+        with self._lock:
+            generation = self._generation
+            entry = self._get(key) if self.enabled else None
+            if entry is None:
+                self.misses += 1
+                return CacheLookup(self, key, generation, None)
+            self.hits += 1
+        etag = entry.headers.get("ETag") if entry.headers else None
+        if etag and etag_matches(request, etag):
+            response = not_modified(etag, {"X-Cache": "HIT"})
+        else:
+            response = _json_response(entry.body, entry.headers, "HIT")
+        return CacheLookup(self, key, generation, response)
+
+    def set(
+        self,
+        key: CacheKey,
+        generation: int,
+        body: bytes,
+        headers: dict[str, str] | None,
+        tags: Iterable[str],
+    ) -> None:
+        size = len(body) + ENTRY_OVERHEAD_BYTES
+        if not self.enabled or size > self.max_bytes // MAX_ENTRY_SHARE:
+            return
+        tags = tuple(tags)
+        with self._lock:
+            if self._stale(generation, tags):
+                return
+            self._remove(key)
+            self._entries[key] = _Entry(
+                time.monotonic() + self.ttl_seconds, body, headers, tags, size
+            )
+            self.size_bytes += size
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop every entry carrying any of ``tags``"""
+        with self._lock:
+            for tag in tags:
+                self._generation += 1
+                self._invalidated[tag] = self._generation
+                self._invalidated.move_to_end(tag)
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+            while len(self._invalidated) > RECENT_INVALIDATIONS:
+                _, self._forgotten_generation = self._invalidated.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "bytes": self.size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _get(self, key: CacheKey) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _stale(self, generation: int, tags: tuple[str, ...]) -> bool:
+        """Whether any tag was invalidated after ``generation`` was read"""
+        if generation == self._generation:
+            return False
+        if generation < self._forgotten_generation:
+            return True
+        return any(self._invalidated.get(tag, 0) > generation for tag in tags)
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.size_bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+response_cache = ResponseCache(
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES, ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+)
+
+
+def _tag_invalidator(entity: str):
+    return lambda entity_id: response_cache.invalidate(f"{entity}:{entity_id}")
+
+
+# "owner" covers a user's collections: their project list and unfiltered task list
+for _entity in ("owner", "project", "task"):
+    on_invalidate(_entity, _tag_invalidator(_entity))
+# A missed invalidation could leave any entry stale
+worker_bus.on_lost(response_cache.clear)
@@ -1,15 +1,17 @@
 from datetime import datetime, timedelta
 from typing import Any
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.config import settings
-from app.database import get_db
-from app.models.user import User
+from app.database import get_async_db, get_db, route_to_user
+from app.models.user import User, UserRole
+from app.utils.hashing import pwd_context
+from app.utils.exceptions import ForbiddenException
+from app.utils.principal_cache import principal_cache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
@@ -25,25 +27,69 @@ def create_access_token(data: dict[str, Any]) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    # JWT requires the subject claim to be a string
+    if "sub" in to_encode:
+        to_encode["sub"] = str(to_encode["sub"])
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def decode_access_token(token: str) -> tuple[int, int]:
+    """Validate a bearer token and return its (user id, exp) claims"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: int = payload.get("sub")
+        user_id = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+            raise _credentials_exception()
+        return int(user_id), int(payload.get("exp", 0))
+    except (JWTError, ValueError):
+        raise _credentials_exception()
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    user_id, exp = decode_access_token(token)
+    route_to_user(db, user_id)
+    user = principal_cache.get(user_id, exp)
+    if user is not None:
+        return user
 
     user = db.query(User).filter(User.id == user_id).first()
+    if user is None and db.info.pop("replica", False):
+        # A user who registered moments ago may not have reached the replica yet
+        user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    principal_cache.set(user_id, exp, user)
     return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> User:
+    user_id, exp = decode_access_token(token)
+    route_to_user(db, user_id)
+    user = principal_cache.get(user_id, exp)
+    if user is not None:
+        return user
+
+    user = await db.get(User, user_id)
+    if user is None and db.info.pop("replica", False):
+        user = await db.get(User, user_id)
+    if user is None:
+        raise _credentials_exception()
+    principal_cache.set(user_id, exp, user)
+    return user
+
+
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.role != UserRole.ADMIN:
+        raise ForbiddenException("Admin access required")
+    return current_user
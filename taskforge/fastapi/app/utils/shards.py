@@ -0,0 +1,514 @@
+"""
+Horizontal sharding of projects across SQLite databases.
+
+With SHARD_URLS set, each project lives on one shard together with its
+tasks, comments, labels and task labels, and the tombstones of deletions made
+there. Users stay in the global database (DATABASE_URL), which every shard
+connection attaches (see create_shard_engines). A project's shard is
+``project_id % shard count`` unless the global project_shards table says
+otherwise, which is what moving a project with move_project (or
+``python -m app.rebalance``) records. Ids of sharded rows are handed out in
+blocks from the global id_blocks table, so they are unique across shards and
+a moved row keeps its id.
+
+Services route a session with use_project or use_task before touching a
+project's rows. Listings across all of a user's projects run on every shard
+in parallel (fan_out, execute_everywhere, scalars_everywhere) and merge the
+results. Without SHARD_URLS all of these run on the session as before.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from functools import partial
+from itertools import chain
+from operator import attrgetter
+from typing import Any
+from sqlalchemy import Connection, Engine, Table, bindparam, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+from app.database import Base, engine, read_engine, shard_engines
+from app.models.comment import Comment
+from app.models.label import Label, TaskLabel
+from app.models.project import Project
+from app.models.shard import IdBlock, ProjectShard
+from app.models.task import Task
+from app.models.tombstone import Tombstone
+from app.models.user import User
+from app.utils.bus import invalidate, on_invalidate, worker_bus
+
+# Error of the guard triggers: a write reached a shard its project has left
+PROJECT_MOVED = "project is not on this shard"
+# Ids a worker reserves from the global database at a time, per table
+ID_BLOCK_SIZE = 1000
+# How long a worker trusts its copy of the shard map without an invalidation
+MAP_TTL_SECONDS = 5.0
+# Task to project entries kept for routing by task id
+TASK_CACHE_SIZE = 100_000
+# Rows copied per statement when moving a project
+COPY_CHUNK_ROWS = 1000
+# Rows changed this long before a move's bulk copy are copied again under the lock,
+# covering writes whose timestamp was taken before the copy but committed during it
+MOVE_OVERLAP = timedelta(seconds=60)
+
+GLOBAL_TABLES = (User.__table__, ProjectShard.__table__, IdBlock.__table__)
+# Parents first, so the guard triggers find a row's parent when it is copied
+SHARD_TABLES = (
+    Project.__table__, Task.__table__, Label.__table__, TaskLabel, Comment.__table__,
+    Tombstone.__table__,
+)
+ID_TABLES = ("projects", "tasks", "labels", "comments", "tombstones")
+# Child table: (column, parent table) that an insert must find on the same shard
+_GUARDS = {
+    "tasks": ("project_id", "projects"),
+    "labels": ("project_id", "projects"),
+    "task_labels": ("task_id", "tasks"),
+    "comments": ("task_id", "tasks"),
+}
+
+
+class ShardSet:
+    """The shards' (writer, reader) engines, the shard map and the id allocator.
+
+    ``directory`` is the global database's (writer, reader) pair; the reader
+    may be None.
+    """
+
+    def __init__(self, binds: Iterable[tuple] = (), directory: tuple = (None, None)):
+        self.binds = list(binds)
+        self.directory = directory
+        self.fan_outs = 0
+        self.task_probes = 0
+        self._moved: dict[int, int] = {}
+        self._map_loaded = float("-inf")
+        self._task_projects: OrderedDict[int, int] = OrderedDict()
+        self._id_blocks: dict[str, list[list[int]]] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.binds)
+
+    def shard_of(self, project_id: int) -> int:
+        """The shard ``project_id`` lives on"""
+        if time.monotonic() - self._map_loaded > MAP_TTL_SECONDS:
+            _blocking(self.load_map)
+        return self._moved.get(project_id, project_id % len(self.binds))
+
+    def load_map(self) -> None:
+        writer, reader = self.directory
+        with (reader or writer).connect() as connection:
+            moved = connection.execute(select(ProjectShard.project_id, ProjectShard.shard))
+            self._moved = dict(moved.all())
+        self._map_loaded = time.monotonic()
+
+    def forget_map(self, project_id: int | None = None) -> None:
+        """Reload the shard map on its next use"""
+        self._map_loaded = float("-inf")
+
+    def projects_of_tasks(self, task_ids: Iterable[int]) -> dict[int, int]:
+        """Map each of ``task_ids`` that exists to its project.
+
+        A task never changes project, so answers are cached; the rest are
+        looked up on every shard at once.
+        """
+        found, missing = {}, []
+        with self._lock:
+            for task_id in task_ids:
+                project_id = self._task_projects.get(task_id)
+                if project_id is None:
+                    missing.append(task_id)
+                else:
+                    self._task_projects.move_to_end(task_id)
+                    found[task_id] = project_id
+        if missing:
+            self.task_probes += 1
+            statement = select(Task.id, Task.project_id).where(
+                Task.id.in_(bindparam("ids", expanding=True))
+            )
+            calls = [
+                partial(_read_rows, reader or writer, statement, {"ids": missing})
+                for writer, reader in self.binds
+            ]
+            located = dict(chain.from_iterable(_parallel(calls)))
+            self.remember_tasks(located)
+            found.update(located)
+        return found
+
+    def remember_tasks(self, task_projects: dict[int, int]) -> None:
+        with self._lock:
+            self._task_projects.update(task_projects)
+            while len(self._task_projects) > TASK_CACHE_SIZE:
+                self._task_projects.popitem(last=False)
+
+    def new_ids(self, table: str, count: int) -> list[int]:
+        """``count`` ids for new ``table`` rows, ascending"""
+        ids = self._take_ids(table, count)
+        while len(ids) < count:
+            size = max(ID_BLOCK_SIZE, count - len(ids))
+            block = _blocking(self._reserve_ids, table, size)
+            with self._lock:
+                self._id_blocks.setdefault(table, []).append(block)
+            ids += self._take_ids(table, count - len(ids))
+        return sorted(ids)
+
+    def _take_ids(self, table: str, count: int) -> list[int]:
+        ids: list[int] = []
+        with self._lock:
+            blocks = self._id_blocks.get(table, [])
+            while blocks and len(ids) < count:
+                block = blocks[0]
+                taken = min(block[1] - block[0], count - len(ids))
+                ids.extend(range(block[0], block[0] + taken))
+                block[0] += taken
+                if block[0] == block[1]:
+                    blocks.pop(0)
+        return ids
+
+    def _reserve_ids(self, table: str, size: int) -> list[int]:
+        with self.directory[0].begin() as connection:
+            end = connection.scalar(
+                update(IdBlock)
+                .where(IdBlock.name == table)
+                .values(next_id=IdBlock.next_id + size)
+                .returning(IdBlock.next_id)
+            )
+        if end is None:
+            raise RuntimeError(f"No id block for {table}: run python -m app.rebalance init")
+        return [end - size, end]
+
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=4 * len(self.binds), thread_name_prefix="shard"
+                )
+            return self._executor
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "shards": len(self.binds),
+            "moved_projects": len(self._moved),
+            "fan_outs": self.fan_outs,
+            "task_probes": self.task_probes,
+            "cached_tasks": len(self._task_projects),
+        }
+
+
+shard_set = ShardSet(shard_engines, (engine, read_engine))
+on_invalidate("project_shard", shard_set.forget_map)
+worker_bus.on_lost(shard_set.forget_map)
+
+
+def _blocking(fn: Callable, *args):
+    """``fn(*args)``, in a thread when called from AsyncSession.run_sync, so the
+    event loop keeps serving other requests meanwhile"""
+    if in_greenlet():
+        return await_only(asyncio.to_thread(fn, *args))
+    return fn(*args)
+
+
+def _parallel(calls: list[Callable[[], Any]]) -> list:
+    """Run ``calls`` at once in threads and return their results in order"""
+    if in_greenlet():
+        return await_only(asyncio.gather(*(asyncio.to_thread(call) for call in calls)))
+    executor = shard_set.executor()
+    # A context per call, so the shard statements count toward the request's SQL stats
+    futures = [executor.submit(contextvars.copy_context().run, call) for call in calls]
+    return [future.result() for future in futures]
+
+
+def _read_rows(bind: Engine, statement, params: dict) -> list:
+    with bind.connect() as connection:
+        return connection.execute(statement, params).all()
+
+
+def use_project(db: Session, project_id: int) -> None:
+    """Route ``db`` to the shard of ``project_id``"""
+    if shard_set.enabled:
+        db.info["shard"] = shard_set.shard_of(project_id)
+
+
+def use_task(db: Session, task_id: int) -> None:
+    """Route ``db`` to the shard of ``task_id``'s project.
+
+    An unknown task routes to shard 0, where it is not found either.
+    """
+    if shard_set.enabled:
+        project_id = shard_set.projects_of_tasks([task_id]).get(task_id)
+        db.info["shard"] = 0 if project_id is None else shard_set.shard_of(project_id)
+
+
+async def use_project_async(db: AsyncSession, project_id: int) -> None:
+    if shard_set.enabled:
+        await db.run_sync(use_project, project_id)
+
+
+async def use_task_async(db: AsyncSession, task_id: int) -> None:
+    if shard_set.enabled:
+        await db.run_sync(use_task, task_id)
+
+
+def shards_of_projects(project_ids: Iterable[int]) -> list[int]:
+    """The shard of each of ``project_ids``"""
+    return [shard_set.shard_of(project_id) for project_id in project_ids]
+
+
+def shards_of_tasks(task_ids: Iterable[int]) -> list[int]:
+    """The shard of each of ``task_ids``; unknown tasks get shard 0"""
+    task_ids = list(task_ids)
+    projects = shard_set.projects_of_tasks(set(task_ids))
+    return [
+        shard_set.shard_of(projects[task_id]) if task_id in projects else 0
+        for task_id in task_ids
+    ]
+
+
+def new_project(db: Session) -> dict:
+    """Extra INSERT values for a new project; routes ``db`` to the project's shard"""
+    if not shard_set.enabled:
+        return {}
+    project_id = shard_set.new_ids("projects", 1)[0]
+    use_project(db, project_id)
+    return {"id": project_id}
+
+
+async def new_project_async(db: AsyncSession) -> dict:
+    if not shard_set.enabled:
+        return {}
+    return await db.run_sync(new_project)
+
+
+def new_id(table: str) -> dict:
+    """Extra INSERT values for a new ``table`` row: its id when sharded"""
+    if not shard_set.enabled:
+        return {}
+    return {"id": shard_set.new_ids(table, 1)[0]}
+
+
+async def new_id_async(db: AsyncSession, table: str) -> dict:
+    if not shard_set.enabled:
+        return {}
+    return await db.run_sync(lambda session: new_id(table))
+
+
+def assign_ids(table: str, rows: list[dict]) -> None:
+    """Give each of ``rows`` an id when sharded, ascending in row order"""
+    if shard_set.enabled:
+        for row, row_id in zip(rows, shard_set.new_ids(table, len(rows))):
+            row["id"] = row_id
+
+
+def fan_out(db: Session, fn: Callable, *args) -> list:
+    """``fn(session, *args)`` on every shard in parallel, one result per shard.
+
+    Unsharded, ``fn`` just runs on ``db``.
+    """
+    if not shard_set.enabled:
+        return [fn(db, *args)]
+    shard_set.fan_outs += 1
+    return _parallel(
+        [partial(_run_on_shard, shard, fn, args) for shard in range(len(shard_set.binds))]
+    )
+
+
+def _run_on_shard(shard: int, fn: Callable, args: tuple):
+    writer, reader = shard_set.binds[shard]
+    with Session(bind=reader or writer, info={"shard": shard}) as db:
+        return fn(db, *args)
+
+
+def merge(
+    parts: list[list],
+    key: Callable | None = None,
+    reverse: bool = False,
+    limit: int | None = None,
+    identity: Callable = attrgetter("id"),
+) -> list:
+    """Combine per-shard results, sorted by ``key`` and cut at ``limit`` rows.
+
+    A row found on two shards (its project is being moved) is kept once.
+    Without ``key`` the parts are only concatenated.
+    """
+    if len(parts) == 1:
+        return parts[0]
+    if key is None:
+        return list(chain.from_iterable(parts))
+    rows, seen = [], set()
+    for row in sorted(chain.from_iterable(parts), key=key, reverse=reverse):
+        row_id = identity(row)
+        if row_id not in seen:
+            seen.add(row_id)
+            rows.append(row)
+            if len(rows) == limit:
+                break
+    return rows
+
+
+def execute_everywhere(
+    db: Session, statement, params: dict | None = None, **merge_options
+) -> list:
+    """``statement``'s rows from every shard, combined by ``merge``"""
+    parts = fan_out(db, lambda session: session.execute(statement, params).all())
+    return merge(parts, **merge_options)
+
+
+def scalars_everywhere(db: Session, statement, **merge_options) -> list:
+    """``statement``'s scalars (or entities) from every shard, combined by ``merge``"""
+    parts = fan_out(db, lambda session: session.scalars(statement).all())
+    return merge(parts, **merge_options)
+
+
+def create_schemas(shards: ShardSet = shard_set) -> None:
+    """Create the global and shard tables and the guard triggers, and start the id blocks.
+
+    Safe to run again: existing tables are kept and the id blocks only move up.
+    """
+    writer, _ = shards.directory
+    Base.metadata.create_all(writer, tables=GLOBAL_TABLES)
+    next_ids = dict.fromkeys(ID_TABLES, 1)
+    for shard_writer, _ in shards.binds:
+        Base.metadata.create_all(shard_writer, tables=SHARD_TABLES)
+        with shard_writer.begin() as connection:
+            for table, (column, parent) in _GUARDS.items():
+                connection.exec_driver_sql(
+                    f"CREATE TRIGGER IF NOT EXISTS {table}_on_shard BEFORE INSERT ON {table} "
+                    f"WHEN NOT EXISTS (SELECT 1 FROM {parent} WHERE id = NEW.{column}) "
+                    f"BEGIN SELECT RAISE(ABORT, '{PROJECT_MOVED}'); END"
+                )
+            for name in ID_TABLES:
+                newest = connection.scalar(select(func.max(Base.metadata.tables[name].c.id)))
+                next_ids[name] = max(next_ids[name], (newest or 0) + 1)
+    with writer.begin() as connection:
+        blocks = dict(connection.execute(select(IdBlock.name, IdBlock.next_id)).all())
+        for name, next_id in next_ids.items():
+            if name not in blocks:
+                connection.execute(insert(IdBlock).values(name=name, next_id=next_id))
+            elif blocks[name] < next_id:
+                connection.execute(
+                    update(IdBlock).where(IdBlock.name == name).values(next_id=next_id)
+                )
+
+
+def shard_counts(shards: ShardSet = shard_set) -> list[dict]:
+    """Projects and tasks per shard"""
+    counts = []
+    for shard, (writer, reader) in enumerate(shards.binds):
+        with (reader or writer).connect() as connection:
+            counts.append({
+                "shard": shard,
+                "projects": connection.scalar(select(func.count()).select_from(Project)),
+                "tasks": connection.scalar(select(func.count()).select_from(Task)),
+            })
+    return counts
+
+
+def _project_filter(table: Table, project_id: int):
+    if table is Project.__table__:
+        return table.c.id == project_id
+    if table is TaskLabel or table is Comment.__table__:
+        return table.c.task_id.in_(select(Task.id).where(Task.project_id == project_id))
+    return table.c.project_id == project_id
+
+
+def _copy(source: Connection, target, project_id: int, since: datetime | None = None) -> int:
+    """Copy a project's rows from ``source``; ``target()`` opens the connection to write with.
+
+    With ``since``, only rows updated since then are copied, and every task label.
+    """
+    copied = 0
+    for table in SHARD_TABLES[:-1]:
+        query = select(table).where(_project_filter(table, project_id))
+        if since is not None and "updated_at" in table.c and table is not Project.__table__:
+            query = query.where(table.c.updated_at >= since)
+        result = source.execution_options(yield_per=COPY_CHUNK_ROWS).execute(query)
+        for rows in result.partitions():
+            with target() as connection:
+                connection.execute(
+                    insert(table).prefix_with("OR REPLACE"), [row._asdict() for row in rows]
+                )
+            copied += len(rows)
+    return copied
+
+
+def _prune(source: Connection, target: Connection, project_id: int) -> int:
+    """Delete the project's rows from ``target`` that ``source`` no longer has.
+
+    Task labels have no timestamp, so they are all dropped here and copied again.
+    """
+    pruned = 0
+    target.execute(delete(TaskLabel).where(_project_filter(TaskLabel, project_id)))
+    for table in (Comment.__table__, Label.__table__, Task.__table__):
+        query = select(table.c.id).where(_project_filter(table, project_id))
+        gone = set(target.scalars(query)) - set(source.scalars(query))
+        for start in range(0, len(gone), COPY_CHUNK_ROWS):
+            chunk = sorted(gone)[start:start + COPY_CHUNK_ROWS]
+            target.execute(delete(table).where(table.c.id.in_(chunk)))
+        pruned += len(gone)
+    return pruned
+
+
+def move_project(project_id: int, target: int, shards: ShardSet = shard_set) -> dict:
+    """Move a project and its rows to shard ``target`` while the API keeps serving it.
+
+    The rows are first copied without blocking anyone. Then, holding the
+    source shard's write lock, the rows changed since are copied again and the
+    ones deleted since are dropped, the shard map is switched and the source
+    rows are deleted. Writers to the source shard wait for that second step
+    only. A write that still reaches the source afterwards is refused by the
+    guard triggers (PROJECT_MOVED), and listings show a row found on both
+    shards during the move once.
+    """
+    shards.load_map()
+    source = shards.shard_of(project_id)
+    if not 0 <= target < len(shards.binds):
+        raise ValueError(f"No shard {target}")
+    source_writer, source_reader = shards.binds[source]
+    target_writer, _ = shards.binds[target]
+    with (source_reader or source_writer).connect() as connection:
+        if connection.scalar(select(Project.id).where(Project.id == project_id)) is None:
+            raise ValueError(f"Project {project_id} is not on shard {source}")
+    stats = {"project_id": project_id, "source": source, "target": target}
+    if source == target:
+        return {**stats, "copied": 0, "recopied": 0, "pruned": 0, "locked_ms": 0.0}
+
+    started = datetime.utcnow()
+    with (source_reader or source_writer).connect() as connection:
+        # One read transaction, so children are never copied ahead of their parents
+        connection.exec_driver_sql("BEGIN")
+        stats["copied"] = _copy(connection, target_writer.begin, project_id)
+        connection.rollback()
+
+    locked = time.perf_counter()
+    with source_writer.begin() as connection:
+        # Take the source shard's write lock with a no-op write; BEGIN IMMEDIATE would
+        # also lock the attached global database, where the shard map is switched
+        projects = Project.__table__
+        connection.execute(
+            update(projects)
+            .where(projects.c.id == project_id)
+            .values(updated_at=projects.c.updated_at)
+        )
+        with target_writer.begin() as target_connection:
+            stats["pruned"] = _prune(connection, target_connection, project_id)
+            stats["recopied"] = _copy(
+                connection, partial(nullcontext, target_connection), project_id,
+                since=started - MOVE_OVERLAP,
+            )
+        with shards.directory[0].begin() as directory:
+            directory.execute(delete(ProjectShard).where(ProjectShard.project_id == project_id))
+            if target != project_id % len(shards.binds):
+                directory.execute(insert(ProjectShard).values(project_id=project_id, shard=target))
+        invalidate(("project_shard", project_id))
+        for table in reversed(SHARD_TABLES[:-1]):
+            connection.execute(delete(table).where(_project_filter(table, project_id)))
+    stats["locked_ms"] = round((time.perf_counter() - locked) * 1000, 3)
+    return stats
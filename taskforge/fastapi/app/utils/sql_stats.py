@@ -0,0 +1,150 @@
+"""
+Per-request SQL statistics.
+
+Cursor hooks on the engines time every statement run while a ``track`` block
+is active; QueryStatsMiddleware opens one per HTTP request, reports the count
+and total time in a ``Server-Timing`` header and logs the slowest statements
+at DEBUG. A statement shape repeated SQL_REPEAT_WARNING times in one block is
+logged as a likely N+1.
+"""
+import heapq
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statements kept per block for the debug log
+SLOWEST_KEPT = 3
+# Longest statement text written to the log
+LOGGED_STATEMENT_CHARS = 200
+
+_PLACEHOLDER = r"(?:\?|%\(\w+\)s|\$\d+|:\w+)"
+_PLACEHOLDER_RUN = re.compile(rf"{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+")
+_WHITESPACE = re.compile(r"\s+")
+
+_current: ContextVar["QueryStats | None"] = ContextVar("sql_stats", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    """``statement`` with whitespace and placeholder lists collapsed, so the same
+    query with a different number of IN values has the same shape"""
+    return _PLACEHOLDER_RUN.sub("?", _WHITESPACE.sub(" ", statement).strip())
+
+
+def repeated_shapes(statements: Iterable[str], threshold: int) -> dict[str, int]:
+    """Statement shapes run at least ``threshold`` times, with their counts"""
+    shapes = Counter(statement_shape(statement) for statement in statements)
+    return {shape: count for shape, count in shapes.items() if count >= threshold}
+
+
+class QueryStats:
+    """Statements run inside one ``track`` block"""
+
+    __slots__ = ("count", "total_ms", "slowest", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        # Min-heap of (ms, statement) holding the slowest SLOWEST_KEPT
+        self.slowest: list[tuple[float, str]] = []
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+        if len(self.slowest) < SLOWEST_KEPT:
+            heapq.heappush(self.slowest, (elapsed_ms, statement))
+        elif elapsed_ms > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (elapsed_ms, statement))
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+    def server_timing(self) -> str:
+        queries = "query" if self.count == 1 else "queries"
+        return f'db;dur={self.total_ms:.1f};desc="{self.count} {queries}"'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("sql_stats_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("sql_stats_start")
+    if stats is not None and starts:
+        stats.record(statement, (time.perf_counter() - starts.pop()) * 1000)
+
+
+def instrument(engine: Engine) -> None:
+    """Time ``engine``'s statements into the active QueryStats; safe to call twice"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def report(label: str, stats: QueryStats) -> None:
+    """Log a block's totals at DEBUG and its repeated statement shapes as warnings"""
+    if logger.isEnabledFor(logging.DEBUG):
+        slowest = "; ".join(
+            f"{ms:.1f} ms {statement[:LOGGED_STATEMENT_CHARS]}"
+            for ms, statement in sorted(stats.slowest, reverse=True)
+        )
+        logger.debug(
+            "%s: %d queries in %.1f ms; slowest: %s",
+            label, stats.count, stats.total_ms, slowest or "-",
+        )
+    for shape, count in stats.repeated(settings.SQL_REPEAT_WARNING).items():
+        logger.warning(
+            "Possible N+1 in %s: %d x %s", label, count, shape[:LOGGED_STATEMENT_CHARS]
+        )
+
+
+@contextmanager
+def track(label: str) -> Iterator[QueryStats]:
+    """Collect the statements run in this context (and threads or greenlets it
+    starts) until the block exits, then ``report`` them"""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        report(label, stats)
+
+
+class QueryStatsMiddleware:
+    """Tracks each HTTP request and adds its totals as a ``Server-Timing`` header.
+
+    The header goes out with the response start, so statements a streaming
+    body runs afterwards are only in the log.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.SQL_STATS:
+            await self.app(scope, receive, send)
+            return
+
+        with track(f"{scope['method']} {scope['path']}") as stats:
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
@@ -0,0 +1,85 @@
+"""
+Compare request throughput of the sync (threadpool) and async (AsyncEngine) modes.
+
+Starts one uvicorn server per mode against a throwaway SQLite database and drives
+it with 50, 200 and 1000 concurrent clients.
+Run with: python -m benchmarks.async_throughput [--duration 10]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import free_port, login, seed, start_server, summarize, wait_until_ready
+
+CONCURRENCY_LEVELS = (50, 200, 1000)
+
+
+async def run_load(base_url: str, token: str, concurrency: int, duration: float) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    deadline = time.monotonic() + duration
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+
+        async def worker(n: int) -> None:
+            nonlocal errors
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(f"/api/tasks/{n % 100 + 1}", headers=headers)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    return summarize(latencies, elapsed, errors)
+
+
+async def bench_mode(async_db: bool, duration: float) -> list[tuple[int, dict]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/bench.db"
+        seed(database_url)
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(database_url, port, ASYNC_DB=async_db)
+        try:
+            await wait_until_ready(base_url)
+            token = await login(base_url)
+            return [
+                (concurrency, await run_load(base_url, token, concurrency, duration))
+                for concurrency in CONCURRENCY_LEVELS
+            ]
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'clients':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for async_db in (False, True):
+        mode = "async" if async_db else "sync"
+        for concurrency, result in asyncio.run(bench_mode(async_db, args.duration)):
+            print(
+                f"{mode:<6} {concurrency:>7} {result['rps']:>9.1f} {result['p50_ms']:>8.1f} "
+                f"{result['p99_ms']:>8.1f} {result['errors']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
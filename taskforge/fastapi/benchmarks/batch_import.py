@@ -0,0 +1,41 @@
+"""
+Import throughput: POST /api/tasks:batch versus one POST /api/tasks per task.
+
+Run with: python -m benchmarks.batch_import [--tasks 10000] [--single 500]
+"""
+import argparse
+import time
+
+from benchmarks.common import app_client
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=10_000, help="tasks in the batch")
+    parser.add_argument("--single", type=int, default=500, help="tasks created one by one")
+    args = parser.parse_args()
+
+    with app_client() as (client, headers, _):
+        project_id = client.get("/api/projects", headers=headers).json()[0]["id"]
+        items = [{"title": f"Imported {i}", "project_id": project_id} for i in range(args.tasks)]
+
+        start = time.perf_counter()
+        response = client.post("/api/tasks:batch", json={"items": items}, headers=headers)
+        batch_seconds = time.perf_counter() - start
+        assert response.json()["succeeded"] == args.tasks
+
+        start = time.perf_counter()
+        for item in items[: args.single]:
+            client.post("/api/tasks", json=item, headers=headers)
+        single_seconds = time.perf_counter() - start
+
+    per_task_single = single_seconds / args.single
+    print(f"batch   {args.tasks:>6} tasks  {batch_seconds * 1000:>9.1f} ms  "
+          f"{args.tasks / batch_seconds:>9.0f} tasks/s")
+    print(f"single  {args.single:>6} tasks  {single_seconds * 1000:>9.1f} ms  "
+          f"{1 / per_task_single:>9.0f} tasks/s  "
+          f"(~{per_task_single * args.tasks:.1f} s for {args.tasks})")
+
+
+if __name__ == "__main__":
+    main()
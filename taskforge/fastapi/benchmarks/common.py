@@ -0,0 +1,144 @@
+"""Shared helpers for benchmarks, in-process or against a real uvicorn server."""
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import Base, get_db
+from app.models.comment import Comment
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from app.utils.security import get_password_hash
+
+ROOT = Path(__file__).resolve().parent.parent
+EMAIL = "bench@taskforge.com"
+PASSWORD = "bench123"
+
+
+def seed(database_url: str, task_count: int = 100) -> None:
+    """Create the schema and one user owning a project with ``task_count`` tasks"""
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        user = User(email=EMAIL, name="Bench User", password_hash=get_password_hash(PASSWORD))
+        db.add(user)
+        db.flush()
+        project = Project(name="Bench Project", owner_id=user.id)
+        db.add(project)
+        db.flush()
+        db.add_all(Task(title=f"Task {i}", project_id=project.id) for i in range(task_count))
+        db.commit()
+    engine.dispose()
+
+
+def seed_lists(database_url: str, count: int) -> None:
+    """Seed a user with ``count`` projects; the first holds ``count`` tasks and its
+    first task ``count`` comments"""
+    seed(database_url, count)
+    engine = create_engine(database_url)
+    with Session(engine) as db:
+        db.execute(
+            insert(Project), [{"name": f"Project {i}", "owner_id": 1} for i in range(1, count)]
+        )
+        db.execute(
+            insert(Comment),
+            [{"content": f"Comment {i}", "task_id": 1, "author_id": 1} for i in range(count)],
+        )
+        db.commit()
+    engine.dispose()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(
+    database_url: str, port: int, workers: int = 1, **env_overrides
+) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_URL": database_url, "DEBUG": "False"}
+    env.update({key: str(value) for key, value in env_overrides.items()})
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT,
+        env=env,
+    )
+
+
+async def wait_until_ready(base_url: str, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"server at {base_url} did not start")
+
+
+async def login(base_url: str) -> str:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        response = await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        return response.json()["access_token"]
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int) -> dict:
+    """Throughput and latency percentiles (ms) for a list of request durations"""
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "errors": errors,
+    }
+
+
+@contextmanager
+def app_client(task_count: int = 0):
+    """In-process TestClient on a throwaway seeded database.
+
+    Yields (client, auth headers, engine); the engine is handy for counting
+    statements or seeding more rows.
+    """
+    from app.main import app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/bench.db"
+        seed(database_url, task_count)
+        engine = create_engine(database_url, connect_args={"check_same_thread": False})
+        BenchSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def override_get_db():
+            db = BenchSessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            with TestClient(app) as client:
+                response = client.post(
+                    "/api/auth/login", json={"email": EMAIL, "password": PASSWORD}
+                )
+                headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+                yield client, headers, engine
+        finally:
+            app.dependency_overrides.clear()
+            engine.dispose()
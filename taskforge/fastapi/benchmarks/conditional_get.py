@@ -0,0 +1,146 @@
+"""
+Cost of conditional GETs on a 10k-task project.
+
+Calls the ASGI app in-process, so the numbers are server time without HTTP
+or client overhead, and compares a full 200 response with the 304 paths:
+the aggregate fingerprint query (response cache off) and the stored ETag
+(response cache on). The full response is only sampled a few times: at 10k
+tasks each one takes the best part of a second.
+
+Run with: python -m benchmarks.conditional_get [--tasks 10000] [--iterations 500] [--async-db]
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models.user import User
+from app.services.fingerprint_service import get_project_fingerprint, get_tasks_fingerprint
+from app.utils.response_cache import response_cache
+from app.utils.security import create_access_token
+from benchmarks.common import seed
+
+
+async def call(app, path: str, headers: dict[str, str]) -> tuple[int, dict[str, str], float]:
+    """One GET straight through the ASGI app; returns status, headers and seconds"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path.partition("?")[0], "raw_path": path.encode(),
+        "query_string": path.partition("?")[2].encode(), "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("bench", 50000), "server": ("bench", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - start
+    response_headers = {k.decode(): v.decode() for k, v in messages[0]["headers"]}
+    return messages[0]["status"], response_headers, elapsed
+
+
+def _quantiles(latencies: list[float]) -> dict:
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {"p50_ms": quantiles[49] * 1000, "p99_ms": quantiles[98] * 1000}
+
+
+async def measure(app, path, headers, iterations, expected_status) -> dict:
+    latencies = []
+    for _ in range(iterations):
+        status, _, elapsed = await call(app, path, headers)
+        assert status == expected_status, status
+        latencies.append(elapsed)
+    return _quantiles(latencies)
+
+
+def measure_query(fingerprint, iterations: int) -> dict:
+    """The fingerprint query on its own, without the request around it"""
+    with SessionLocal() as db:
+        user = db.get(User, 1)
+        latencies = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            fingerprint(db, user)
+            latencies.append(time.perf_counter() - start)
+    return _quantiles(latencies)
+
+
+def _print_row(path: str, name: str, status: int | str, result: dict) -> None:
+    print(f"{path:<24} {name:<22} {status:>6} {result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f}")
+
+
+FULL_RESPONSE_ITERATIONS = 10
+
+
+async def run(task_count: int, iterations: int, async_db: bool) -> None:
+    # main.py picks the sync or aio routers at import time
+    settings.ASYNC_DB = async_db
+    from app.main import app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/conditional.db"
+        seed(database_url, task_count)
+        engine = create_engine(database_url, connect_args={"check_same_thread": False})
+        # Rebind instead of overriding get_db: FastAPI re-inspects an override on every request
+        async_engine = create_async_engine(database_url.replace("sqlite", "sqlite+aiosqlite", 1))
+        defaults, async_defaults = dict(SessionLocal.kw), dict(AsyncSessionLocal.kw)
+        SessionLocal.configure(bind=engine, reader=None)
+        AsyncSessionLocal.configure(bind=async_engine, reader=None)
+        cache_bytes = response_cache.max_bytes
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 1})}"}
+        mode = "async" if async_db else "sync"
+        print(f"{task_count} tasks in one project, {mode} routers, {iterations} requests per 304 row")
+        print(f"{'path':<24} {'response':<22} {'status':>6} {'p50 ms':>8} {'p99 ms':>8}")
+        try:
+            queries = {
+                "/api/tasks?project_id=1": lambda db, user: get_tasks_fingerprint(db, user, 1),
+                "/api/projects/1": lambda db, user: get_project_fingerprint(db, 1, user),
+            }
+            for url, fingerprint in queries.items():
+                response_cache.max_bytes = 0
+                _, first, _ = await call(app, url, headers)
+                conditional = {**headers, "If-None-Match": first["etag"]}
+                rows = [
+                    ("full response", headers, 200, FULL_RESPONSE_ITERATIONS),
+                    ("304 via fingerprint", conditional, 304, iterations),
+                ]
+                for name, request_headers, expected, count in rows:
+                    result = await measure(app, url, request_headers, count, expected)
+                    _print_row(url, name, expected, result)
+                _print_row(url, "fingerprint query only", "-", measure_query(fingerprint, iterations))
+
+                response_cache.max_bytes = cache_bytes
+                await call(app, url, headers)
+                result = await measure(app, url, conditional, iterations, 304)
+                _print_row(url, "304 via cached ETag", 304, result)
+        finally:
+            response_cache.max_bytes = cache_bytes
+            SessionLocal.configure(**defaults)
+            AsyncSessionLocal.configure(**async_defaults)
+            engine.dispose()
+            await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--async-db", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.tasks, args.iterations, args.async_db))
+
+
+if __name__ == "__main__":
+    main()
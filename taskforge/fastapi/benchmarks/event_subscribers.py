@@ -0,0 +1,103 @@
+"""
+Idle subscriber cost and fan-out latency for GET /api/projects/{id}/events.
+
+Opens N raw SSE connections to one uvicorn worker, reports the server's RSS
+growth per connection, then updates a task and times how long until every
+subscriber has received the event.
+
+Run with: python -m benchmarks.event_subscribers [--subscribers 10000] [--async-db]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import free_port, login, seed, start_server, wait_until_ready
+
+
+def rss_mb(pid: int) -> float:
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def subscribe(port: int, token: str, project_id: int, semaphore: asyncio.Semaphore):
+    """Open one SSE stream and return its reader once the subscription is live"""
+    async with semaphore:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(
+            f"GET /api/projects/{project_id}/events HTTP/1.1\r\n"
+            f"Host: 127.0.0.1\r\nAuthorization: Bearer {token}\r\n"
+            "Accept: text/event-stream\r\n\r\n".encode()
+        )
+        await reader.readuntil(b": subscribed\n\n")
+        return reader, writer
+
+
+async def wait_for_event(reader: asyncio.StreamReader) -> float:
+    await reader.readuntil(b"event: task.updated")
+    return time.perf_counter()
+
+
+async def run(subscribers: int, async_db: bool) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/events.db"
+        seed(database_url, task_count=1)
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(
+            database_url, port, HASH_POOL_WORKERS=0, BCRYPT_TARGET_MS=0, ASYNC_DB=async_db
+        )
+        connections = []
+        try:
+            await wait_until_ready(base_url)
+            token = await login(base_url)
+            headers = {"Authorization": f"Bearer {token}"}
+            async with httpx.AsyncClient(base_url=base_url, headers=headers) as client:
+                task = (await client.get("/api/tasks")).json()[0]
+                project_id = task["project_id"]
+                # Warm up the code paths so the baseline is not all import cost
+                connections.append(await subscribe(port, token, project_id, asyncio.Semaphore(1)))
+                await asyncio.sleep(0.5)
+                baseline = rss_mb(server.pid)
+
+                start = time.perf_counter()
+                semaphore = asyncio.Semaphore(200)
+                connections += await asyncio.gather(
+                    *(subscribe(port, token, project_id, semaphore) for _ in range(subscribers - 1))
+                )
+                connect_elapsed = time.perf_counter() - start
+                await asyncio.sleep(1)
+                grown = rss_mb(server.pid) - baseline
+
+                waiters = [asyncio.create_task(wait_for_event(reader)) for reader, _ in connections]
+                published = time.perf_counter()
+                await client.put(f"/api/tasks/{task['id']}", json={"status": "DONE"})
+                delivered = await asyncio.gather(*waiters)
+            print(f"{'async' if async_db else 'sync':<6}{subscribers:>7} subscribers  "
+                  f"connected in {connect_elapsed:>5.1f} s  "
+                  f"RSS +{grown:>6.1f} MB ({grown * 1024 / (subscribers - 1):>5.1f} KB each)  "
+                  f"fan-out p50 {(sorted(delivered)[len(delivered) // 2] - published) * 1000:>6.0f} ms"
+                  f"  all {(max(delivered) - published) * 1000:>6.0f} ms")
+        finally:
+            for _, writer in connections:
+                writer.close()
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--async-db", action="store_true")
+    args = parser.parse_args()
+    for subscribers in args.subscribers:
+        asyncio.run(run(subscribers, args.async_db))
+
+
+if __name__ == "__main__":
+    main()
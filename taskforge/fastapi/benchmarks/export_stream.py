@@ -0,0 +1,115 @@
+"""
+Export throughput and server memory for GET /api/projects/{id}/export.
+
+Each size is seeded into a fresh SQLite file (tasks, one label on every other
+task, a comment on every task), served by a real uvicorn process, and
+streamed with httpx. Rows counts the task, comment and label rows read.
+Peak server RSS should not grow with project size.
+
+Run with: python -m benchmarks.export_stream [--sizes 20000 200000]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.comment import Comment
+from app.models.label import Label, TaskLabel
+from app.models.project import Project
+from app.models.task import Task
+from benchmarks.common import free_port, login, seed, start_server, wait_until_ready
+
+
+def add_labels_and_comments(database_url: str) -> tuple[int, int]:
+    """Label every other task and comment on every task.
+
+    Returns the project id and the number of rows an export reads.
+    """
+    engine = create_engine(database_url)
+    with Session(engine) as db:
+        project = db.scalars(select(Project)).first()
+        label_id = db.scalar(
+            insert(Label)
+            .values(name="bench", color="#336699", project_id=project.id)
+            .returning(Label.id)
+        )
+        task_ids = db.scalars(select(Task.id)).all()
+        db.execute(
+            insert(TaskLabel),
+            [{"task_id": task_id, "label_id": label_id} for task_id in task_ids[::2]],
+        )
+        db.execute(
+            insert(Comment),
+            [
+                {"content": f"Comment on {task_id}", "task_id": task_id,
+                 "author_id": project.owner_id}
+                for task_id in task_ids
+            ],
+        )
+        db.commit()
+        project_id = project.id
+        rows = len(task_ids) * 2 + len(task_ids[::2])
+    engine.dispose()
+    return project_id, rows
+
+
+def peak_rss_mb(pid: int) -> float:
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def stream_export(base_url: str, token: str, project_id: int, export_format: str):
+    headers = {"Authorization": f"Bearer {token}"}
+    lines = 0
+    start = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        async with client.stream(
+            "GET", f"/api/projects/{project_id}/export",
+            params={"format": export_format}, headers=headers,
+        ) as response:
+            async for chunk in response.aiter_bytes():
+                lines += chunk.count(b"\n")
+    return lines, time.perf_counter() - start
+
+
+async def run(size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/export.db"
+        seed(database_url, task_count=size)
+        project_id, rows = add_labels_and_comments(database_url)
+
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(database_url, port, HASH_POOL_WORKERS=0, BCRYPT_TARGET_MS=0)
+        try:
+            await wait_until_ready(base_url)
+            token = await login(base_url)
+            baseline = peak_rss_mb(server.pid)
+            for export_format in ("ndjson", "csv"):
+                lines, elapsed = await stream_export(base_url, token, project_id, export_format)
+                print(f"{size:>8} tasks  {export_format:<7}{lines:>8} lines  "
+                      f"{elapsed * 1000:>8.0f} ms  {size / elapsed:>7.0f} tasks/s  "
+                      f"{rows / elapsed:>7.0f} rows/s  "
+                      f"peak RSS {peak_rss_mb(server.pid):.0f} MB (idle {baseline:.0f} MB)")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20_000, 200_000])
+    args = parser.parse_args()
+    for size in args.sizes:
+        asyncio.run(run(size))
+
+
+if __name__ == "__main__":
+    main()
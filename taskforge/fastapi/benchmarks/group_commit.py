@@ -0,0 +1,105 @@
+"""
+Commits per second with and without group commit.
+
+--clients threads each rename a task or add a comment in a loop for
+--duration seconds against a seeded SQLite file in the production profile,
+either committing every write on its own (commit_returning) or handing it to
+a GroupCommitter. The database is opened with --synchronous, FULL by default
+so every commit is fsynced, as under the default rollback journal.
+Run with: python -m benchmarks.group_commit [--duration 5] [--clients 32] [--synchronous FULL]
+"""
+import argparse
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import RoutingSession, commit_returning, create_engines
+from app.models.comment import Comment
+from app.models.task import Task
+from app.utils.group_commit import GroupCommitter
+from benchmarks.common import seed, summarize
+
+TASKS = 1000
+
+
+def statement(rng: random.Random):
+    task_id = rng.randint(1, TASKS)
+    if rng.random() < 0.5:
+        return update(Task).where(Task.id == task_id).values(title=f"Task {rng.random()}")
+    return insert(Comment).values(content="Load", task_id=task_id, author_id=1)
+
+
+def run(grouped: bool, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/group.db"
+        seed(database_url, task_count=TASKS)
+        writer, reader = create_engines(database_url, connect_args={"check_same_thread": False})
+
+        @event.listens_for(writer, "connect")
+        def set_synchronous(dbapi_connection, connection_record):
+            dbapi_connection.execute(f"PRAGMA synchronous={args.synchronous}")
+
+        commits = []
+        event.listen(writer, "commit", lambda connection: commits.append(1))
+        factory = sessionmaker(bind=writer, class_=RoutingSession, reader=reader, autoflush=False)
+        committer = GroupCommitter(factory)
+        latencies: list[float] = []
+        errors = 0
+        deadline = time.monotonic() + args.duration
+
+        def client(n: int) -> None:
+            nonlocal errors
+            rng = random.Random(n)
+            while time.monotonic() < deadline:
+                stmt = statement(rng)
+                stmt = stmt.returning(stmt.table)
+                start = time.perf_counter()
+                try:
+                    if grouped:
+                        committer.submit(stmt).result()
+                    else:
+                        with factory() as db:
+                            commit_returning(db, stmt)
+                except Exception:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(args.clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+        committer.stop()
+        writer.dispose()
+        reader.dispose()
+    return {**summarize(latencies, elapsed, errors), "commits": len(commits) / elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--synchronous", default="FULL", choices=["OFF", "NORMAL", "FULL"])
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients, synchronous={args.synchronous}, "
+          f"window {settings.GROUP_COMMIT_WINDOW_MS} ms")
+    print(f"{'mode':<10} {'writes/s':>9} {'commits/s':>10} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>7}")
+    for grouped in (False, True):
+        result = run(grouped, args)
+        name = "grouped" if grouped else "per-write"
+        print(f"{name:<10} {result['rps']:>9.0f} {result['commits']:>10.0f} "
+              f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
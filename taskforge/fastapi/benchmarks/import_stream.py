@@ -0,0 +1,88 @@
+"""
+Import throughput and server memory for POST /api/projects/{id}/import.
+
+Writes an NDJSON file of roughly the requested size (one bad line in every
+thousand), uploads it to a real uvicorn process as multipart, and reports
+rows/s and the server's peak RSS, which should not grow with file size.
+
+Run with: python -m benchmarks.import_stream [--megabytes 100 1000]
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import free_port, login, seed, start_server, wait_until_ready
+from benchmarks.export_stream import peak_rss_mb
+
+
+def write_ndjson(path: Path, megabytes: int) -> int:
+    """Write about ``megabytes`` of task lines; returns the line count"""
+    target = megabytes * 1024 * 1024
+    lines = 0
+    with path.open("w") as out:
+        while out.tell() < target:
+            batch = []
+            for _ in range(10_000):
+                lines += 1
+                if lines % 1000 == 0:
+                    batch.append('{"priority": "LOW"}')
+                else:
+                    batch.append(json.dumps({
+                        "title": f"Imported task {lines}",
+                        "description": "Bulk imported from the benchmark file",
+                        "priority": "HIGH",
+                    }))
+            out.write("\n".join(batch) + "\n")
+    return lines
+
+
+async def run(megabytes: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/import.db"
+        seed(database_url, task_count=0)
+        path = Path(tmp) / "tasks.ndjson"
+        lines = write_ndjson(path, megabytes)
+
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(database_url, port, HASH_POOL_WORKERS=0, BCRYPT_TARGET_MS=0)
+        try:
+            await wait_until_ready(base_url)
+            token = await login(base_url)
+            baseline = peak_rss_mb(server.pid)
+            async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+                headers = {"Authorization": f"Bearer {token}"}
+                project_id = (await client.get("/api/projects", headers=headers)).json()[0]["id"]
+                start = time.perf_counter()
+                with path.open("rb") as upload:
+                    response = await client.post(
+                        f"/api/projects/{project_id}/import",
+                        files={"file": ("tasks.ndjson", upload, "application/x-ndjson")},
+                        headers=headers,
+                    )
+                elapsed = time.perf_counter() - start
+            summary = response.json()
+            print(f"{path.stat().st_size / 2**20:>6.0f} MB  {lines:>9} lines  "
+                  f"imported {summary['imported']:>9}  failed {summary['failed']:>6}  "
+                  f"{elapsed:>7.1f} s  {lines / elapsed:>7.0f} rows/s  "
+                  f"peak RSS {peak_rss_mb(server.pid):.0f} MB (idle {baseline:.0f} MB)")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args()
+    for megabytes in args.megabytes:
+        asyncio.run(run(megabytes))
+
+
+if __name__ == "__main__":
+    main()
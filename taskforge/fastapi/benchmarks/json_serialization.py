@@ -0,0 +1,70 @@
+"""
+Serialization cost of the list endpoints: read rows validated through the
+response schema (the default) against the same rows dumped with orjson (FAST_JSON).
+
+Both paths run in-process on the same seeded database, without HTTP or auth,
+and their bodies are checked to be identical before timing.
+Run with: python -m benchmarks.json_serialization [--sizes 100 1000 10000] [--repeat 5]
+"""
+import argparse
+import tempfile
+import time
+
+import orjson
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.schemas.comment import Comment
+from app.schemas.project import Project
+from app.schemas.task import Task
+from app.services.read_service import get_comment_rows, get_project_rows, get_task_rows
+from app.utils.response_cache import _render
+from benchmarks.common import seed_lists
+
+
+def endpoints(db: Session, user: User) -> dict:
+    """(rows loader, response type) per endpoint, mirroring the routers"""
+    return {
+        "tasks": (lambda: get_task_rows(db, user, project_id=1), list[Task]),
+        "projects": (lambda: get_project_rows(db, user), list[Project]),
+        "comments": (lambda: get_comment_rows(db, 1), list[Comment]),
+    }
+
+
+def best_of(build, repeat: int) -> float:
+    """Fastest of ``repeat`` runs in ms"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<10} {'rows':>7} {'schema ms':>10} {'orjson ms':>10} {'speedup':>8}")
+    for count in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            database_url = f"sqlite:///{tmp}/serialization.db"
+            seed_lists(database_url, count)
+            engine = create_engine(database_url)
+            with Session(engine) as db:
+                user = db.get(User, 1)
+                for name, (load, response_type) in endpoints(db, user).items():
+                    rows = load()
+                    assert _render(rows, response_type) == orjson.dumps(rows), name
+                    schema_ms = best_of(lambda: _render(rows, response_type), args.repeat)
+                    orjson_ms = best_of(lambda: orjson.dumps(rows), args.repeat)
+                    print(f"{name:<10} {count:>7} {schema_ms:>10.2f} {orjson_ms:>10.2f} "
+                          f"{schema_ms / orjson_ms:>7.1f}x")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
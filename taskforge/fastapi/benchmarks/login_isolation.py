@@ -0,0 +1,111 @@
+"""
+Load test: does a login storm slow down task reads?
+
+Runs a burst of concurrent logins next to a steady stream of GET /api/tasks/{id}
+reads, once with bcrypt inline (HASH_POOL_WORKERS=0) and once with the hashing
+process pool, and reports the task-read latency observed during the storm.
+Run with: python -m benchmarks.login_isolation [--duration 10] [--logins 64]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import (
+    EMAIL,
+    PASSWORD,
+    free_port,
+    login,
+    seed,
+    start_server,
+    summarize,
+    wait_until_ready,
+)
+
+READERS = 10
+
+
+async def storm(base_url: str, token: str, logins: int, duration: float) -> tuple[dict, dict]:
+    read_latencies: list[float] = []
+    login_latencies: list[float] = []
+    read_errors = login_errors = 0
+    headers = {"Authorization": f"Bearer {token}"}
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=READERS + logins)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+
+        async def reader(n: int) -> None:
+            nonlocal read_errors
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                response = await client.get(f"/api/tasks/{n + 1}", headers=headers)
+                if response.status_code == 200:
+                    read_latencies.append(time.perf_counter() - start)
+                else:
+                    read_errors += 1
+
+        async def login_client() -> None:
+            nonlocal login_errors
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/auth/login", json={"email": EMAIL, "password": PASSWORD}
+                )
+                if response.status_code == 200:
+                    login_latencies.append(time.perf_counter() - start)
+                else:
+                    # 503 means the hashing queue shed load, which is the point
+                    login_errors += 1
+                    await asyncio.sleep(0.05)
+
+        started = time.monotonic()
+        await asyncio.gather(
+            *(reader(n) for n in range(READERS)), *(login_client() for _ in range(logins))
+        )
+        elapsed = time.monotonic() - started
+
+    return (
+        summarize(read_latencies, elapsed, read_errors),
+        summarize(login_latencies, elapsed, login_errors),
+    )
+
+
+async def bench(workers: int, logins: int, duration: float) -> tuple[dict, dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/bench.db"
+        seed(database_url)
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(database_url, port, HASH_POOL_WORKERS=workers)
+        try:
+            await wait_until_ready(base_url)
+            token = await login(base_url)
+            return await storm(base_url, token, logins, duration)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--logins", type=int, default=64, help="concurrent login clients")
+    parser.add_argument("--workers", type=int, default=2, help="hashing pool size")
+    args = parser.parse_args()
+
+    print(f"{'hashing':<8} {'reads/s':>8} {'read p50':>9} {'read p99':>9} "
+          f"{'logins/s':>9} {'rejected':>9}")
+    for workers in (0, args.workers):
+        reads, logins = asyncio.run(bench(workers, args.logins, args.duration))
+        mode = f"pool({workers})" if workers else "inline"
+        print(
+            f"{mode:<8} {reads['rps']:>8.1f} {reads['p50_ms']:>8.1f}ms {reads['p99_ms']:>8.1f}ms "
+            f"{logins['rps']:>9.1f} {logins['errors']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
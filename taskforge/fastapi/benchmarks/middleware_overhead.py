@@ -0,0 +1,92 @@
+"""
+Per-request cost of the always-on middleware: MetricsMiddleware and the
+untriggered path of ProfilingMiddleware.
+
+Times each middleware alone around a no-op ASGI app, which is the precise
+per-request cost, then runs in-process requests against GET /health and the
+cached GET /api/tasks (the cheapest real endpoints, so the worst case for
+relative overhead) in alternating rounds with METRICS_ENABLED on and off and
+reports the median round time per request. Also times one /metrics scrape.
+Run with: python -m benchmarks.middleware_overhead [--requests 2000] [--rounds 7]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.config import settings
+from app.utils.metrics import MetricsMiddleware
+from app.utils.profiling import ProfilingMiddleware
+from benchmarks.common import app_client
+
+URLS = ("/health", "/api/tasks")
+
+
+def round_us(client, headers, url: str, requests: int) -> float:
+    """Mean µs per request over one round"""
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(url, headers=headers)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def noop_app(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def noop_send(message) -> None:
+    pass
+
+
+async def middleware_us(middleware, requests: int) -> float:
+    """µs ``middleware`` adds to a request, net of the no-op app itself"""
+    headers = [(b"host", b"test"), (b"accept", b"*/*"), (b"authorization", b"Bearer x")]
+    scope = {"type": "http", "method": "GET", "path": "/noop", "headers": headers}
+
+    async def per_request(app) -> float:
+        start = time.perf_counter()
+        for _ in range(requests):
+            await app(dict(scope), None, noop_send)
+        return (time.perf_counter() - start) / requests * 1e6
+
+    return await per_request(middleware(noop_app)) - await per_request(noop_app)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=7)
+    args = parser.parse_args()
+
+    costs = {
+        middleware: min(
+            asyncio.run(middleware_us(middleware, args.requests * 10)) for _ in range(args.rounds)
+        )
+        for middleware in (MetricsMiddleware, ProfilingMiddleware)
+    }
+    for middleware, cost in costs.items():
+        print(f"{middleware.__name__} alone: {cost:.2f} µs per request")
+    added = costs[MetricsMiddleware]
+
+    with app_client(task_count=100) as (client, headers, _):
+        print(f"{'url':<12} {'off µs':>8} {'on µs':>8} {'overhead':>9}")
+        for url in URLS:
+            round_us(client, headers, url, args.requests // 10)  # warm up
+            timings = {True: [], False: []}
+            for _ in range(args.rounds):
+                for enabled in (False, True):
+                    settings.METRICS_ENABLED = enabled
+                    timings[enabled].append(round_us(client, headers, url, args.requests))
+            off, on = statistics.median(timings[False]), statistics.median(timings[True])
+            print(f"{url:<12} {off:>8.1f} {on:>8.1f} {(on - off) / off:>8.1%} "
+                  f"(MetricsMiddleware alone {added / off:.2%})")
+        settings.METRICS_ENABLED = True
+        start = time.perf_counter()
+        body = client.get("/metrics").text
+        print(f"/metrics scrape: {(time.perf_counter() - start) * 1000:.2f} ms, "
+              f"{len(body.splitlines())} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+ORM hydration against read_service projections for the list endpoints.
+
+For each list it loads the rows as full ORM instances (task_service.get_tasks,
+project_service.get_projects, a select of Comment entities) and as read_service
+rows, and reports:
+  load ms    fetch time, best of --repeat, each from an empty identity map
+  total ms   fetch plus rendering through the response schema
+  memory MB  bytes still allocated while the loaded list is held (tracemalloc)
+Run with: python -m benchmarks.read_path [--rows 10000] [--repeat 5]
+"""
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.models.comment import Comment as CommentModel
+from app.models.user import User
+from app.schemas.comment import Comment
+from app.schemas.project import Project
+from app.schemas.task import Task
+from app.services.project_service import get_projects
+from app.services.read_service import get_comment_rows, get_project_rows, get_task_rows
+from app.services.task_service import get_tasks
+from app.utils.response_cache import _render
+from benchmarks.common import seed_lists
+
+
+def loaders(db: Session, user: User) -> dict:
+    """(ORM loader, read-row loader, response type) per list endpoint"""
+    return {
+        "tasks": (
+            lambda: get_tasks(db, user, project_id=1),
+            lambda: get_task_rows(db, user, project_id=1),
+            list[Task],
+        ),
+        "projects": (
+            lambda: get_projects(db, user),
+            lambda: get_project_rows(db, user),
+            list[Project],
+        ),
+        "comments": (
+            lambda: db.scalars(select(CommentModel).where(CommentModel.task_id == 1)).all(),
+            lambda: get_comment_rows(db, 1),
+            list[Comment],
+        ),
+    }
+
+
+def best_of(db: Session, fn, repeat: int) -> float:
+    """Fastest of ``repeat`` runs in ms, each starting from an empty identity map"""
+    timings = []
+    for _ in range(repeat):
+        db.expunge_all()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def retained_mb(db: Session, load) -> float:
+    """Memory held by the loaded list, including the session's identity map"""
+    db.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    rows = load()
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return retained / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/read_path.db"
+        seed_lists(database_url, args.rows)
+        engine = create_engine(database_url)
+        print(f"{args.rows} rows per list")
+        print(f"{'endpoint':<10} {'path':<6} {'load ms':>9} {'total ms':>9} {'memory MB':>10}")
+        with Session(engine) as db:
+            user = db.get(User, 1)
+            for name, (orm, rows, response_type) in loaders(db, user).items():
+                for path, load in (("orm", orm), ("rows", rows)):
+                    load_ms = best_of(db, load, args.repeat)
+                    total_ms = best_of(db, lambda: _render(load(), response_type), args.repeat)
+                    memory = retained_mb(db, load)
+                    print(f"{name:<10} {path:<6} {load_ms:>9.1f} {total_ms:>9.1f} {memory:>10.2f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Read throughput of the cached list endpoints with the response cache on and off.
+
+Clients cycle through GET /api/projects, /api/projects/{id}, /api/projects/{id}/labels,
+/api/tasks and /api/tasks/{id}/comments against one uvicorn worker; with --write-every N
+one request in N updates a task instead, which invalidates the project's entries.
+Run with: python -m benchmarks.response_cache [--duration 10] [--write-every 100] [--async-db]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import free_port, login, seed, start_server, summarize, wait_until_ready
+
+CONCURRENCY = 50
+
+
+async def run_load(base_url: str, token: str, duration: float, write_every: int) -> dict:
+    latencies: list[float] = []
+    errors = hits = 0
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        task = (await client.get("/api/tasks?limit=1", headers=headers)).json()[0]
+        project_id, task_id = task["project_id"], task["id"]
+        urls = [
+            "/api/projects",
+            f"/api/projects/{project_id}",
+            f"/api/projects/{project_id}/labels",
+            "/api/tasks",
+            f"/api/tasks/{task_id}/comments",
+        ]
+        deadline = time.monotonic() + duration
+        sent = 0
+
+        async def worker(n: int) -> None:
+            nonlocal errors, hits, sent
+            while time.monotonic() < deadline:
+                sent += 1
+                start = time.perf_counter()
+                try:
+                    if write_every and sent % write_every == 0:
+                        response = await client.put(
+                            f"/api/tasks/{task_id}", json={"title": f"Task {sent}"},
+                            headers=headers,
+                        )
+                    else:
+                        response = await client.get(urls[(n + sent) % len(urls)], headers=headers)
+                        hits += response.headers.get("X-Cache") == "HIT"
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(n) for n in range(CONCURRENCY)))
+        elapsed = time.monotonic() - started
+
+    return {**summarize(latencies, elapsed, errors), "hit_rate": hits / max(len(latencies), 1)}
+
+
+async def bench(cache_bytes: int, duration: float, write_every: int, async_db: bool) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/cache.db"
+        seed(database_url, task_count=500)
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(
+            database_url, port, RESPONSE_CACHE_MAX_BYTES=cache_bytes, ASYNC_DB=async_db
+        )
+        try:
+            await wait_until_ready(base_url)
+            token = await login(base_url)
+            return await run_load(base_url, token, duration, write_every)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--write-every", type=int, nargs="+", default=[0, 100, 10])
+    parser.add_argument("--async-db", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'cache':<6} {'writes':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'hits':>6}")
+    for write_every in args.write_every:
+        for cache_bytes in (0, 64 * 1024 * 1024):
+            result = asyncio.run(bench(cache_bytes, args.duration, write_every, args.async_db))
+            print(
+                f"{'on' if cache_bytes else 'off':<6} "
+                f"{f'1/{write_every}' if write_every else 'none':>7} {result['rps']:>9.1f} "
+                f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['hit_rate']:>6.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
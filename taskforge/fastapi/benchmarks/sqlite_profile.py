@@ -0,0 +1,109 @@
+"""
+Mixed read/write load with and without the SQLite production profile.
+
+Clients read task pages and single tasks and, for --write-ratio of their
+requests, rename a task or add a comment, against --workers uvicorn workers
+with the response cache off. Errors are responses other than 200/201, which
+under the default rollback journal are mostly "database is locked".
+Run with: python -m benchmarks.sqlite_profile [--duration 10] [--workers 2] [--write-ratio 0.3]
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import free_port, login, seed, start_server, summarize, wait_until_ready
+
+CONCURRENCY = 50
+TASKS = 1000
+
+
+async def run_load(base_url: str, token: str, duration: float, write_ratio: float) -> dict:
+    latencies: list[float] = []
+    errors = writes = 0
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        deadline = time.monotonic() + duration
+
+        async def worker(n: int) -> None:
+            nonlocal errors, writes
+            rng = random.Random(n)
+            while time.monotonic() < deadline:
+                task_id = rng.randint(1, TASKS)
+                start = time.perf_counter()
+                try:
+                    if rng.random() < write_ratio:
+                        writes += 1
+                        if rng.random() < 0.5:
+                            response = await client.put(
+                                f"/api/tasks/{task_id}", json={"title": f"Task {start}"},
+                                headers=headers,
+                            )
+                        else:
+                            response = await client.post(
+                                f"/api/tasks/{task_id}/comments", json={"content": "Load"},
+                                headers=headers,
+                            )
+                    elif rng.random() < 0.5:
+                        response = await client.get(
+                            "/api/tasks?project_id=1&limit=50", headers=headers
+                        )
+                    else:
+                        response = await client.get(f"/api/tasks/{task_id}", headers=headers)
+                    ok = response.status_code in (200, 201)
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(n) for n in range(CONCURRENCY)))
+        elapsed = time.monotonic() - started
+
+    return {**summarize(latencies, elapsed, errors), "writes": writes}
+
+
+async def bench(production: bool, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/profile.db"
+        seed(database_url, task_count=TASKS)
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(
+            database_url, port, workers=args.workers, SQLITE_PRODUCTION=production,
+            RESPONSE_CACHE_MAX_BYTES=0, BCRYPT_TARGET_MS=0,
+        )
+        try:
+            await wait_until_ready(base_url)
+            token = await login(base_url)
+            return await run_load(base_url, token, args.duration, args.write_ratio)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers, {CONCURRENCY} clients, {args.write_ratio:.0%} writes")
+    print(f"{'profile':<12} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>9} {'errors':>7}")
+    for production in (False, True):
+        result = await bench(production, args)
+        name = "production" if production else "default"
+        print(f"{name:<12} {result['rps']:>8.0f} {result['p50_ms']:>8.1f} "
+              f"{result['p99_ms']:>9.1f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""
+Task lists with labels, assignee and comment count: lazy ORM relationships
+against read_service.get_task_fieldset's batched expansions.
+
+Seeds one project of --tasks tasks, each assigned and carrying two labels and
+two comments, and reports statements issued and the best of --repeat in ms.
+Run with: python -m benchmarks.task_expansions [--tasks 1000] [--repeat 5]
+"""
+import argparse
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event, insert, update
+from sqlalchemy.orm import Session
+
+from app.models.comment import Comment
+from app.models.label import Label, TaskLabel
+from app.models.task import Task
+from app.models.user import User
+from app.services.read_service import TASK_EXPANSIONS, get_task_fieldset
+from app.services.task_service import get_tasks
+from benchmarks.common import seed
+
+LABELS_PER_TASK = 2
+COMMENTS_PER_TASK = 2
+
+
+def seed_relations(db: Session, task_count: int) -> None:
+    """Assign every task and give it labels and comments"""
+    db.execute(update(Task).values(assignee_id=1))
+    db.execute(
+        insert(Label),
+        [{"name": f"Label {i}", "color": "#336699", "project_id": 1} for i in range(4)],
+    )
+    db.execute(
+        insert(TaskLabel),
+        [
+            {"task_id": task_id, "label_id": (task_id + i) % 4 + 1}
+            for task_id in range(1, task_count + 1)
+            for i in range(LABELS_PER_TASK)
+        ],
+    )
+    db.execute(
+        insert(Comment),
+        [
+            {"content": "Comment", "task_id": task_id, "author_id": 1}
+            for task_id in range(1, task_count + 1)
+            for _ in range(COMMENTS_PER_TASK)
+        ],
+    )
+    db.commit()
+
+
+def lazy_expansions(db: Session, user: User) -> list[dict]:
+    """What a client gets today: each relationship loads on first access"""
+    return [
+        {
+            "id": task.id,
+            "title": task.title,
+            "labels": [label.name for label in task.labels],
+            "assignee": task.assignee.name if task.assignee else None,
+            "comment_count": len(task.comments),
+        }
+        for task in get_tasks(db, user, project_id=1)
+    ]
+
+
+def batched_expansions(db: Session, user: User) -> list[dict]:
+    return get_task_fieldset(db, user, ("id", "title"), TASK_EXPANSIONS, project_id=1)[0]
+
+
+def measure(db: Session, engine, fn, user: User, repeat: int) -> tuple[int, float]:
+    """(statements issued, best time in ms), each run from an empty identity map"""
+    statements = []
+
+    def record(*args):
+        statements.append(args[2])
+
+    timings = []
+    for _ in range(repeat):
+        db.expunge_all()
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", record)
+        start = time.perf_counter()
+        fn(db, user)
+        timings.append(time.perf_counter() - start)
+        event.remove(engine, "before_cursor_execute", record)
+    return len(statements), min(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/expansions.db"
+        seed(database_url, args.tasks)
+        engine = create_engine(database_url)
+        with Session(engine) as db:
+            seed_relations(db, args.tasks)
+            user = db.get(User, 1)
+            print(f"{args.tasks} tasks, expand={','.join(TASK_EXPANSIONS)}")
+            print(f"{'path':<8} {'queries':>8} {'ms':>9}")
+            for name, fn in (("lazy", lazy_expansions), ("batched", batched_expansions)):
+                queries, ms = measure(db, engine, fn, user, args.repeat)
+                print(f"{name:<8} {queries:>8} {ms:>9.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Cross-worker event delivery under ``uvicorn --workers N``.
+
+Spreads SSE subscribers over the workers of one uvicorn process, updates a
+task through whichever worker accepts the request, and times how long until
+every subscriber, in every worker, has the event. With the bus disabled
+only the subscribers on the writing worker would see it.
+
+Run with: python -m benchmarks.worker_bus [--workers 4] [--subscribers 200] [--rounds 20]
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import free_port, login, seed, start_server, wait_until_ready
+from benchmarks.event_subscribers import subscribe
+
+
+async def run(workers: int, subscribers: int, rounds: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/bus.db"
+        seed(database_url, task_count=1)
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(
+            database_url, port, workers=workers, HASH_POOL_WORKERS=0, BCRYPT_TARGET_MS=0,
+            WORKER_BUS_DIR=f"{tmp}/bus",
+        )
+        connections = []
+        try:
+            await wait_until_ready(base_url)
+            # Give every worker time to bind its bus socket and see the others
+            await asyncio.sleep(2)
+            token = await login(base_url)
+            headers = {"Authorization": f"Bearer {token}"}
+            async with httpx.AsyncClient(base_url=base_url, headers=headers) as client:
+                task = (await client.get("/api/tasks")).json()[0]
+                semaphore = asyncio.Semaphore(50)
+                connections = await asyncio.gather(
+                    *(subscribe(port, token, task["project_id"], semaphore)
+                      for _ in range(subscribers))
+                )
+                slowest = []
+                for round_no in range(rounds):
+                    waiters = [
+                        asyncio.create_task(reader.readuntil(b"event: task.updated"))
+                        for reader, _ in connections
+                    ]
+                    start = time.perf_counter()
+                    # A fresh connection each round lets different workers do the write
+                    async with httpx.AsyncClient(base_url=base_url, headers=headers) as writer:
+                        await writer.put(f"/api/tasks/{task['id']}", json={"title": f"R{round_no}"})
+                    await asyncio.wait_for(asyncio.gather(*waiters), timeout=5)
+                    slowest.append(time.perf_counter() - start)
+            print(f"{workers} workers  {subscribers} subscribers  all received in "
+                  f"p50 {statistics.median(slowest) * 1000:.1f} ms  "
+                  f"max {max(slowest) * 1000:.1f} ms  (write included)")
+        finally:
+            for _, writer in connections:
+                writer.close()
+            await asyncio.sleep(0.1)
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--subscribers", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.workers, args.subscribers, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Per-mutation cost: INSERT/UPDATE ... RETURNING versus add/commit/refresh.
+
+Each service write is run against a seeded SQLite file next to the
+add-commit-refresh pattern it replaced, counting the statements sent to the
+database and timing each call.
+
+Run with: python -m benchmarks.write_returning [--iterations 2000]
+"""
+import argparse
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.project import ProjectCreate, ProjectUpdate
+from app.schemas.task import TaskCreate, TaskUpdate
+from app.services import project_service, task_service
+from benchmarks.common import EMAIL, seed, summarize
+
+
+def refresh_create_project(db: Session, data: ProjectCreate, user: User) -> Project:
+    project = Project(**data.model_dump(), owner_id=user.id)
+    db.add(project)
+    db.commit()
+    db.refresh(project)
+    return project
+
+
+def refresh_update_project(db: Session, project_id: int, data: ProjectUpdate, user: User):
+    project = project_service.get_project(db, project_id, user)
+    for key, value in data.model_dump(exclude_unset=True).items():
+        setattr(project, key, value)
+    db.commit()
+    db.refresh(project)
+    return project
+
+
+def refresh_create_task(db: Session, data: TaskCreate, user: User) -> Task:
+    project = db.query(Project).filter(Project.id == data.project_id).first()
+    assert project.owner_id == user.id
+    task = Task(**data.model_dump())
+    db.add(task)
+    db.commit()
+    db.refresh(task)
+    return task
+
+
+def refresh_update_task(db: Session, task_id: int, data: TaskUpdate, user: User) -> Task:
+    task = task_service.get_task(db, task_id, user)
+    for key, value in data.model_dump(exclude_unset=True).items():
+        setattr(task, key, value)
+    db.commit()
+    db.refresh(task)
+    return task
+
+
+def cases(project_id: int, task_id: int):
+    """(name, refresh-based call, RETURNING-based call); calls take (db, user, i).
+
+    The two variants write different values so neither sees an unchanged row.
+    """
+    return [
+        (
+            "create_project",
+            lambda db, user, i: refresh_create_project(db, ProjectCreate(name=f"R{i}"), user),
+            lambda db, user, i: project_service.create_project(
+                db, ProjectCreate(name=f"N{i}"), user
+            ),
+        ),
+        (
+            "update_project",
+            lambda db, user, i: refresh_update_project(
+                db, project_id, ProjectUpdate(name=f"R{i}"), user
+            ),
+            lambda db, user, i: project_service.update_project(
+                db, project_id, ProjectUpdate(name=f"N{i}"), user
+            ),
+        ),
+        (
+            "create_task",
+            lambda db, user, i: refresh_create_task(
+                db, TaskCreate(title=f"R{i}", project_id=project_id), user
+            ),
+            lambda db, user, i: task_service.create_task(
+                db, TaskCreate(title=f"N{i}", project_id=project_id), user
+            ),
+        ),
+        (
+            "update_task",
+            lambda db, user, i: refresh_update_task(db, task_id, TaskUpdate(title=f"R{i}"), user),
+            lambda db, user, i: task_service.update_task(
+                db, task_id, TaskUpdate(title=f"N{i}"), user
+            ),
+        ),
+    ]
+
+
+def measure(engine, calls: dict, iterations: int) -> dict:
+    """Statements per call and latency summary for each variant.
+
+    Variants are interleaved call by call, alternating which goes first, so
+    disk and cache drift affects them equally; each call gets a fresh session,
+    like a request.
+    """
+    with Session(engine) as db:
+        user = db.scalar(select(User).where(User.email == EMAIL))
+        db.expunge(user)
+
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    counts = dict.fromkeys(calls, 0)
+    latencies = {variant: [] for variant in calls}
+    event.listen(engine, "before_cursor_execute", count)
+    start = time.perf_counter()
+    order = list(calls.items())
+    for i in range(iterations):
+        for variant, call in order if i % 2 else reversed(order):
+            before = statements
+            call_start = time.perf_counter()
+            with Session(engine, autoflush=False) as db:
+                result = call(db, user, i)
+                # Read the fields the response model would
+                _ = (result.id, result.created_at, result.updated_at)
+            latencies[variant].append(time.perf_counter() - call_start)
+            counts[variant] += statements - before
+    elapsed = time.perf_counter() - start
+    event.remove(engine, "before_cursor_execute", count)
+    return {
+        variant: (counts[variant] / iterations, summarize(latencies[variant], elapsed, 0))
+        for variant in calls
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000, help="calls per variant")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/bench.db"
+        seed(database_url, task_count=1000)
+        engine = create_engine(database_url)
+        with Session(engine) as db:
+            project_id = db.scalar(select(Project.id))
+            task_id = db.scalar(select(Task.id))
+
+        print(f"{'mutation':<16}{'variant':<11}{'stmts':>7}{'p50 ms':>9}{'p99 ms':>9}")
+        for name, refresh_call, returning_call in cases(project_id, task_id):
+            results = measure(
+                engine, {"refresh": refresh_call, "returning": returning_call}, args.iterations
+            )
+            for variant, (per_call, stats) in results.items():
+                print(f"{name:<16}{variant:<11}{per_call:>7.1f}"
+                      f"{stats['p50_ms']:>9.3f}{stats['p99_ms']:>9.3f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
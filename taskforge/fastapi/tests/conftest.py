@@ -1,16 +1,38 @@
+from contextlib import contextmanager
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from app.config import settings
 from app.main import app
 from app.database import Base, get_db
 from app.models.user import User, UserRole
+from app.utils.principal_cache import principal_cache
+from app.utils.response_cache import response_cache
 from app.utils.security import get_password_hash
+from app.utils.sql_stats import instrument, repeated_shapes
 
 # Use in-memory SQLite for tests
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrument(engine)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Each test recreates the schema, so user and row ids are reused between tests
+    principal_cache.clear()
+    response_cache.clear()
+    yield
+    principal_cache.clear()
+    response_cache.clear()
+
+
+@pytest.fixture
+def sqlite_production(monkeypatch):
+    """Turn on the opt-in SQLite production profile for engines created in the test"""
+    monkeypatch.setattr(settings, "SQLITE_PRODUCTION", True)
 
 
 @pytest.fixture
@@ -59,3 +81,67 @@ def auth_headers(client, test_user):
     )
     token = response.json()["access_token"]
     return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def other_auth_headers(client, db):
+    """Auth headers for a second user who owns nothing"""
+    db.add(User(
+        email="other@example.com", name="Other User", role=UserRole.MEMBER,
+        password_hash=get_password_hash("otherpass123"),
+    ))
+    db.commit()
+    response = client.post(
+        "/api/auth/login", json={"email": "other@example.com", "password": "otherpass123"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def create_project(client, auth_headers):
+    """Factory for projects owned by the test user, with tasks titled "Task 0", "Task 1", ..."""
+    def create(tasks=1):
+        project = client.post(
+            "/api/projects", json={"name": "Test Project"}, headers=auth_headers
+        ).json()
+        created = [
+            client.post(
+                "/api/tasks", json={"title": f"Task {i}", "project_id": project["id"]},
+                headers=auth_headers,
+            ).json()
+            for i in range(tasks)
+        ]
+        return project, created
+    return create
+
+
+@pytest.fixture
+def captured_sql():
+    """Record every (statement, parameters) sent to the test database"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def query_budget(captured_sql):
+    """``with query_budget(n):`` fails if the block runs more than ``n`` statements
+    or repeats a statement shape ``repeat_limit`` times (an N+1)"""
+
+    @contextmanager
+    def budget(max_queries: int, repeat_limit: int = 3):
+        start = len(captured_sql)
+        yield
+        statements = [statement for statement, _ in captured_sql[start:]]
+        assert len(statements) <= max_queries, (
+            f"{len(statements)} queries, budget {max_queries}:\n" + "\n".join(statements)
+        )
+        repeated = repeated_shapes(statements, repeat_limit)
+        assert not repeated, f"repeated statements (N+1?): {repeated}"
+
+    return budget
@@ -0,0 +1,308 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.database import get_async_db
+from app.config import settings
+from app.routers.aio import auth, changes, projects, tasks, comments
+from app.utils.events import event_broker
+from app.utils.group_commit import group_committer
+from app.utils.response_cache import response_cache
+from app.utils.sql_stats import QueryStatsMiddleware, instrument
+from tests.conftest import SQLALCHEMY_DATABASE_URL, TestingSessionLocal
+
+
+@pytest.fixture
+async def async_client(db):
+    """Client for an app wired to the async routers, sharing the test database"""
+    async_engine = create_async_engine(
+        SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    )
+    instrument(async_engine.sync_engine)
+    AsyncTestingSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as session:
+            yield session
+
+    async_app = FastAPI()
+    for module in (auth, projects, tasks, comments, changes):
+        async_app.include_router(module.router)
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+    async_app.add_middleware(QueryStatsMiddleware)
+
+    async with AsyncClient(transport=ASGITransport(app=async_app), base_url="http://test") as ac:
+        yield ac
+    await async_engine.dispose()
+
+
+@pytest.fixture
+async def async_auth_headers(async_client, test_user):
+    response = await async_client.post(
+        "/api/auth/login", json={"email": "test@example.com", "password": "testpass123"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def test_async_login_and_me(async_client, async_auth_headers):
+    """Test the async auth flow"""
+    response = await async_client.get("/api/auth/me", headers=async_auth_headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "test@example.com"
+
+
+async def test_async_project_task_comment_flow(async_client, async_auth_headers):
+    """Test CRUD through the async routers"""
+    project = await async_client.post(
+        "/api/projects", json={"name": "Async Project"}, headers=async_auth_headers
+    )
+    assert project.status_code == 201
+    project_id = project.json()["id"]
+
+    task = await async_client.post(
+        "/api/tasks", json={"title": "Async Task", "project_id": project_id},
+        headers=async_auth_headers,
+    )
+    assert task.status_code == 201
+    task_id = task.json()["id"]
+
+    response = await async_client.put(
+        f"/api/tasks/{task_id}", json={"status": "DONE"}, headers=async_auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "DONE"
+
+    response = await async_client.post(
+        f"/api/tasks/{task_id}/comments", json={"content": "Looks good"},
+        headers=async_auth_headers,
+    )
+    assert response.status_code == 201
+
+    response = await async_client.get(f"/api/tasks/{task_id}/comments", headers=async_auth_headers)
+    assert [c["content"] for c in response.json()] == ["Looks good"]
+
+    response = await async_client.get(
+        f"/api/tasks?project_id={project_id}", headers=async_auth_headers
+    )
+    assert len(response.json()) == 1
+
+
+async def test_async_delete_task(async_client, async_auth_headers):
+    """Test deleting a task through the async routers"""
+    project = await async_client.post(
+        "/api/projects", json={"name": "Async Project"}, headers=async_auth_headers
+    )
+    task = await async_client.post(
+        "/api/tasks", json={"title": "Doomed", "project_id": project.json()["id"]},
+        headers=async_auth_headers,
+    )
+    task_id = task.json()["id"]
+
+    response = await async_client.delete(f"/api/tasks/{task_id}", headers=async_auth_headers)
+    assert response.status_code == 204
+    response = await async_client.get(f"/api/tasks/{task_id}", headers=async_auth_headers)
+    assert response.status_code == 404
+
+
+async def test_async_batch_create(async_client, async_auth_headers):
+    """Test the batch endpoint through the async routers"""
+    project = await async_client.post(
+        "/api/projects", json={"name": "Async Batch"}, headers=async_auth_headers
+    )
+    response = await async_client.post(
+        "/api/tasks:batch",
+        json={"items": [{"title": f"T{i}", "project_id": project.json()["id"]} for i in range(3)]},
+        headers=async_auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["succeeded"] == 3
+
+
+async def test_async_comment_on_unknown_task_is_forbidden(async_client, async_auth_headers):
+    """Test that commenting on a task the user cannot see is rejected"""
+    response = await async_client.post(
+        "/api/tasks/424242/comments", json={"content": "Hello"}, headers=async_auth_headers
+    )
+    assert response.status_code == 403
+
+
+async def test_async_export_project(async_client, async_auth_headers):
+    """Test streaming an export through the async routers"""
+    project = await async_client.post(
+        "/api/projects", json={"name": "Async Export"}, headers=async_auth_headers
+    )
+    project_id = project.json()["id"]
+    for i in range(3):
+        await async_client.post(
+            "/api/tasks", json={"title": f"T{i}", "project_id": project_id}, headers=async_auth_headers
+        )
+
+    response = await async_client.get(
+        f"/api/projects/{project_id}/export", headers=async_auth_headers
+    )
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 3
+    response = await async_client.get(
+        f"/api/projects/{project_id}/export", params={"format": "csv"}, headers=async_auth_headers
+    )
+    assert response.text.splitlines()[0].startswith("id,title,")
+
+
+async def test_async_import_project_tasks(async_client, async_auth_headers):
+    """Test importing an upload through the async routers"""
+    project = await async_client.post(
+        "/api/projects", json={"name": "Async Import"}, headers=async_auth_headers
+    )
+    response = await async_client.post(
+        f"/api/projects/{project.json()['id']}/import",
+        files={"file": ("tasks.csv", "title,priority\nA,HIGH\nB,\n", "text/csv")},
+        headers=async_auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["imported"] == 2
+
+
+async def test_async_change_feed(async_client, async_auth_headers, monkeypatch):
+    """Test the change feed and delete tombstones through the async routers"""
+    monkeypatch.setattr(settings, "CHANGE_FEED_LAG_MS", 0)
+    project = await async_client.post(
+        "/api/projects", json={"name": "Async Feed"}, headers=async_auth_headers
+    )
+    task = await async_client.post(
+        "/api/tasks", json={"title": "Synced", "project_id": project.json()["id"]},
+        headers=async_auth_headers,
+    )
+    feed = (await async_client.get("/api/changes", headers=async_auth_headers)).json()
+    assert [item["title"] for item in feed["tasks"]] == ["Synced"]
+
+    await async_client.delete(f"/api/tasks/{task.json()['id']}", headers=async_auth_headers)
+    feed = (await async_client.get(
+        "/api/changes", params={"since": feed["cursor"]}, headers=async_auth_headers
+    )).json()
+    assert [(item["entity_type"], item["entity_id"]) for item in feed["deleted"]] == [
+        ("task", task.json()["id"])
+    ]
+
+
+async def test_async_writes_publish_events(async_client, async_auth_headers):
+    """Test that async task and comment writes reach event subscribers"""
+    project = await async_client.post(
+        "/api/projects", json={"name": "Async Live"}, headers=async_auth_headers
+    )
+    project_id = project.json()["id"]
+    subscription = event_broker.subscribe(project_id)
+    try:
+        task = await async_client.post(
+            "/api/tasks", json={"title": "Pushed", "project_id": project_id},
+            headers=async_auth_headers,
+        )
+        await async_client.post(
+            f"/api/tasks/{task.json()['id']}/comments", json={"content": "Hi"},
+            headers=async_auth_headers,
+        )
+        received = [(await subscription.get(timeout=1))[0] for _ in range(2)]
+        assert received == ["task.created", "comment.created"]
+    finally:
+        event_broker.unsubscribe(subscription)
+
+
+async def test_async_reads_are_cached_and_invalidated(async_client, async_auth_headers):
+    """Test that async list reads hit the response cache until a write"""
+    project = await async_client.post(
+        "/api/projects", json={"name": "Async Cached"}, headers=async_auth_headers
+    )
+    url = f"/api/tasks?project_id={project.json()['id']}"
+    assert (await async_client.get(url, headers=async_auth_headers)).headers["X-Cache"] == "MISS"
+    cached = await async_client.get(url, headers=async_auth_headers)
+    assert (cached.headers["X-Cache"], cached.json()) == ("HIT", [])
+
+    await async_client.post(
+        "/api/tasks", json={"title": "Fresh", "project_id": project.json()["id"]},
+        headers=async_auth_headers,
+    )
+    refreshed = await async_client.get(url, headers=async_auth_headers)
+    assert refreshed.headers["X-Cache"] == "MISS"
+    assert [task["title"] for task in refreshed.json()] == ["Fresh"]
+
+
+async def test_async_fast_json_matches_validated_responses(
+    async_client, async_auth_headers, monkeypatch
+):
+    """Test the async Core-row list paths against the schema-validated ones"""
+    monkeypatch.setattr(response_cache, "max_bytes", 0)
+    project = await async_client.post(
+        "/api/projects", json={"name": "Async Fast"}, headers=async_auth_headers
+    )
+    task = await async_client.post(
+        "/api/tasks", json={"title": "Fast", "project_id": project.json()["id"]},
+        headers=async_auth_headers,
+    )
+    await async_client.post(
+        f"/api/tasks/{task.json()['id']}/comments", json={"content": "Fast"},
+        headers=async_auth_headers,
+    )
+    urls = ["/api/projects", "/api/tasks", "/api/tasks?limit=1",
+            f"/api/tasks/{task.json()['id']}/comments"]
+
+    validated = [(await async_client.get(url, headers=async_auth_headers)).content for url in urls]
+    monkeypatch.setattr(settings, "FAST_JSON", True)
+    fast = [(await async_client.get(url, headers=async_auth_headers)).content for url in urls]
+    assert fast == validated
+
+
+async def test_async_task_fieldsets(async_client, async_auth_headers):
+    """Test sparse fields and expansions on the async task list"""
+    project = await async_client.post(
+        "/api/projects", json={"name": "Async Sparse"}, headers=async_auth_headers
+    )
+    task = await async_client.post(
+        "/api/tasks", json={"title": "Sparse", "project_id": project.json()["id"]},
+        headers=async_auth_headers,
+    )
+    await async_client.post(
+        f"/api/tasks/{task.json()['id']}/comments", json={"content": "Sparse"},
+        headers=async_auth_headers,
+    )
+
+    response = await async_client.get(
+        "/api/tasks?fields=id,title&expand=comment_count", headers=async_auth_headers
+    )
+    assert response.json() == [{"title": "Sparse", "id": task.json()["id"], "comment_count": 1}]
+    bad = await async_client.get("/api/tasks?fields=nope", headers=async_auth_headers)
+    assert bad.status_code == 400
+
+
+async def test_async_server_timing(async_client, async_auth_headers):
+    """Test that statements run through AsyncSession are counted per request"""
+    response = await async_client.get("/api/projects", headers=async_auth_headers)
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert 'desc="0 queries"' not in response.headers["Server-Timing"]
+
+
+async def test_async_group_commit(async_client, async_auth_headers, monkeypatch):
+    """Test that async task updates and comments are answered from the committer"""
+    monkeypatch.setattr(settings, "GROUP_COMMIT", True)
+    monkeypatch.setattr(group_committer, "session_factory", TestingSessionLocal)
+    project = await async_client.post(
+        "/api/projects", json={"name": "Grouped"}, headers=async_auth_headers
+    )
+    task = await async_client.post(
+        "/api/tasks", json={"title": "Grouped", "project_id": project.json()["id"]},
+        headers=async_auth_headers,
+    )
+    task_id = task.json()["id"]
+    try:
+        response = await async_client.put(
+            f"/api/tasks/{task_id}", json={"title": "Renamed"}, headers=async_auth_headers
+        )
+        assert response.json()["title"] == "Renamed"
+        response = await async_client.post(
+            f"/api/tasks/{task_id}/comments", json={"content": "Grouped"},
+            headers=async_auth_headers,
+        )
+        assert response.json()["content"] == "Grouped"
+    finally:
+        group_committer.stop()
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import time
+from app.utils import bus
+from app.utils.bus import WorkerBus, invalidate, on_invalidate, worker_bus
+from app.utils.events import event_broker
+
+WORKERS = 3
+
+
+def _run_worker(directory, ready, stop, received):
+    """Join the bus in a separate process and report every task invalidation"""
+
+    async def main():
+        on_invalidate("task", lambda task_id: received.put((os.getpid(), task_id, time.monotonic())))
+        worker_bus.start(directory)
+        ready.release()
+        await asyncio.to_thread(stop.wait)
+        worker_bus.stop()
+
+    asyncio.run(main())
+
+
+async def test_invalidation_reaches_every_worker(tmp_path):
+    """Test that an invalidation published in one process reaches the others within milliseconds"""
+    context = multiprocessing.get_context("spawn")
+    ready, stop, received = context.Semaphore(0), context.Event(), context.Queue()
+    workers = [
+        context.Process(target=_run_worker, args=(str(tmp_path), ready, stop, received))
+        for _ in range(WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for _ in workers:
+            assert await asyncio.to_thread(ready.acquire, timeout=30)
+        worker_bus.start(str(tmp_path))
+        assert worker_bus.has_peers()
+
+        latencies = []
+        for task_id in range(20):
+            sent_at = time.monotonic()
+            invalidate(("task", task_id))
+            for _ in workers:
+                pid, received_id, received_at = await asyncio.to_thread(received.get, timeout=5)
+                assert received_id == task_id
+                latencies.append(received_at - sent_at)
+        # Every worker got every message, and the median hop is well under 5 ms
+        assert len(latencies) == 20 * WORKERS
+        assert sorted(latencies)[len(latencies) // 2] < 0.005
+        assert max(latencies) < 0.05
+    finally:
+        worker_bus.stop()
+        stop.set()
+        for worker in workers:
+            worker.join(timeout=10)
+
+
+async def test_bus_forgets_exited_workers(tmp_path):
+    """Test that a socket left behind by a dead worker is removed on first send"""
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    stale.bind(str(tmp_path / "999999.sock"))
+    stale.close()
+
+    local_bus = WorkerBus()
+    local_bus.start(str(tmp_path))
+    try:
+        assert local_bus.has_peers()
+        local_bus.publish("invalidate", [["task", 1]])
+        for _ in range(100):
+            if not (tmp_path / "999999.sock").exists():
+                break
+            await asyncio.sleep(0.01)
+        assert not (tmp_path / "999999.sock").exists()
+        assert local_bus.stats()["dropped"] == 0
+    finally:
+        local_bus.stop()
+    assert list(tmp_path.iterdir()) == []
+
+
+def _peer(tmp_path, pid=999999) -> socket.socket:
+    """A raw socket that the bus takes for another worker"""
+    peer = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    peer.bind(str(tmp_path / f"{pid}.sock"))
+    peer.settimeout(5)
+    return peer
+
+
+async def test_oversized_messages_are_refused(tmp_path):
+    """Test that a message too large for a datagram is not sent, and events send a stand-in"""
+    peer = _peer(tmp_path)
+    worker_bus.start(str(tmp_path))
+    try:
+        assert not worker_bus.publish("test", "x" * bus.MAX_MESSAGE_BYTES)
+        assert worker_bus.stats()["oversized"] == 1
+        event_broker.publish(7, "comment.created", {"comment": {"content": "x" * 300_000}})
+        message = await asyncio.to_thread(peer.recv, bus.MAX_MESSAGE_BYTES)
+        assert json.loads(message) == [os.getpid(), 1, ["event.lost", 7]]
+    finally:
+        worker_bus.stop()
+        peer.close()
+
+
+async def test_receiver_notices_lost_messages(tmp_path):
+    """Test that a gap in a sender's sequence numbers runs the lost-message handlers"""
+    local_bus = WorkerBus()
+    lost, seen = [], []
+    local_bus.on_lost(lambda: lost.append(len(seen)))
+    local_bus.subscribe("test", seen.append)
+    local_bus.start(str(tmp_path))
+    sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        for message in ([42, 1, ["test", "a"]], [42, 2, ["test", "b"]], [42, 4, ["test", "d"]]):
+            sender.sendto(json.dumps(message).encode(), str(tmp_path / f"{os.getpid()}.sock"))
+        sender.sendto(b"[42, 5, ", str(tmp_path / f"{os.getpid()}.sock"))
+        for _ in range(100):
+            if len(lost) == 2:
+                break
+            await asyncio.sleep(0.01)
+        # Messages after a gap are still applied, after the handlers
+        assert seen == ["a", "b", "d"]
+        assert lost == [2, 3]
+        assert local_bus.stats()["lost"] == 2
+    finally:
+        sender.close()
+        local_bus.stop()
+
+
+async def test_dropped_messages_are_followed_by_a_ping(tmp_path, monkeypatch):
+    """Test that a peer that missed messages hears of it without waiting for new ones"""
+    monkeypatch.setattr(bus, "SEND_TIMEOUT_SECONDS", 0.05)
+    peer = _peer(tmp_path)
+    local_bus = WorkerBus()
+    local_bus.start(str(tmp_path))
+    try:
+        # The peer does not read, so its queue fills up and the last sends time out
+        for n in range(30):
+            local_bus.publish("test", n)
+        for _ in range(500):
+            stats = local_bus.stats()
+            if stats["sent"] + stats["dropped"] == 30:
+                break
+            await asyncio.sleep(0.01)
+        assert stats["dropped"]
+
+        sequences, channel = [], None
+        while channel != "bus.ping":
+            _, sequence, (channel, _) = json.loads(
+                await asyncio.to_thread(peer.recv, bus.MAX_MESSAGE_BYTES)
+            )
+            sequences.append(sequence)
+        assert sequences != list(range(1, len(sequences) + 1))
+    finally:
+        local_bus.stop()
+        peer.close()
+
+
+def test_invalidation_applies_locally_without_bus(monkeypatch):
+    """Test that handlers run in-process even when the bus is not running"""
+    monkeypatch.setattr(bus, "_invalidation_handlers", {})
+    seen = []
+    on_invalidate("label", seen.append)
+    invalidate(("label", 7), ("project", 3))
+    assert seen == [7]
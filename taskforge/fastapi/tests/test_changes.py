@@ -0,0 +1,113 @@
+import pytest
+from app.config import settings
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+
+
+@pytest.fixture(autouse=True)
+def no_feed_lag(monkeypatch):
+    monkeypatch.setattr(settings, "CHANGE_FEED_LAG_MS", 0)
+
+
+def test_changes_initial_sync(client, auth_headers, create_project):
+    """Test that the first poll returns everything the user owns"""
+    project, (task,) = create_project()
+    project_id, task_id = project["id"], task["id"]
+    client.post(f"/api/tasks/{task_id}/comments", json={"content": "Hi"}, headers=auth_headers)
+    client.post(
+        f"/api/projects/{project_id}/labels",
+        json={"name": "bug", "color": "#FF0000"},
+        headers=auth_headers,
+    )
+
+    response = client.get("/api/changes", headers=auth_headers)
+    assert response.status_code == 200
+    feed = response.json()
+    assert [project["id"] for project in feed["projects"]] == [project_id]
+    assert [task["id"] for task in feed["tasks"]] == [task_id]
+    assert len(feed["comments"]) == 1
+    assert len(feed["labels"]) == 1
+    assert feed["deleted"] == []
+    assert feed["has_more"] is False
+
+    # Nothing changed since
+    feed = client.get("/api/changes", params={"since": feed["cursor"]}, headers=auth_headers).json()
+    assert feed["projects"] == feed["tasks"] == feed["comments"] == feed["labels"] == []
+
+
+def test_changes_updates_and_deletes(client, auth_headers, create_project):
+    """Test that updates and deletions after a cursor are reported"""
+    project, (task,) = create_project()
+    project_id, task_id = project["id"], task["id"]
+    cursor = client.get("/api/changes", headers=auth_headers).json()["cursor"]
+
+    client.put(f"/api/tasks/{task_id}", json={"status": "DONE"}, headers=auth_headers)
+    feed = client.get("/api/changes", params={"since": cursor}, headers=auth_headers).json()
+    assert [(task["id"], task["status"]) for task in feed["tasks"]] == [(task_id, "DONE")]
+    assert feed["projects"] == []
+
+    client.delete(f"/api/tasks/{task_id}", headers=auth_headers)
+    client.delete(f"/api/projects/{project_id}", headers=auth_headers)
+    feed = client.get("/api/changes", params={"since": feed["cursor"]}, headers=auth_headers).json()
+    assert [(item["entity_type"], item["entity_id"]) for item in feed["deleted"]] == [
+        ("task", task_id),
+        ("project", project_id),
+    ]
+
+
+def test_changes_pagination(client, auth_headers):
+    """Test walking a large change set with a small limit"""
+    project_id = client.post(
+        "/api/projects", json={"name": "Paged Feed"}, headers=auth_headers
+    ).json()["id"]
+    client.post(
+        "/api/tasks:batch",
+        json={"items": [{"title": f"T{i}", "project_id": project_id} for i in range(5)]},
+        headers=auth_headers,
+    )
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 2, **({"since": cursor} if cursor else {})}
+        feed = client.get("/api/changes", params=params, headers=auth_headers).json()
+        seen.extend(task["title"] for task in feed["tasks"])
+        cursor = feed["cursor"]
+        pages += 1
+        if not feed["has_more"]:
+            break
+    assert sorted(seen) == [f"T{i}" for i in range(5)]
+    assert pages == 3
+
+
+def test_changes_scoped_to_owner(client, auth_headers, db):
+    """Test that other users' changes are not visible"""
+    other = User(email="other@example.com", name="Other", password_hash="x")
+    db.add(other)
+    db.flush()
+    project = Project(name="Theirs", owner_id=other.id)
+    db.add(project)
+    db.flush()
+    db.add(Task(title="Theirs", project_id=project.id))
+    db.commit()
+
+    feed = client.get("/api/changes", headers=auth_headers).json()
+    assert feed["projects"] == [] and feed["tasks"] == []
+
+
+def test_changes_lag_holds_back_recent_writes(client, auth_headers, monkeypatch, create_project):
+    """Test that rows newer than the lag wait for a later poll"""
+    monkeypatch.setattr(settings, "CHANGE_FEED_LAG_MS", 60_000)
+    create_project()
+    feed = client.get("/api/changes", headers=auth_headers).json()
+    assert feed["projects"] == [] and feed["tasks"] == []
+
+    monkeypatch.setattr(settings, "CHANGE_FEED_LAG_MS", 0)
+    feed = client.get("/api/changes", params={"since": feed["cursor"]}, headers=auth_headers).json()
+    assert len(feed["projects"]) == 1 and len(feed["tasks"]) == 1
+
+
+def test_changes_invalid_cursor(client, auth_headers):
+    """Test that a malformed cursor is rejected"""
+    response = client.get("/api/changes", params={"since": "garbage"}, headers=auth_headers)
+    assert response.status_code == 400
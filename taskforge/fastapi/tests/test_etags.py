@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta
+import pytest
+from starlette.requests import Request
+from app.models.project import Project
+from app.utils.conditional import etag_matches, make_etag
+from app.utils.response_cache import response_cache
+
+
+@pytest.fixture
+def no_response_cache(monkeypatch):
+    monkeypatch.setattr(response_cache, "max_bytes", 0)
+
+
+def test_etag_matching():
+    """Test weak comparison against single, listed and wildcard If-None-Match values"""
+    etag = make_etag(1, (3, "2026-01-01"))
+    assert etag.startswith('W/"') and etag != make_etag(2, (3, "2026-01-01"))
+
+    def request(header):
+        return Request({"type": "http", "headers": [(b"if-none-match", header.encode())]})
+
+    assert etag_matches(request(etag), etag)
+    assert etag_matches(request(etag.removeprefix("W/")), etag)
+    assert etag_matches(request(f'"other", {etag}'), etag)
+    assert etag_matches(request("*"), etag)
+    assert not etag_matches(request('W/"other"'), etag)
+
+
+def test_unchanged_list_returns_304_without_loading_rows(
+    client, auth_headers, captured_sql, no_response_cache, create_project
+):
+    """Test that a matching If-None-Match is answered from one aggregate query"""
+    project, _ = create_project()
+    url = f"/api/tasks?project_id={project['id']}"
+    etag = client.get(url, headers=auth_headers).headers["ETag"]
+
+    captured_sql.clear()
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    statements = [statement for statement, _ in captured_sql]
+    assert len(statements) == 1 and "max(tasks.updated_at)" in statements[0]
+
+
+@pytest.mark.parametrize("cache_enabled", [True, False])
+def test_writes_change_etags(client, auth_headers, monkeypatch, cache_enabled, create_project):
+    """Test that ETags change with the data, and only with the data"""
+    if not cache_enabled:
+        monkeypatch.setattr(response_cache, "max_bytes", 0)
+    project, (task,) = create_project()
+    urls = ["/api/tasks", f"/api/tasks/{task['id']}", f"/api/projects/{project['id']}"]
+
+    def etags():
+        return [client.get(url, headers=auth_headers).headers["ETag"] for url in urls]
+
+    def revalidate(etag_list):
+        return [
+            client.get(url, headers={**auth_headers, "If-None-Match": etag}).status_code
+            for url, etag in zip(urls, etag_list)
+        ]
+
+    before = etags()
+    assert revalidate(before) == [304, 304, 304]
+
+    client.put(f"/api/tasks/{task['id']}", json={"status": "DONE"}, headers=auth_headers)
+    assert revalidate(before) == [200, 200, 304]
+
+    updated = etags()
+    other = client.post(
+        "/api/tasks", json={"title": "Other", "project_id": project["id"]}, headers=auth_headers
+    ).json()
+    assert revalidate(updated) == [200, 304, 304]
+    updated = etags()
+    # Deleting the newest task puts max(updated_at) back; the tombstone still moves the list
+    client.delete(f"/api/tasks/{other['id']}", headers=auth_headers)
+    assert revalidate(updated) == [200, 304, 304]
+
+
+def test_project_list_etag_counts_projects(
+    client, auth_headers, db, test_user, no_response_cache
+):
+    """Test that a project committed with an older timestamp still changes the list's ETag"""
+    client.post("/api/projects", json={"name": "Newer"}, headers=auth_headers)
+    etag = client.get("/api/projects", headers=auth_headers).headers["ETag"]
+
+    # As from another worker whose clock read earlier
+    older = datetime.utcnow() - timedelta(minutes=1)
+    db.add(Project(name="Older", owner_id=test_user.id, created_at=older, updated_at=older))
+    db.commit()
+    response = client.get("/api/projects", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+def test_cached_response_revalidates_without_sql(
+    client, auth_headers, captured_sql, create_project
+):
+    """Test that the response cache answers If-None-Match from the stored ETag"""
+    project, (task,) = create_project()
+    url = f"/api/tasks/{task['id']}/comments"
+    etag = client.get(url, headers=auth_headers).headers["ETag"]
+
+    captured_sql.clear()
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert (response.status_code, response.headers["X-Cache"]) == (304, "HIT")
+    assert captured_sql == []
+
+
+def test_etag_does_not_bypass_access_checks(
+    client, auth_headers, other_auth_headers, no_response_cache, create_project
+):
+    """Test that another user's ETag never turns a 403 or 404 into a 304"""
+    project, (task,) = create_project()
+    project_url = f"/api/projects/{project['id']}"
+    project_etag = client.get(project_url, headers=auth_headers).headers["ETag"]
+    labels_etag = client.get(f"{project_url}/labels", headers=auth_headers).headers["ETag"]
+    task_etag = client.get(f"/api/tasks/{task['id']}", headers=auth_headers).headers["ETag"]
+
+    for url, etag, expected in [
+        (project_url, project_etag, 403),
+        (f"{project_url}/labels", labels_etag, 403),
+        (f"/api/tasks/{task['id']}", task_etag, 404),
+        ("/api/projects", "*", 304),
+    ]:
+        response = client.get(url, headers={**other_auth_headers, "If-None-Match": etag})
+        assert response.status_code == expected
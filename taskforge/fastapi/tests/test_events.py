@@ -0,0 +1,194 @@
+import asyncio
+import json
+import threading
+import pytest
+from starlette.websockets import WebSocketDisconnect
+from app.main import app
+from app.utils.events import EventBroker, event_broker
+
+
+def _token(auth_headers):
+    return auth_headers["Authorization"].removeprefix("Bearer ")
+
+
+async def test_broker_delivers_across_threads():
+    """Test that events published from a worker thread reach loop subscribers"""
+    broker = EventBroker(queue_size=8)
+    subscription = broker.subscribe(1)
+    other = broker.subscribe(2)
+
+    thread = threading.Thread(target=broker.publish, args=(1, "task.updated", {"task_id": 5}))
+    thread.start()
+    thread.join()
+
+    assert await subscription.get(timeout=1) == (
+        "task.updated", '{"type": "task.updated", "project_id": 1, "task_id": 5}'
+    )
+    assert await other.get(timeout=0.01) is None
+    assert broker.stats()["published"] == 1
+
+
+async def test_broker_drops_slow_subscriber():
+    """Test that a full buffer drops only the lagging subscriber"""
+    broker = EventBroker(queue_size=2)
+    slow = broker.subscribe(1)
+    fast = broker.subscribe(1)
+
+    for task_id in range(3):
+        broker.publish(1, "task.deleted", {"task_id": task_id})
+        await fast.get(timeout=1)
+
+    assert slow.overflowed and slow.closed
+    assert await slow.get(timeout=1) is None
+    assert broker.stats() == {"projects": 1, "subscribers": 1, "published": 3, "dropped": 1}
+
+
+async def test_broker_resync_drops_subscribers():
+    """Test that undeliverable events end subscriptions with the overflow signal"""
+    broker = EventBroker(queue_size=8)
+    first, second, other = broker.subscribe(1), broker.subscribe(1), broker.subscribe(2)
+
+    broker.resync(1)
+    assert first.overflowed and second.overflowed and not other.closed
+    broker.resync()
+    assert other.overflowed
+    assert broker.stats() == {"projects": 0, "subscribers": 0, "published": 0, "dropped": 3}
+
+
+def test_websocket_receives_task_and_comment_events(client, auth_headers, create_project):
+    """Test that task and comment writes are pushed to WebSocket subscribers"""
+    project_id = create_project(tasks=0)[0]["id"]
+    url = f"/api/projects/{project_id}/events/ws?token={_token(auth_headers)}"
+    with client.websocket_connect(url) as websocket:
+        task = client.post(
+            "/api/tasks", json={"title": "Live task", "project_id": project_id},
+            headers=auth_headers,
+        ).json()
+        event = websocket.receive_json()
+        assert event["type"] == "task.created"
+        assert event["project_id"] == project_id
+        assert event["task"]["title"] == "Live task"
+
+        client.put(f"/api/tasks/{task['id']}", json={"status": "DONE"}, headers=auth_headers)
+        event = websocket.receive_json()
+        assert (event["type"], event["task"]["status"]) == ("task.updated", "DONE")
+
+        client.delete(f"/api/tasks/{task['id']}", headers=auth_headers)
+        assert websocket.receive_json() == {
+            "type": "task.deleted", "project_id": project_id, "task_id": task["id"]
+        }
+
+        task = client.post(
+            "/api/tasks", json={"title": "Discussed", "project_id": project_id},
+            headers=auth_headers,
+        ).json()
+        websocket.receive_json()
+        client.post(
+            f"/api/tasks/{task['id']}/comments", json={"content": "Nice"}, headers=auth_headers
+        )
+        event = websocket.receive_json()
+        assert (event["type"], event["comment"]["content"]) == ("comment.created", "Nice")
+    assert not event_broker.has_subscribers(project_id)
+
+
+def test_websocket_receives_batch_and_import_events(client, auth_headers, create_project):
+    """Test that batch and import writes are pushed like single-task writes"""
+    project_id = create_project(tasks=0)[0]["id"]
+    url = f"/api/projects/{project_id}/events/ws?token={_token(auth_headers)}"
+    with client.websocket_connect(url) as websocket:
+        items = [{"title": title, "project_id": project_id} for title in ("One", "Two")]
+        ids = [r["id"] for r in client.post(
+            "/api/tasks:batch", json={"items": items}, headers=auth_headers
+        ).json()["results"]]
+        events = [websocket.receive_json() for _ in ids]
+        assert [(e["type"], e["task"]["title"]) for e in events] == [
+            ("task.created", "One"), ("task.created", "Two")
+        ]
+
+        updates = [{"id": ids[0], "status": "DONE"}, {"id": 424242, "title": "Missing"}]
+        client.put("/api/tasks:batch", json={"items": updates}, headers=auth_headers)
+        event = websocket.receive_json()
+        assert (event["type"], event["task"]["id"], event["task"]["status"]) == (
+            "task.updated", ids[0], "DONE"
+        )
+
+        client.request("DELETE", "/api/tasks:batch", json={"ids": ids}, headers=auth_headers)
+        assert sorted(websocket.receive_json()["task_id"] for _ in ids) == sorted(ids)
+
+        upload = "\n".join(json.dumps({"title": title}) for title in ("Three", "Four"))
+        client.post(
+            f"/api/projects/{project_id}/import",
+            files={"file": ("tasks.ndjson", upload, "application/x-ndjson")},
+            headers=auth_headers,
+        )
+        events = [websocket.receive_json() for _ in range(2)]
+        assert [(e["type"], e["task"]["title"]) for e in events] == [
+            ("task.created", "Three"), ("task.created", "Four")
+        ]
+
+
+def test_websocket_rejects_bad_token(client, auth_headers, create_project):
+    """Test that a WebSocket subscription needs a valid token and an owned project"""
+    project_id = create_project(tasks=0)[0]["id"]
+    with pytest.raises(WebSocketDisconnect) as exc_info:
+        with client.websocket_connect(f"/api/projects/{project_id}/events/ws?token=bogus"):
+            pass
+    assert exc_info.value.code == 1008
+
+    url = f"/api/projects/999/events/ws?token={_token(auth_headers)}"
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(url):
+            pass
+
+
+def test_sse_requires_project_access(client, auth_headers):
+    """Test that subscribing to someone else's project fails before streaming"""
+    response = client.get("/api/projects/999/events", headers=auth_headers)
+    assert response.status_code == 404
+
+
+async def test_sse_streams_task_events(client, auth_headers, create_project):
+    """Test the Server-Sent Events stream end to end over ASGI"""
+    project_id = create_project(tasks=0)[0]["id"]
+    sent: asyncio.Queue = asyncio.Queue()
+    disconnected = asyncio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"/api/projects/{project_id}/events",
+        "raw_path": f"/api/projects/{project_id}/events".encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"authorization", auth_headers["Authorization"].encode()),
+        ],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    stream = asyncio.create_task(app(scope, receive, sent.put))
+
+    start = await asyncio.wait_for(sent.get(), 5)
+    assert start["status"] == 200
+    assert (b"content-type", b"text/event-stream; charset=utf-8") in start["headers"]
+    assert (await asyncio.wait_for(sent.get(), 5))["body"] == b": subscribed\n\n"
+
+    await asyncio.to_thread(
+        client.post, "/api/tasks", json={"title": "Streamed", "project_id": project_id},
+        headers=auth_headers,
+    )
+    body = (await asyncio.wait_for(sent.get(), 5))["body"].decode()
+    assert body.startswith("event: task.created\ndata: ")
+    assert '"title": "Streamed"' in body
+
+    disconnected.set()
+    await asyncio.wait_for(stream, 5)
+    assert not event_broker.has_subscribers(project_id)
@@ -0,0 +1,60 @@
+from dataclasses import fields
+import pytest
+from app.config import settings
+from app.schemas.comment import Comment
+from app.schemas.project import Project
+from app.schemas.task import Task
+from app.services.read_service import CommentRow, ProjectRow, TaskRow
+from app.utils.response_cache import response_cache
+
+
+@pytest.mark.parametrize(
+    "row_type, schema", [(ProjectRow, Project), (TaskRow, Task), (CommentRow, Comment)]
+)
+def test_read_rows_follow_response_schemas(row_type, schema):
+    """Test that read rows carry exactly the schema's fields, in its order"""
+    assert [field.name for field in fields(row_type)] == list(schema.model_fields)
+
+
+@pytest.fixture
+def seeded(client, auth_headers, monkeypatch):
+    """A project with tasks and comments, and the response cache off"""
+    monkeypatch.setattr(response_cache, "max_bytes", 0)
+    project = client.post(
+        "/api/projects", json={"name": "Fast", "description": "naïve ✓"}, headers=auth_headers
+    ).json()
+    task_ids = []
+    for i, priority in enumerate(["LOW", "HIGH", "URGENT"]):
+        task = client.post(
+            "/api/tasks",
+            json={"title": f"Task {i}", "project_id": project["id"], "priority": priority},
+            headers=auth_headers,
+        ).json()
+        task_ids.append(task["id"])
+    client.post(
+        f"/api/tasks/{task_ids[0]}/comments", json={"content": 'says "hi"'}, headers=auth_headers
+    )
+    return project["id"], task_ids[0]
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/api/projects",
+        "/api/tasks",
+        "/api/tasks?project_id={project_id}&priority=HIGH",
+        "/api/tasks?limit=2",
+        "/api/tasks/{task_id}/comments",
+    ],
+)
+def test_fast_json_matches_validated_responses(client, auth_headers, seeded, monkeypatch, url):
+    """Test that Core rows dumped with orjson are byte-identical to the schema path"""
+    project_id, task_id = seeded
+    url = url.format(project_id=project_id, task_id=task_id)
+    validated = client.get(url, headers=auth_headers)
+    monkeypatch.setattr(settings, "FAST_JSON", True)
+    fast = client.get(url, headers=auth_headers)
+
+    assert fast.status_code == validated.status_code == 200
+    assert fast.content == validated.content
+    assert fast.headers.get("X-Next-Cursor") == validated.headers.get("X-Next-Cursor")
@@ -0,0 +1,87 @@
+from app.models.label import Label, TaskLabel
+from app.models.project import Project
+from app.models.task import Task
+
+
+def seed_tasks(db, user, count):
+    """``count`` tasks in one project, each with a label and a comment on the first"""
+    project = Project(name="Sparse", owner_id=user.id)
+    db.add(project)
+    db.flush()
+    label = Label(name="bug", color="#ff0000", project_id=project.id)
+    tasks = [
+        Task(title=f"Task {i}", project_id=project.id, assignee_id=user.id) for i in range(count)
+    ]
+    db.add_all([label, *tasks])
+    db.flush()
+    db.execute(TaskLabel.insert(), [{"task_id": t.id, "label_id": label.id} for t in tasks])
+    db.commit()
+    return project, label, tasks
+
+
+def test_fields_narrow_columns_and_output(client, auth_headers, db, test_user, captured_sql):
+    """Test that ?fields= selects and returns only the requested fields"""
+    seed_tasks(db, test_user, 3)
+    captured_sql.clear()
+    response = client.get("/api/tasks?fields=title,status", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert [set(task) for task in response.json()] == [{"title", "status"}] * 3
+    select_tasks = [s for s, _ in captured_sql if s.startswith("SELECT") and "tasks.title" in s]
+    assert len(select_tasks) == 1
+    assert "tasks.description" not in select_tasks[0]
+
+
+def test_unknown_fields_are_rejected(client, auth_headers):
+    """Test that unknown field and expansion names give a 400"""
+    assert client.get("/api/tasks?fields=title,secret", headers=auth_headers).status_code == 400
+    assert client.get("/api/tasks?expand=owner", headers=auth_headers).status_code == 400
+
+
+def test_expansions(client, auth_headers, db, test_user):
+    """Test that labels, assignee and comment counts are attached to each task"""
+    _, label, tasks = seed_tasks(db, test_user, 2)
+    client.post(f"/api/tasks/{tasks[0].id}/comments", json={"content": "hi"}, headers=auth_headers)
+    response = client.get(
+        "/api/tasks?fields=id&expand=labels,assignee,comment_count", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "BYPASS"
+    assert "ETag" not in response.headers
+    by_id = {task["id"]: task for task in response.json()}
+    assert by_id[tasks[0].id]["comment_count"] == 1
+    assert by_id[tasks[1].id]["comment_count"] == 0
+    assert by_id[tasks[0].id]["labels"] == [
+        {"name": "bug", "color": "#ff0000", "id": label.id, "project_id": label.project_id}
+    ]
+    assert by_id[tasks[1].id]["assignee"] == {"id": test_user.id, "name": test_user.name}
+
+
+def test_expansions_use_constant_queries(client, auth_headers, db, test_user, captured_sql):
+    """Test that expanding does not issue a query per task"""
+    projects = {size: seed_tasks(db, test_user, size)[0].id for size in (5, 50)}
+    client.get("/api/tasks", headers=auth_headers)  # warm the principal cache
+    counts = []
+    for size, project_id in projects.items():
+        captured_sql.clear()
+        response = client.get(
+            f"/api/tasks?project_id={project_id}&expand=labels,assignee,comment_count",
+            headers=auth_headers,
+        )
+        assert len(response.json()) == size
+        counts.append(len(captured_sql))
+    assert counts[0] == counts[1]
+
+
+def test_fieldset_changes_etag(client, auth_headers, db, test_user):
+    """Test that a sparse list does not share the full list's ETag"""
+    seed_tasks(db, test_user, 2)
+    full = client.get("/api/tasks", headers=auth_headers)
+    sparse = client.get("/api/tasks?fields=id", headers=auth_headers)
+
+    assert full.headers["ETag"] != sparse.headers["ETag"]
+    revalidated = client.get(
+        "/api/tasks?fields=id", headers={**auth_headers, "If-None-Match": sparse.headers["ETag"]}
+    )
+    assert revalidated.status_code == 304
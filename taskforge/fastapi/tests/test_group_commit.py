@@ -0,0 +1,111 @@
+import threading
+import pytest
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database import Base, RoutingSession, create_engines
+from app.models.project import Project
+from app.models.user import User
+from app.utils.group_commit import GroupCommitter, group_committer
+from tests.conftest import TestingSessionLocal
+
+pytestmark = pytest.mark.usefixtures("sqlite_production")
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    writer, reader = create_engines(
+        f"sqlite:///{tmp_path}/group.db", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(writer)
+    factory = sessionmaker(bind=writer, class_=RoutingSession, reader=reader, autoflush=False)
+    with factory() as db:
+        db.add(User(email="owner@example.com", name="Owner", password_hash="x"))
+        db.commit()
+    yield factory
+    writer.dispose()
+    reader.dispose()
+
+
+@pytest.fixture
+def committer(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "GROUP_COMMIT_WINDOW_MS", 50.0)
+    committer = GroupCommitter(session_factory)
+    yield committer
+    committer.stop()
+
+
+def count_commits(session_factory):
+    commits = []
+    event.listen(session_factory.kw["bind"], "commit", lambda conn: commits.append(1))
+    return commits
+
+
+def test_concurrent_statements_share_a_commit(committer, session_factory):
+    """Test that concurrent inserts commit together and each caller gets its own row"""
+    commits = count_commits(session_factory)
+    barrier = threading.Barrier(8)
+    results = {}
+
+    def work(n):
+        barrier.wait()
+        statement = insert(Project).values(name=f"P{n}", owner_id=1).returning(Project)
+        results[n] = committer.submit(statement).result()
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert {n: project.name for n, project in results.items()} == {n: f"P{n}" for n in range(8)}
+    assert committer.statements == 8
+    assert len(commits) == committer.commits < 8
+    with session_factory() as db:
+        assert len(db.scalars(select(Project)).all()) == 8
+
+
+def test_failed_statement_only_fails_its_caller(committer, session_factory):
+    """Test that a constraint error goes to its caller while the batch commits"""
+    first = committer.submit(insert(Project).values(name="A", owner_id=1).returning(Project))
+    bad = committer.submit(update(Project).values(name=None).returning(Project))
+    last = committer.submit(insert(Project).values(name="B", owner_id=1).returning(Project))
+
+    assert (first.result().name, last.result().name) == ("A", "B")
+    with pytest.raises(IntegrityError):
+        bad.result()
+    assert committer.commits == 1
+    with session_factory() as db:
+        assert db.scalars(select(Project.name).order_by(Project.id)).all() == ["A", "B"]
+
+
+def test_stop_commits_queued_statements(committer, session_factory):
+    """Test that stopping the committer flushes what is already queued"""
+    future = committer.submit(insert(Project).values(name="A", owner_id=1).returning(Project))
+    committer.stop()
+    assert future.result(timeout=0).name == "A"
+
+
+def test_endpoints_use_group_commit(client, auth_headers, monkeypatch):
+    """Test task updates and new comments through the committer"""
+    monkeypatch.setattr(settings, "GROUP_COMMIT", True)
+    monkeypatch.setattr(settings, "GROUP_COMMIT_WINDOW_MS", 1.0)
+    monkeypatch.setattr(group_committer, "session_factory", TestingSessionLocal)
+    monkeypatch.setattr(group_committer, "statements", 0)
+    project = client.post("/api/projects", json={"name": "P"}, headers=auth_headers).json()
+    task = client.post(
+        "/api/tasks", json={"title": "T", "project_id": project["id"]}, headers=auth_headers
+    ).json()
+
+    response = client.put(f"/api/tasks/{task['id']}", json={"title": "U"}, headers=auth_headers)
+    assert response.json()["title"] == "U"
+    response = client.post(
+        f"/api/tasks/{task['id']}/comments", json={"content": "Hi"}, headers=auth_headers
+    )
+    assert response.status_code == 201
+    assert response.json()["content"] == "Hi"
+    missing = client.put("/api/tasks/999", json={"title": "X"}, headers=auth_headers)
+    assert missing.status_code == 404
+    assert group_committer.statements == 3
+    group_committer.stop()
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import signal
+import pytest
+from passlib.hash import bcrypt
+from app.models.user import User, UserRole
+from app.utils.exceptions import ServiceUnavailableException
+from app.utils import hashing
+from app.utils.hashing import (
+    PasswordHasher,
+    calibrate_bcrypt_rounds,
+    password_hasher,
+    shared_calibration,
+)
+
+
+def test_hasher_round_trip_in_pool():
+    """Test hashing and verification through the process pool"""
+    hasher = PasswordHasher(workers=1, queue_size=4)
+    try:
+        hashed = hasher.hash("s3cret")
+        assert hasher.verify("s3cret", hashed)
+        assert not hasher.verify("wrong", hashed)
+        stats = hasher.stats()
+        assert stats["completed"] == 3
+        assert stats["in_flight"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_hasher_recovers_when_a_worker_dies():
+    """Test that a killed pool worker does not break later calls"""
+    hasher = PasswordHasher(workers=1, queue_size=4)
+    try:
+        hashed = hasher.hash("s3cret")
+        for attempt in range(2):
+            for pid in list(hasher._executor._processes):
+                os.kill(pid, signal.SIGKILL)
+            if attempt == 0:
+                assert hasher.verify("s3cret", hashed)
+            else:
+                assert asyncio.run(hasher.verify_async("s3cret", hashed))
+        assert hasher.stats()["in_flight"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_hasher_rejects_when_queue_full():
+    """Test that a full queue fails fast with 503"""
+    hasher = PasswordHasher(workers=0, queue_size=1)
+    hasher._slots.acquire()
+    with pytest.raises(ServiceUnavailableException) as exc_info:
+        hasher.hash("s3cret")
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "1"
+    assert hasher.stats()["rejected"] == 1
+
+
+def test_login_returns_503_when_hasher_saturated(client, test_user, monkeypatch):
+    """Test that the login route surfaces hashing backpressure"""
+    saturated = PasswordHasher(workers=0, queue_size=1)
+    saturated._slots.acquire()
+    monkeypatch.setattr(password_hasher, "_slots", saturated._slots)
+
+    response = client.post(
+        "/api/auth/login", json={"email": "test@example.com", "password": "testpass123"}
+    )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_calibrate_bcrypt_rounds_respects_bounds():
+    """Test that calibration stays within the configured cost range"""
+    rounds, measured_ms = calibrate_bcrypt_rounds(target_ms=1, min_rounds=5, max_rounds=6)
+    assert rounds == 5
+    assert measured_ms > 0
+
+    rounds, _ = calibrate_bcrypt_rounds(target_ms=10_000, min_rounds=5, max_rounds=6)
+    assert rounds == 6
+
+
+def test_workers_share_one_calibration(tmp_path, monkeypatch):
+    """Test that workers on a host reuse the first worker's cost instead of measuring again"""
+    measured = iter([(5, 1.0), (6, 2.0), (7, 3.0)])
+    monkeypatch.setattr(hashing, "calibrate_bcrypt_rounds", lambda *args: next(measured))
+    path = f"{tmp_path}/bus/bcrypt-rounds"
+
+    assert shared_calibration(path, 100, 4, 10) == (5, 1.0)
+    assert shared_calibration(path, 100, 4, 10) == (5, 1.0)
+    # Other settings are calibrated afresh
+    assert shared_calibration(path, 200, 4, 10) == (6, 2.0)
+
+
+def test_login_rehashes_to_calibrated_cost(client, db):
+    """Test that a login transparently upgrades a hash with a different cost"""
+    user = User(
+        email="legacy@example.com",
+        name="Legacy User",
+        role=UserRole.MEMBER,
+        password_hash=bcrypt.using(rounds=4).hash("legacypass"),
+    )
+    db.add(user)
+    db.commit()
+    assert password_hasher.needs_rehash(user.password_hash)
+
+    response = client.post(
+        "/api/auth/login", json={"email": "legacy@example.com", "password": "legacypass"}
+    )
+    assert response.status_code == 200
+
+    db.refresh(user)
+    assert not password_hasher.needs_rehash(user.password_hash)
+    assert bcrypt.verify("legacypass", user.password_hash)
+
+
+def test_hashing_diagnostics_requires_admin(client, auth_headers, db):
+    """Test the diagnostics endpoint reports the cost to admins only"""
+    response = client.get("/api/diagnostics/hashing", headers=auth_headers)
+    assert response.status_code == 403
+
+    db.add(
+        User(
+            email="admin@example.com",
+            name="Admin",
+            role=UserRole.ADMIN,
+            password_hash=password_hasher.hash("adminpass"),
+        )
+    )
+    db.commit()
+    token = client.post(
+        "/api/auth/login", json={"email": "admin@example.com", "password": "adminpass"}
+    ).json()["access_token"]
+
+    response = client.get(
+        "/api/diagnostics/hashing", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["rounds"] == password_hasher.rounds
+    assert data["calibrated"] is True
+    assert "in_flight" in data["pool"]
@@ -0,0 +1,72 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import pytest
+from app.utils.metrics import BUCKETS, metrics, render
+
+SAMPLE = re.compile(r'^taskforge_\w+(\{(\w+="[^"]*",?)+\})? [0-9.e+-]+$')
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_requests_are_counted_by_route_template(client, auth_headers):
+    """Test request counters, latency histograms and gauges in /metrics"""
+    project = client.post("/api/projects", json={"name": "Metrics"}, headers=auth_headers).json()
+    client.get(f"/api/projects/{project['id']}", headers=auth_headers)
+    client.get("/api/projects/999999", headers=auth_headers)
+    client.get("/no/such/path")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    route = 'method="GET",route="/api/projects/{project_id}"'
+    assert f'taskforge_http_requests_total{{{route},status="200"}} 1' in text
+    assert f'taskforge_http_requests_total{{{route},status="404"}} 1' in text
+    assert 'route="unmatched",status="404"} 1' in text
+    assert f'taskforge_http_request_duration_seconds_bucket{{{route},le="+Inf"}} 2' in text
+    assert f"taskforge_http_request_duration_seconds_count{{{route}}} 2" in text
+    buckets = re.findall(rf"duration_seconds_bucket\{{{re.escape(route)}", text)
+    assert len(buckets) == len(BUCKETS) + 1
+    for gauge in ("http_requests_in_flight", "hash_pool_queued", "threadpool_threads_busy"):
+        assert f"# TYPE taskforge_{gauge} gauge" in text
+    for line in text.splitlines():
+        assert line.startswith("# ") or SAMPLE.match(line), line
+
+
+def test_snapshots_are_summed():
+    """Test that counters, histograms and gauges from several workers add up"""
+    metrics.started("GET")
+    metrics.finished("GET", "/api/tasks", 200, 0.003)
+    own = metrics.snapshot()
+    text = render([own, json.loads(json.dumps(own))])
+
+    assert 'taskforge_http_requests_total{method="GET",route="/api/tasks",status="200"} 2' in text
+    assert 'route="/api/tasks",le="0.005"} 2' in text
+    assert "taskforge_workers 2" in text
+
+
+async def test_other_workers_snapshots_are_collected(tmp_path):
+    """Test that live workers' snapshot files are read and exited workers' removed"""
+    metrics.start(str(tmp_path))
+    try:
+        peer = {"requests": [["GET", "/api/tasks", "200", 5]], "durations": [], "gauges": []}
+        (tmp_path / f"{os.getppid()}.json").write_text(json.dumps(peer))
+        exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                                capture_output=True, text=True, check=True)
+        stale = tmp_path / f"{exited.stdout.strip()}.json"
+        stale.write_text(json.dumps(peer))
+
+        snapshots = metrics.collect()
+        assert len(snapshots) == 2
+        assert 'route="/api/tasks",status="200"} 5' in render(snapshots)
+        assert not stale.exists()
+    finally:
+        metrics.stop()
@@ -0,0 +1,73 @@
+import time
+from app.models.user import User
+from app.utils.principal_cache import PrincipalCache, principal_cache
+
+
+def _user(user_id: int, name: str = "Cached User") -> User:
+    return User(id=user_id, email=f"u{user_id}@example.com", name=name, password_hash="x")
+
+
+def test_cache_lru_eviction():
+    """Test that the least recently used entry is evicted first"""
+    cache = PrincipalCache(max_size=2, ttl_seconds=60)
+    cache.set(1, 100, _user(1))
+    cache.set(2, 100, _user(2))
+    assert cache.get(1, 100) is not None
+    cache.set(3, 100, _user(3))
+
+    assert cache.get(2, 100) is None
+    assert cache.get(1, 100).email == "u1@example.com"
+    assert cache.stats() == {"size": 2, "hits": 2, "misses": 1, "evictions": 1}
+
+
+def test_cache_ttl_and_invalidate(monkeypatch):
+    """Test expiry and per-user invalidation across tokens"""
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    cache.set(1, 100, _user(1))
+    cache.set(1, 200, _user(1))
+    cache.set(2, 100, _user(2))
+    cache.invalidate(1)
+    assert cache.get(1, 100) is None
+    assert cache.get(1, 200) is None
+    assert cache.get(2, 100) is not None
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert cache.get(2, 100) is None
+
+
+def test_warm_request_skips_user_lookup(client, auth_headers, captured_sql):
+    """Test that a cached principal avoids SELECT ... FROM users"""
+    assert client.get("/api/projects", headers=auth_headers).status_code == 200
+    captured_sql.clear()
+    response = client.get("/api/auth/me", headers=auth_headers)
+    assert client.get("/api/projects", headers=auth_headers).status_code == 200
+
+    assert response.json()["email"] == "test@example.com"
+    assert not [s for s, _ in captured_sql if "FROM users" in s]
+    assert principal_cache.stats()["hits"] >= 2
+
+
+def test_user_update_invalidates_cache(client, auth_headers, db, test_user):
+    """Test that changing the user row drops the cached principal"""
+    client.get("/api/auth/me", headers=auth_headers)
+    test_user.name = "Renamed User"
+    db.commit()
+
+    response = client.get("/api/auth/me", headers=auth_headers)
+    assert response.json()["name"] == "Renamed User"
+
+
+def test_invalidation_waits_for_commit(db, test_user):
+    """Test that a flushed change drops the cached principal at commit, not before"""
+    principal_cache.set(test_user.id, 100, test_user)
+    test_user.name = "Flushed"
+    db.flush()
+    # Other requests cannot see the change yet, so they could only cache the old row again
+    assert principal_cache.get(test_user.id, 100) is not None
+    db.rollback()
+    assert principal_cache.get(test_user.id, 100) is not None
+
+    test_user.name = "Committed"
+    db.commit()
+    assert principal_cache.get(test_user.id, 100) is None
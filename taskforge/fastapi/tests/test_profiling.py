@@ -0,0 +1,91 @@
+import re
+import threading
+import pytest
+from app.config import settings
+from app.models.user import User, UserRole
+from app.utils.profiling import StackSampler, profile_store
+from app.utils.security import get_password_hash
+
+COLLAPSED_LINE = re.compile(r"^\S.* \d+$")
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profile_store, "directory", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_INTERVAL_MS", 1.0)
+
+
+@pytest.fixture
+def admin_headers(client, db):
+    db.add(User(
+        email="admin@example.com", name="Admin", role=UserRole.ADMIN,
+        password_hash=get_password_hash("adminpass"),
+    ))
+    db.commit()
+    response = client.post(
+        "/api/auth/login", json={"email": "admin@example.com", "password": "adminpass"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_admin_header_profiles_request(client, admin_headers):
+    """Test that an admin's X-Profile request is stored and downloadable"""
+    response = client.get("/api/projects?x=1", headers={**admin_headers, "X-Profile": "1"})
+    profile_id = response.headers["X-Profile-Id"]
+
+    listing = client.get("/api/diagnostics/profiles", headers=admin_headers).json()
+    assert listing[0]["id"] == profile_id
+    assert listing[0]["path"] == "/api/projects"
+    assert listing[0]["query"] == "x=1"
+    assert (listing[0]["status"], listing[0]["trigger"]) == (200, "header")
+    download = client.get(f"/api/diagnostics/profiles/{profile_id}", headers=admin_headers)
+    assert download.status_code == 200
+    assert all(COLLAPSED_LINE.match(line) for line in download.text.splitlines())
+
+
+def test_header_is_ignored_for_non_admins(client, auth_headers, admin_headers):
+    """Test that members cannot trigger profiling or read profiles"""
+    response = client.get("/api/projects", headers={**auth_headers, "X-Profile": "1"})
+    assert "X-Profile-Id" not in response.headers
+    assert client.get("/api/diagnostics/profiles", headers=auth_headers).status_code == 403
+    assert client.get("/api/diagnostics/profiles", headers=admin_headers).json() == []
+
+
+def test_sample_rate_and_ring(client, auth_headers, monkeypatch):
+    """Test sampled profiling and that only the newest PROFILE_KEEP are kept"""
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(profile_store, "keep", 3)
+    ids = [client.get("/health").headers["X-Profile-Id"] for _ in range(5)]
+
+    assert [entry["id"] for entry in profile_store.entries()] == ids[:1:-1]
+    assert profile_store.path(ids[0]) is None
+
+
+def test_unknown_profile_is_404(client, admin_headers):
+    """Test that ids outside the store, including paths, are not served"""
+    for profile_id in ("1-2-3", "..%2Fsecret"):
+        response = client.get(f"/api/diagnostics/profiles/{profile_id}", headers=admin_headers)
+        assert response.status_code == 404
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_records_busy_threads():
+    """Test that the sampler sees work in other threads as collapsed stacks"""
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,))
+    sampler = StackSampler(1.0)
+    worker.start()
+    sampler.start()
+    try:
+        while sampler.samples < 20:
+            stop.wait(0.01)
+    finally:
+        sampler.stop()
+        stop.set()
+        worker.join()
+
+    assert "busy_loop (tests/test_profiling.py:" in sampler.collapsed()
@@ -1,5 +1,9 @@
+import csv
+import io
+import json
 import pytest
 from app.models.project import ProjectStatus
+from app.models.label import TaskLabel
 
 
 def test_create_project(client, auth_headers):
@@ -78,3 +82,126 @@ def test_update_project(client, auth_headers):
 # Intentional gap: Missing delete project test
 # Intentional gap: Missing test for unauthorized access
 # Intentional gap: Missing test for invalid project ID
+
+
+@pytest.fixture
+def export_project(client, auth_headers, create_project):
+    """A project with a label and three tasks, the first with a comment"""
+    project, tasks = create_project(tasks=3)
+    label = client.post(
+        f"/api/projects/{project['id']}/labels",
+        json={"name": "bug", "color": "#FF0000"},
+        headers=auth_headers,
+    ).json()
+    task_ids = [task["id"] for task in tasks]
+    client.post(
+        f"/api/tasks/{task_ids[0]}/comments", json={"content": "First"}, headers=auth_headers
+    )
+    return project["id"], label["id"], task_ids
+
+
+def test_export_project_ndjson(client, auth_headers, db, export_project):
+    """Test streaming a project export as NDJSON"""
+    project_id, label_id, task_ids = export_project
+    db.execute(TaskLabel.insert().values(task_id=task_ids[0], label_id=label_id))
+    db.commit()
+
+    response = client.get(f"/api/projects/{project_id}/export", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(record["id"] for record in records) == task_ids
+    first = next(record for record in records if record["id"] == task_ids[0])
+    assert first["labels"] == ["bug"]
+    assert [comment["content"] for comment in first["comments"]] == ["First"]
+    assert first["status"] == "TODO"
+
+
+def test_export_project_csv(client, auth_headers, export_project):
+    """Test streaming a project export as CSV"""
+    project_id, _, task_ids = export_project
+
+    response = client.get(
+        f"/api/projects/{project_id}/export", params={"format": "csv"}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert sorted(int(row["id"]) for row in rows) == task_ids
+    first = next(row for row in rows if int(row["id"]) == task_ids[0])
+    assert json.loads(first["comments"])[0]["content"] == "First"
+
+
+def test_export_project_access(client, auth_headers):
+    """Test that exporting requires an owned project and a known format"""
+    response = client.get("/api/projects/999/export", headers=auth_headers)
+    assert response.status_code == 404
+    project_id = client.post(
+        "/api/projects", json={"name": "Empty"}, headers=auth_headers
+    ).json()["id"]
+    response = client.get(
+        f"/api/projects/{project_id}/export", params={"format": "xml"}, headers=auth_headers
+    )
+    assert response.status_code == 422
+
+
+def test_import_project_tasks_ndjson(client, auth_headers):
+    """Test importing tasks from NDJSON with per-line errors"""
+    project_id = client.post(
+        "/api/projects", json={"name": "Import Project"}, headers=auth_headers
+    ).json()["id"]
+    upload = "\n".join(
+        [
+            json.dumps({"title": "One", "priority": "HIGH"}),
+            "{not json",
+            "",
+            json.dumps({"title": "Two", "project_id": 999}),
+            json.dumps({"priority": "LOW"}),
+            json.dumps(["not", "an", "object"]),
+        ]
+    )
+
+    response = client.post(
+        f"/api/projects/{project_id}/import",
+        files={"file": ("tasks.ndjson", upload, "application/x-ndjson")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["imported"] == 2
+    assert summary["failed"] == 3
+    assert [error["line"] for error in summary["errors"]] == [2, 5, 6]
+    assert "title" in summary["errors"][1]["error"]
+
+    tasks = client.get(f"/api/tasks?project_id={project_id}", headers=auth_headers).json()
+    assert sorted(task["title"] for task in tasks) == ["One", "Two"]
+
+
+def test_import_project_tasks_csv_round_trip(client, auth_headers, export_project):
+    """Test that a CSV export imports back into another project"""
+    source_id, _, _ = export_project
+    exported = client.get(
+        f"/api/projects/{source_id}/export", params={"format": "csv"}, headers=auth_headers
+    ).text
+    target_id = client.post(
+        "/api/projects", json={"name": "Copy"}, headers=auth_headers
+    ).json()["id"]
+
+    response = client.post(
+        f"/api/projects/{target_id}/import",
+        files={"file": ("tasks.csv", exported, "text/csv")},
+        headers=auth_headers,
+    )
+    assert response.json() == {"imported": 3, "failed": 0, "errors": [], "errors_truncated": False}
+    tasks = client.get(f"/api/tasks?project_id={target_id}", headers=auth_headers).json()
+    assert sorted(task["title"] for task in tasks) == ["Task 0", "Task 1", "Task 2"]
+
+
+def test_import_project_tasks_not_found(client, auth_headers):
+    """Test that importing into an unknown project fails"""
+    response = client.post(
+        "/api/projects/999/import",
+        files={"file": ("tasks.ndjson", "{}", "application/x-ndjson")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 404
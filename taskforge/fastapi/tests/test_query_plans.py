@@ -0,0 +1,227 @@
+"""
+Query plan regression checks.
+
+Every service function that talks to the database is run against a small
+fixture dataset while its SQL is captured; each statement is then explained
+with EXPLAIN QUERY PLAN and any full table scan fails the test. New service
+functions must be registered in SERVICE_CALLS.
+"""
+import inspect
+import io
+import re
+from types import SimpleNamespace
+import pytest
+from app.models.comment import Comment
+from app.models.label import Label, TaskLabel
+from app.models.project import Project
+from app.models.task import Task, TaskStatus
+from app.schemas.project import ProjectCreate, ProjectUpdate
+from app.schemas.task import TaskBatchUpdateItem, TaskCreate, TaskUpdate
+from app.schemas.user import UserCreate
+from app.services import (
+    auth_service,
+    change_service,
+    export_service,
+    fingerprint_service,
+    import_service,
+    project_service,
+    read_service,
+    task_service,
+)
+
+SERVICE_MODULES = (
+    auth_service,
+    change_service,
+    export_service,
+    fingerprint_service,
+    import_service,
+    project_service,
+    read_service,
+    task_service,
+)
+
+# Scans that are acceptable, keyed by (service function, table), with the reason
+ALLOWED_SCANS = {
+    ("get_tasks_page", "tasks"): "unfiltered first page walks ix_tasks_updated_at_id up to LIMIT",
+    ("get_task_rows_page", "tasks"): "same query as get_tasks_page, fewer columns",
+}
+
+SCAN_PATTERN = re.compile(r"^SCAN (\w+)")
+SKIPPED_PREFIXES = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA")
+
+SERVICE_CALLS = {
+    "register_user": lambda db, ctx: auth_service.register_user(
+        db, UserCreate(email="new@example.com", name="New", password="newpass123")
+    ),
+    "authenticate_user": lambda db, ctx: auth_service.authenticate_user(
+        db, "test@example.com", "testpass123"
+    ),
+    "get_projects": lambda db, ctx: project_service.get_projects(db, ctx.user),
+    "get_project": lambda db, ctx: project_service.get_project(db, ctx.project_id, ctx.user),
+    "create_project": lambda db, ctx: project_service.create_project(
+        db, ProjectCreate(name="Another"), ctx.user
+    ),
+    "update_project": lambda db, ctx: project_service.update_project(
+        db, ctx.project_id, ProjectUpdate(name="Renamed"), ctx.user
+    ),
+    "delete_project": lambda db, ctx: project_service.delete_project(
+        db, ctx.empty_project_id, ctx.user
+    ),
+    "get_tasks": lambda db, ctx: task_service.get_tasks(db, ctx.user),
+    "get_tasks_page": lambda db, ctx: [
+        task_service.get_tasks_page(db, ctx.user, limit=1),
+        task_service.get_tasks_page(db, ctx.user, limit=1, project_id=ctx.project_id),
+        task_service.get_tasks_page(
+            db, ctx.user, limit=1, project_id=ctx.project_id, status=TaskStatus.TODO
+        ),
+        task_service.get_tasks_page(db, ctx.user, limit=1, assignee_id=ctx.user.id),
+    ],
+    "get_task": lambda db, ctx: task_service.get_task(db, ctx.task_id, ctx.user),
+    "create_task": lambda db, ctx: task_service.create_task(
+        db, TaskCreate(title="New", project_id=ctx.project_id), ctx.user
+    ),
+    "update_task": lambda db, ctx: task_service.update_task(
+        db, ctx.task_id, TaskUpdate(status=TaskStatus.DONE), ctx.user
+    ),
+    "delete_task": lambda db, ctx: task_service.delete_task(db, ctx.bare_task_id, ctx.user),
+    "create_tasks_batch": lambda db, ctx: task_service.create_tasks_batch(
+        db, [TaskCreate(title="Bulk", project_id=ctx.project_id)] * 3, ctx.user
+    ),
+    "update_tasks_batch": lambda db, ctx: task_service.update_tasks_batch(
+        db, [TaskBatchUpdateItem(id=ctx.task_id, status=TaskStatus.DONE)], ctx.user
+    ),
+    "delete_tasks_batch": lambda db, ctx: task_service.delete_tasks_batch(
+        db, [ctx.task_id, ctx.bare_task_id], ctx.user
+    ),
+    "export_project": lambda db, ctx: list(
+        export_service.export_project(db, ctx.project_id, ctx.user)
+    ),
+    "get_changes": lambda db, ctx: [
+        change_service.get_changes(db, ctx.user),
+        change_service.get_changes(
+            db, ctx.user, change_service.get_changes(db, ctx.user, limit=1)["cursor"]
+        ),
+    ],
+    "get_projects_fingerprint": lambda db, ctx: fingerprint_service.get_projects_fingerprint(
+        db, ctx.user
+    ),
+    "get_project_fingerprint": lambda db, ctx: fingerprint_service.get_project_fingerprint(
+        db, ctx.project_id, ctx.user
+    ),
+    "get_labels_fingerprint": lambda db, ctx: fingerprint_service.get_labels_fingerprint(
+        db, ctx.project_id, ctx.user
+    ),
+    "get_tasks_fingerprint": lambda db, ctx: [
+        fingerprint_service.get_tasks_fingerprint(db, ctx.user),
+        fingerprint_service.get_tasks_fingerprint(db, ctx.user, project_id=ctx.project_id),
+        fingerprint_service.get_tasks_fingerprint(
+            db, ctx.user, project_id=ctx.project_id, status=TaskStatus.TODO
+        ),
+        fingerprint_service.get_tasks_fingerprint(db, ctx.user, assignee_id=ctx.user.id),
+    ],
+    "get_task_fingerprint": lambda db, ctx: fingerprint_service.get_task_fingerprint(
+        db, ctx.task_id, ctx.user
+    ),
+    "get_comments_fingerprint": lambda db, ctx: fingerprint_service.get_comments_fingerprint(
+        db, ctx.task_id, ctx.user
+    ),
+    "get_project_rows": lambda db, ctx: read_service.get_project_rows(db, ctx.user),
+    "get_task_rows": lambda db, ctx: [
+        read_service.get_task_rows(db, ctx.user),
+        read_service.get_task_rows(db, ctx.user, project_id=ctx.project_id),
+    ],
+    "get_task_rows_page": lambda db, ctx: [
+        read_service.get_task_rows_page(db, ctx.user, limit=1),
+        read_service.get_task_rows_page(db, ctx.user, limit=1, project_id=ctx.project_id),
+    ],
+    "get_comment_rows": lambda db, ctx: read_service.get_comment_rows(db, ctx.task_id),
+    "get_task_fieldset": lambda db, ctx: [
+        read_service.get_task_fieldset(
+            db, ctx.user, ("title",), read_service.TASK_EXPANSIONS, project_id=ctx.project_id
+        ),
+        read_service.get_task_fieldset(
+            db, ctx.user, expand=read_service.TASK_EXPANSIONS, limit=1, project_id=ctx.project_id
+        ),
+    ],
+    "import_tasks": lambda db, ctx: import_service.import_tasks(
+        db, ctx.project_id, io.BytesIO(b'{"title": "Imported"}\n'), "ndjson", ctx.user
+    ),
+}
+
+
+def build_dataset(db, user) -> SimpleNamespace:
+    project = Project(name="Plan Project", owner_id=user.id)
+    empty_project = Project(name="Empty Project", owner_id=user.id)
+    db.add_all([project, empty_project])
+    db.flush()
+    task = Task(title="Planned", project_id=project.id, assignee_id=user.id)
+    bare_task = Task(title="Bare", project_id=project.id)
+    label = Label(name="Bug", color="#FF0000", project_id=project.id)
+    db.add_all([task, bare_task, label])
+    db.flush()
+    db.add(Comment(content="Hi", task_id=task.id, author_id=user.id))
+    db.execute(TaskLabel.insert().values(task_id=task.id, label_id=label.id))
+    db.commit()
+    return SimpleNamespace(
+        user=user,
+        project_id=project.id,
+        empty_project_id=empty_project.id,
+        task_id=task.id,
+        bare_task_id=bare_task.id,
+    )
+
+
+def full_scans(db, captured_sql) -> set[str]:
+    """Tables scanned without an index seek by any captured statement"""
+    scanned = set()
+    connection = db.connection()
+    for statement, parameters in captured_sql:
+        if statement.lstrip().upper().startswith(SKIPPED_PREFIXES):
+            continue
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        for row in plan:
+            match = SCAN_PATTERN.match(row[3])
+            # "SCAN n CONSTANT ROWS" is a multi-row VALUES list, not a table
+            if match and "CONSTANT ROW" not in row[3]:
+                scanned.add(match.group(1))
+    return scanned
+
+
+def test_every_service_function_is_covered():
+    """Test that new database-facing service functions get a query plan check"""
+    database_functions = {
+        name
+        for module in SERVICE_MODULES
+        for name, fn in inspect.getmembers(module, inspect.isfunction)
+        if fn.__module__ == module.__name__
+        and not name.startswith("_")
+        and next(iter(inspect.signature(fn).parameters), None) == "db"
+    }
+    assert database_functions - SERVICE_CALLS.keys() == set()
+
+
+@pytest.mark.parametrize("name", sorted(SERVICE_CALLS))
+def test_service_queries_do_not_full_scan(name, db, test_user, captured_sql):
+    """Test that a service function's statements all use an index"""
+    ctx = build_dataset(db, test_user)
+    captured_sql.clear()
+    SERVICE_CALLS[name](db, ctx)
+    statements = list(captured_sql)
+    assert statements, f"{name} issued no SQL"
+
+    unexpected = {
+        table for table in full_scans(db, statements) if (name, table) not in ALLOWED_SCANS
+    }
+    assert unexpected == set(), f"{name} full-scans {sorted(unexpected)}"
+
+
+def test_router_queries_do_not_full_scan(client, auth_headers, db, test_user, captured_sql):
+    """Test the queries routers run inline (comments and labels)"""
+    ctx = build_dataset(db, test_user)
+    captured_sql.clear()
+    client.get(f"/api/tasks/{ctx.task_id}/comments", headers=auth_headers)
+    client.post(f"/api/tasks/{ctx.task_id}/comments", json={"content": "x"}, headers=auth_headers)
+    client.get(f"/api/projects/{ctx.project_id}/labels", headers=auth_headers)
+    statements = list(captured_sql)
+
+    assert full_scans(db, statements) == set()
@@ -0,0 +1,112 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from app.config import settings
+from app.database import (
+    Base,
+    SessionLocal,
+    create_engines,
+    create_replica_engines,
+)
+from app.main import app
+from app.models.user import User
+from app.utils.replicas import ReplicaRefresher, copy_database, read_your_writes
+from app.utils.response_cache import response_cache
+
+pytestmark = pytest.mark.usefixtures("sqlite_production")
+
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    """A primary and one replica file, wired into SessionLocal"""
+    primary_url = f"sqlite:///{tmp_path}/primary.db"
+    replica_url = f"sqlite:///{tmp_path}/replica.db"
+    connect_args = {"check_same_thread": False}
+    writer, reader = create_engines(primary_url, connect_args=connect_args)
+    Base.metadata.create_all(writer)
+    copy_database(f"{tmp_path}/primary.db", f"{tmp_path}/replica.db")
+    (replica,) = create_replica_engines([replica_url], connect_args=connect_args)
+    for key, value in {"bind": writer, "reader": reader, "replicas": [replica]}.items():
+        monkeypatch.setitem(SessionLocal.kw, key, value)
+    read_your_writes.clear()
+    yield tmp_path, replica
+    read_your_writes.clear()
+    for engine in (writer, reader, replica):
+        engine.dispose()
+
+
+@pytest.fixture
+def client(databases, monkeypatch):
+    monkeypatch.setattr(response_cache, "max_bytes", 0)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def refresh(tmp_path):
+    copy_database(f"{tmp_path}/primary.db", f"{tmp_path}/replica.db")
+
+
+def test_get_requests_read_from_the_replica(databases, client):
+    """Test replica reads, read-your-writes and the new-user fallback"""
+    tmp_path, replica = databases
+    replica_reads = []
+    event.listen(replica, "before_cursor_execute", lambda *args: replica_reads.append(1))
+    client.post(
+        "/api/auth/register",
+        json={"email": "r@example.com", "name": "R", "password": "secret123"},
+    )
+    token = client.post(
+        "/api/auth/login", json={"email": "r@example.com", "password": "secret123"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    # Not on the replica yet, so the user is looked up on the primary
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    client.post("/api/projects", json={"name": "Fresh"}, headers=headers)
+    replica_reads.clear()
+    assert [p["name"] for p in client.get("/api/projects", headers=headers).json()] == ["Fresh"]
+    assert replica_reads == []
+
+    read_your_writes.clear()
+    assert client.get("/api/projects", headers=headers).json() == []
+    assert replica_reads
+    refresh(tmp_path)
+    assert [p["name"] for p in client.get("/api/projects", headers=headers).json()] == ["Fresh"]
+
+
+def test_sessions_outside_get_requests_use_the_primary(databases):
+    """Test that sessions are not sent to replicas unless a request allows it"""
+    with SessionLocal() as db:
+        db.add(User(email="p@example.com", name="P", password_hash="x"))
+        db.commit()
+    with SessionLocal() as db:
+        assert db.scalar(select(User.email)) == "p@example.com"
+        db.info["replica"] = True
+        assert db.scalar(select(User.email)) is None
+
+
+def test_sticky_window_expires(monkeypatch):
+    """Test that a write keeps a user on the primary for READ_YOUR_WRITES_SECONDS"""
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", 60.0)
+    read_your_writes.wrote(7)
+    assert read_your_writes.sticky(7) and not read_your_writes.sticky(8)
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", -1.0)
+    read_your_writes.wrote(7)
+    assert not read_your_writes.sticky(7)
+
+
+def test_refresher_copies_once_per_interval(tmp_path):
+    """Test that workers sharing a replica do not copy it twice in one interval"""
+    primary_url = f"sqlite:///{tmp_path}/primary.db"
+    writer, _ = create_engines(primary_url)
+    Base.metadata.create_all(writer)
+    writer.dispose()
+    first, second = ReplicaRefresher(), ReplicaRefresher()
+    try:
+        first.start(primary_url, [f"sqlite:///{tmp_path}/replica.db"], 60.0)
+        second.start(primary_url, [f"sqlite:///{tmp_path}/replica.db"], 60.0)
+    finally:
+        first.stop()
+        second.stop()
+    assert (first.refreshes, second.refreshes) == (1, 0)
+    assert (tmp_path / "replica.db").exists()
@@ -0,0 +1,123 @@
+from starlette.requests import Request
+from app.utils.response_cache import ENTRY_OVERHEAD_BYTES, ResponseCache
+
+
+def _request(path: str, query: str = "") -> Request:
+    return Request({
+        "type": "http", "method": "GET", "scheme": "http", "server": ("testserver", 80),
+        "path": path, "query_string": query.encode(), "headers": [],
+    })
+
+
+def test_cache_evicts_least_recently_used_by_size():
+    """Test that the byte budget evicts the least recently used entry first"""
+    body = [0] * 50  # 101 bytes of JSON
+    cache = ResponseCache(max_bytes=16 * (ENTRY_OVERHEAD_BYTES + 101), ttl_seconds=60)
+    for index in range(16):
+        cache.lookup(_request(f"/{index}"), 1).respond(body, list[int], tags=["owner:1"])
+    assert cache.lookup(_request("/0"), 1).response is not None
+    cache.lookup(_request("/16"), 1).respond(body, list[int], tags=["owner:1"])
+
+    assert cache.lookup(_request("/1"), 1).response is None
+    assert cache.lookup(_request("/0"), 1).response.body == b"[" + b",".join([b"0"] * 50) + b"]"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == cache.max_bytes
+
+    cache.invalidate("owner:1")
+    assert cache.stats()["size"] == cache.stats()["bytes"] == 0
+
+
+def test_cache_keys_on_user_and_query():
+    """Test that users and query strings never share an entry"""
+    cache = ResponseCache(max_bytes=1_000_000, ttl_seconds=60)
+    cache.lookup(_request("/api/tasks", "status=TODO&priority=HIGH"), 1).respond(
+        [1], list[int], tags=["owner:1"]
+    )
+    assert cache.lookup(_request("/api/tasks", "priority=HIGH&status=TODO"), 1).response
+    assert cache.lookup(_request("/api/tasks", "status=TODO&priority=HIGH"), 2).response is None
+    assert cache.lookup(_request("/api/tasks", "status=DONE&priority=HIGH"), 1).response is None
+
+
+def test_cache_skips_fill_raced_by_invalidation():
+    """Test that a response read before a concurrent write is served but not stored"""
+    cache = ResponseCache(max_bytes=1_000_000, ttl_seconds=60)
+    lookup = cache.lookup(_request("/api/projects/1"), 1)
+    cache.invalidate("project:2")
+    cache.invalidate("project:1")
+    assert lookup.respond({"id": 1}, dict, tags=["project:1"]).headers["X-Cache"] == "MISS"
+    assert cache.lookup(_request("/api/projects/1"), 1).response is None
+
+    lookup = cache.lookup(_request("/api/projects/1"), 1)
+    cache.invalidate("project:2")
+    lookup.respond({"id": 1}, dict, tags=["project:1"])
+    assert cache.lookup(_request("/api/projects/1"), 1).response is not None
+
+
+def test_cached_read_skips_queries(client, auth_headers, captured_sql):
+    """Test that a repeated read is served from the cache without SQL"""
+    project = client.post("/api/projects", json={"name": "Cached"}, headers=auth_headers).json()
+    first = client.get(f"/api/projects/{project['id']}", headers=auth_headers)
+    captured_sql.clear()
+    second = client.get(f"/api/projects/{project['id']}", headers=auth_headers)
+
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+    assert second.content == first.content
+    assert second.json() == project
+    assert captured_sql == []
+
+
+def test_writes_invalidate_cached_reads(client, auth_headers):
+    """Test that project, task, label and comment writes refresh the cached reads"""
+    def get(url):
+        return client.get(url, headers=auth_headers).json()
+
+    def post(url, body):
+        return client.post(url, json=body, headers=auth_headers).json()
+
+    assert get("/api/projects") == []
+    project = post("/api/projects", {"name": "Fresh"})
+    assert [p["name"] for p in get("/api/projects")] == ["Fresh"]
+
+    client.put(f"/api/projects/{project['id']}", json={"name": "Renamed"}, headers=auth_headers)
+    assert get(f"/api/projects/{project['id']}")["name"] == "Renamed"
+    assert [p["name"] for p in get("/api/projects")] == ["Renamed"]
+
+    assert get("/api/tasks") == []
+    assert get(f"/api/tasks?project_id={project['id']}") == []
+    task = post("/api/tasks", {"title": "New", "project_id": project["id"]})
+    assert [t["id"] for t in get("/api/tasks")] == [task["id"]]
+    assert [t["id"] for t in get(f"/api/tasks?project_id={project['id']}")] == [task["id"]]
+
+    assert get(f"/api/tasks/{task['id']}/comments") == []
+    post(f"/api/tasks/{task['id']}/comments", {"content": "First"})
+    assert [c["content"] for c in get(f"/api/tasks/{task['id']}/comments")] == ["First"]
+
+    assert get(f"/api/projects/{project['id']}/labels") == []
+    post(f"/api/projects/{project['id']}/labels", {"name": "bug", "color": "#ff0000"})
+    assert [label["name"] for label in get(f"/api/projects/{project['id']}/labels")] == ["bug"]
+
+
+def test_cache_never_serves_another_user(client, auth_headers, other_auth_headers):
+    """Test that a cached response is never returned to a different user"""
+    project = client.post("/api/projects", json={"name": "Mine"}, headers=auth_headers).json()
+    assert client.get("/api/projects", headers=auth_headers).json() == [project]
+    assert client.get(f"/api/projects/{project['id']}", headers=auth_headers).status_code == 200
+
+    assert client.get("/api/projects", headers=other_auth_headers).json() == []
+    response = client.get(f"/api/projects/{project['id']}", headers=other_auth_headers)
+    assert response.status_code == 403
+
+
+def test_cached_page_keeps_cursor(client, auth_headers):
+    """Test that a cached page still returns its X-Next-Cursor header"""
+    project = client.post("/api/projects", json={"name": "Paged"}, headers=auth_headers).json()
+    for title in ("one", "two"):
+        client.post(
+            "/api/tasks", json={"title": title, "project_id": project["id"]}, headers=auth_headers
+        )
+    first = client.get("/api/tasks?limit=1", headers=auth_headers)
+    second = client.get("/api/tasks?limit=1", headers=auth_headers)
+
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+    assert second.json() == first.json()
@@ -0,0 +1,200 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
+from app.database import SessionLocal, create_engines, create_shard_engines
+from app.main import app
+from app.models.comment import Comment
+from app.models.project import Project
+from app.models.shard import ProjectShard
+from app.models.task import Task
+from app.utils.response_cache import response_cache
+from app.utils.shards import (
+    PROJECT_MOVED,
+    ShardSet,
+    create_schemas,
+    move_project,
+    shard_counts,
+    shard_set,
+)
+
+pytestmark = pytest.mark.usefixtures("sqlite_production")
+
+
+@pytest.fixture
+def shards(tmp_path, monkeypatch):
+    """A global database and two shards, wired into SessionLocal and shard_set"""
+    global_url = f"sqlite:///{tmp_path}/global.db"
+    connect_args = {"check_same_thread": False}
+    directory = create_engines(global_url, connect_args=connect_args)
+    binds = create_shard_engines(
+        [f"sqlite:///{tmp_path}/shard{n}.db" for n in range(2)], global_url,
+        connect_args=connect_args,
+    )
+    for key, value in {"bind": directory[0], "reader": directory[1], "shards": binds}.items():
+        monkeypatch.setitem(SessionLocal.kw, key, value)
+    for name, value in vars(ShardSet(binds, directory)).items():
+        monkeypatch.setattr(shard_set, name, value)
+    create_schemas()
+    yield binds
+    if shard_set._executor is not None:
+        shard_set._executor.shutdown()
+    for engine in (*directory, *(engine for pair in binds for engine in pair)):
+        if engine is not None:
+            engine.dispose()
+
+
+@pytest.fixture
+def client(shards, monkeypatch):
+    monkeypatch.setattr(response_cache, "max_bytes", 0)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def headers(client):
+    client.post(
+        "/api/auth/register",
+        json={"email": "s@example.com", "name": "S", "password": "secret123"},
+    )
+    token = client.post(
+        "/api/auth/login", json={"email": "s@example.com", "password": "secret123"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def count(engines, model, **filters) -> int:
+    writer, _ = engines
+    with writer.connect() as connection:
+        return connection.scalar(select(func.count()).select_from(model).filter_by(**filters))
+
+
+def create_tasks(client, headers, project_id, titles):
+    return [
+        client.post(
+            "/api/tasks", json={"title": title, "project_id": project_id}, headers=headers
+        ).json()
+        for title in titles
+    ]
+
+
+def test_projects_live_on_their_shard(shards, client, headers):
+    """Test placement by project id, per-shard reads and fanned-out listings"""
+    projects = [
+        client.post("/api/projects", json={"name": f"P{n}"}, headers=headers).json()
+        for n in range(4)
+    ]
+    for project in projects:
+        assert count(shards[project["id"] % 2], Project, id=project["id"]) == 1
+        create_tasks(client, headers, project["id"], ["A", "B"])
+    task = client.get(f"/api/tasks?project_id={projects[1]['id']}", headers=headers).json()[0]
+    comment = client.post(
+        f"/api/tasks/{task['id']}/comments", json={"content": "Hi"}, headers=headers
+    )
+    assert comment.status_code == 201
+    assert count(shards[projects[1]["id"] % 2], Comment, task_id=task["id"]) == 1
+    assert [c["content"] for c in client.get(
+        f"/api/tasks/{task['id']}/comments", headers=headers
+    ).json()] == ["Hi"]
+
+    listed = client.get("/api/projects", headers=headers)
+    assert [p["id"] for p in listed.json()] == sorted(p["id"] for p in projects)
+    tasks = client.get("/api/tasks", headers=headers).json()
+    assert len(tasks) == len({t["id"] for t in tasks}) == 8
+    etag = client.get("/api/tasks", headers=headers).headers["ETag"]
+    assert client.get(
+        "/api/tasks", headers={**headers, "If-None-Match": etag}
+    ).status_code == 304
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/tasks", params=params, headers=headers)
+        pages += response.json()
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert [t["id"] for t in pages] == [
+        t["id"] for t in sorted(tasks, key=lambda t: (t["updated_at"], t["id"]), reverse=True)
+    ]
+    expanded = client.get(
+        "/api/tasks", params={"fields": "id", "expand": "comment_count,assignee"}, headers=headers
+    ).json()
+    assert sum(t["comment_count"] for t in expanded) == 1 and len(expanded) == 8
+
+
+def test_batches_and_change_feed_span_shards(shards, client, headers, monkeypatch):
+    """Test batch writes split by shard and the change feed merged across shards"""
+    monkeypatch.setattr(settings, "CHANGE_FEED_LAG_MS", 0)
+    first, second = (
+        client.post("/api/projects", json={"name": name}, headers=headers).json()["id"]
+        for name in ("First", "Second")
+    )
+    assert first % 2 != second % 2
+    items = [
+        {"title": "One", "project_id": first},
+        {"title": "Two", "project_id": second},
+        {"title": "Nowhere", "project_id": second + 1000},
+        {"title": "Three", "project_id": first},
+    ]
+    data = client.post("/api/tasks:batch", json={"items": items}, headers=headers).json()
+    assert [r["status"] for r in data["results"]] == [201, 201, 403, 201]
+    assert [r["task"]["title"] for r in data["results"] if r["task"]] == ["One", "Two", "Three"]
+    ids = [r["id"] for r in data["results"] if r["status"] == 201]
+
+    updates = [{"id": ids[1], "status": "DONE"}, {"id": 424242, "title": "X"}, {"id": ids[0]}]
+    data = client.put("/api/tasks:batch", json={"items": updates}, headers=headers).json()
+    assert [r["status"] for r in data["results"]] == [200, 404, 200]
+    assert data["results"][0]["task"]["status"] == "DONE"
+
+    response = client.request("DELETE", "/api/tasks:batch", json={"ids": ids}, headers=headers)
+    assert [r["status"] for r in response.json()["results"]] == [204, 204, 204]
+    feed = client.get("/api/changes", headers=headers).json()
+    assert {p["id"] for p in feed["projects"]} == {first, second}
+    assert sorted(t["entity_id"] for t in feed["deleted"]) == sorted(ids)
+    assert client.get("/api/tasks", headers=headers).json() == []
+
+
+def test_move_project_between_shards(shards, client, headers):
+    """Test an online move: rows, routing and the guard against stale writers"""
+    project = client.post("/api/projects", json={"name": "Mover"}, headers=headers).json()
+    source, target = project["id"] % 2, 1 - project["id"] % 2
+    task, other = create_tasks(client, headers, project["id"], ["A", "B"])
+    client.post(f"/api/tasks/{task['id']}/comments", json={"content": "Hi"}, headers=headers)
+    client.post(
+        f"/api/projects/{project['id']}/labels", json={"name": "L", "color": "#ffffff"},
+        headers=headers,
+    )
+
+    stats = move_project(project["id"], target)
+    assert (stats["source"], stats["target"], stats["copied"]) == (source, target, 5)
+    assert count(shards[source], Task) == count(shards[source], Project) == 0
+    assert count(shards[target], Task, project_id=project["id"]) == 2
+    with shards[target][0].connect() as connection:
+        # The shard map, read through the attached global database
+        assert connection.scalar(select(ProjectShard.shard)) == target
+    assert [c["shard"] for c in shard_counts() if c["projects"]] == [target]
+
+    assert client.get(f"/api/projects/{project['id']}", headers=headers).status_code == 200
+    assert client.put(
+        f"/api/tasks/{other['id']}", json={"title": "Moved"}, headers=headers
+    ).json()["title"] == "Moved"
+    comments = client.get(f"/api/tasks/{task['id']}/comments", headers=headers).json()
+    assert [c["content"] for c in comments] == ["Hi"]
+    assert [t["title"] for t in client.get(
+        f"/api/tasks?project_id={project['id']}", headers=headers
+    ).json()] == ["A", "Moved"]
+
+    with pytest.raises(IntegrityError, match=PROJECT_MOVED):
+        with shards[source][0].begin() as connection:
+            connection.execute(insert(Task).values(title="Late", project_id=project["id"]))
+    # A worker that has not heard of the move yet gets a retryable error
+    shard_set._moved = {}
+    shard_set._map_loaded = float("inf")
+    response = client.post(
+        f"/api/projects/{project['id']}/labels", json={"name": "M", "color": "#000000"},
+        headers=headers,
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,107 @@
+import logging
+import re
+import pytest
+from sqlalchemy import insert, select
+from app.models.comment import Comment
+from app.models.label import Label, TaskLabel
+from app.models.project import Project
+from app.models.task import Task
+from app.utils.sql_stats import statement_shape, track
+
+TASKS = 20
+
+# Statements per request with the principal cache warm; a change that needs more
+# should raise the budget deliberately
+BUDGETS = [
+    ("GET", "/api/projects", None, 2),
+    ("GET", "/api/projects/{project_id}", None, 2),
+    ("GET", "/api/projects/{project_id}/labels", None, 3),
+    ("GET", "/api/tasks", None, 2),
+    ("GET", "/api/tasks?limit=5", None, 2),
+    ("GET", "/api/tasks?fields=id,title", None, 2),
+    ("GET", "/api/tasks?expand=labels,assignee,comment_count", None, 4),
+    ("GET", "/api/tasks/{task_id}", None, 2),
+    ("GET", "/api/tasks/{task_id}/comments", None, 3),
+    ("GET", "/api/projects/{project_id}/export", None, 4),
+    ("GET", "/api/changes", None, 5),
+    ("POST", "/api/tasks", {"title": "New", "project_id": "{project_id}"}, 2),
+    ("PUT", "/api/tasks/{task_id}", {"title": "Renamed"}, 1),
+    ("DELETE", "/api/tasks/{bare_task_id}", None, 6),
+    ("POST", "/api/tasks/{task_id}/comments", {"content": "Hi"}, 3),
+    ("POST", "/api/tasks:batch", {"items": [{"title": "B", "project_id": "{project_id}"}] * 10}, 2),
+    ("PUT", "/api/tasks:batch", {"items": [{"id": "{task_id}", "title": "Batch"}] * 10}, 3),
+    ("DELETE", "/api/tasks:batch", {"ids": ["{bare_task_id}"] * 10}, 5),
+]
+
+
+@pytest.fixture
+def seeded(db, test_user):
+    """A project of TASKS assigned, labelled tasks; only the first has comments"""
+    project = Project(name="Budget", owner_id=test_user.id)
+    db.add(project)
+    db.flush()
+    label = Label(name="bug", color="#ff0000", project_id=project.id)
+    db.add(label)
+    db.flush()
+    task_ids = db.scalars(
+        insert(Task).returning(Task.id),
+        [{"title": f"Task {i}", "project_id": project.id, "assignee_id": test_user.id}
+         for i in range(TASKS)],
+    ).all()
+    db.execute(insert(TaskLabel), [{"task_id": i, "label_id": label.id} for i in task_ids])
+    db.execute(
+        insert(Comment),
+        [{"content": "Comment", "task_id": task_ids[0], "author_id": test_user.id}] * TASKS,
+    )
+    db.commit()
+    return {"project_id": project.id, "task_id": task_ids[0], "bare_task_id": task_ids[1]}
+
+
+def fill(value, ids):
+    """``value`` with "{name}" placeholders replaced by the seeded ids"""
+    if isinstance(value, str):
+        return ids[value[1:-1]] if re.fullmatch(r"\{\w+\}", value) else value.format(**ids)
+    if isinstance(value, list):
+        return [fill(item, ids) for item in value]
+    if isinstance(value, dict):
+        return {key: fill(item, ids) for key, item in value.items()}
+    return value
+
+
+@pytest.mark.parametrize("method, url, body, budget", BUDGETS, ids=lambda v: str(v)[:40])
+def test_query_budget(client, auth_headers, seeded, query_budget, method, url, body, budget):
+    """Test that each endpoint stays within its statement budget and has no N+1"""
+    client.get("/api/auth/me", headers=auth_headers)
+    with query_budget(budget):
+        response = client.request(
+            method, fill(url, seeded), json=fill(body, seeded), headers=auth_headers
+        )
+    assert response.status_code < 300
+
+
+def test_server_timing_counts_request_statements(client, auth_headers, seeded, captured_sql):
+    """Test that Server-Timing reports the statements the request ran"""
+    client.get("/api/auth/me", headers=auth_headers)
+    captured_sql.clear()
+    response = client.get("/api/tasks?expand=labels", headers=auth_headers)
+
+    match = re.fullmatch(r'db;dur=[\d.]+;desc="(\d+) queries"', response.headers["Server-Timing"])
+    assert match and int(match.group(1)) == len(captured_sql)
+
+
+def test_statement_shape_ignores_in_list_length():
+    """Test that statements differing only in IN-list length share a shape"""
+    assert statement_shape("SELECT x\n FROM t WHERE id IN (?, ?, ?)") == statement_shape(
+        "SELECT x FROM t WHERE id IN (?)"
+    )
+
+
+def test_repeated_statements_are_logged(db, seeded, caplog):
+    """Test that lazy loading per row is reported as a likely N+1"""
+    with caplog.at_level(logging.DEBUG, logger="app.utils.sql_stats"):
+        with track("lazy comments") as stats:
+            for task in db.scalars(select(Task)):
+                task.comments
+    assert stats.count == TASKS + 1
+    assert "lazy comments: 21 queries" in caplog.text
+    assert "Possible N+1 in lazy comments: 20 x SELECT comments" in caplog.text
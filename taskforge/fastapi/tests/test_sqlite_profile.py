@@ -0,0 +1,121 @@
+import threading
+import pytest
+from sqlalchemy import event, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, RoutingSession, create_engines
+from app.models.project import Project
+from app.models.user import User
+
+pytestmark = pytest.mark.usefixtures("sqlite_production")
+
+
+@pytest.fixture
+def engines(tmp_path):
+    writer, reader = create_engines(
+        f"sqlite:///{tmp_path}/profile.db", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(writer)
+    yield writer, reader
+    writer.dispose()
+    reader.dispose()
+
+
+@pytest.fixture
+def session_factory(engines):
+    writer, reader = engines
+    return sessionmaker(bind=writer, class_=RoutingSession, reader=reader, autoflush=False)
+
+
+def engine_log(engines):
+    """Names of the engines that ran each statement, in order"""
+    log = []
+    for name, engine in zip(("writer", "reader"), engines):
+        event.listen(
+            engine, "before_cursor_execute", lambda *args, name=name: log.append(name)
+        )
+    return log
+
+
+def test_connections_are_tuned(engines):
+    """Test the pragmas on writer and reader connections"""
+    writer, reader = engines
+    pragmas = ("journal_mode", "synchronous", "busy_timeout", "query_only")
+    with writer.connect() as connection:
+        values = [connection.execute(text(f"PRAGMA {p}")).scalar() for p in pragmas]
+        assert values == ["wal", 1, 5000, 0]
+    with reader.connect() as connection:
+        assert connection.execute(text("PRAGMA query_only")).scalar() == 1
+    assert (writer.pool.size(), reader.pool.size()) == (1, 8)
+
+
+def test_memory_databases_keep_a_single_engine():
+    """Test that in-memory SQLite is left alone, since readers could not share it"""
+    engine, reader = create_engines("sqlite://")
+    assert reader is None
+    engine.dispose()
+
+
+def test_transactions_read_their_own_writes(engines, session_factory):
+    """Test that reads use the reader until the transaction writes"""
+    log = engine_log(engines)
+    with session_factory() as db:
+        db.scalar(select(func.count(User.id)))
+        db.add(User(email="a@example.com", name="A", password_hash="x"))
+        db.flush()
+        assert db.scalar(select(func.count(User.id))) == 1
+        db.commit()
+        assert db.scalar(select(func.count(User.id))) == 1
+        db.execute(update(User).values(name="B"))
+        db.commit()
+    assert log == ["reader", "writer", "writer", "reader", "writer"]
+
+
+def test_concurrent_writers_do_not_lock(session_factory):
+    """Test that writers queue for the single connection instead of failing"""
+    with session_factory() as db:
+        db.add(User(email="owner@example.com", name="Owner", password_hash="x"))
+        db.commit()
+    errors = []
+
+    def work(n):
+        try:
+            for i in range(20):
+                with session_factory() as db:
+                    db.scalars(select(Project).limit(5)).all()
+                    db.add(Project(name=f"P{n}-{i}", owner_id=1))
+                    db.flush()
+                    db.execute(update(Project).where(Project.owner_id == 1).values(status="ACTIVE"))
+                    db.commit()
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with session_factory() as db:
+        assert db.scalar(select(func.count(Project.id))) == 160
+
+
+async def test_async_sessions_route_reads(tmp_path):
+    """Test the async engines and RoutingSession under AsyncSession"""
+    url = f"sqlite+aiosqlite:///{tmp_path}/profile.db"
+    writer, reader = create_engines(url, create=create_async_engine)
+    async with writer.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(
+        bind=writer, class_=AsyncSession, sync_session_class=RoutingSession,
+        reader=reader.sync_engine, expire_on_commit=False,
+    )
+    log = engine_log((writer.sync_engine, reader.sync_engine))
+    async with factory() as db:
+        db.add(User(email="a@example.com", name="A", password_hash="x"))
+        await db.commit()
+        assert await db.scalar(select(func.count(User.id))) == 1
+    assert log == ["writer", "reader"]
+    await writer.dispose()
+    await reader.dispose()